@@ -1,29 +1,55 @@
-import multiprocessing
 import sys
+from sensor_bus import SensorBus
+from supervisor import Supervisor
+
+# Each sensor process publishes its latest frame/scan/sample block to the sensor bus
+# (see sensor_bus.py), so other processes can read every stream without opening the devices.
+# Everything is stamped with time.monotonic() when it was measured (see sensor_clock.py),
+# so the streams can be lined up with each other (see time_alignment.py).
+# The processes are run by a Supervisor (see supervisor.py), which restarts them when they crash
+# or stop calling heartbeat.beat(), and writes their health to combined_status.json.
 
 # Function to run the thermal camera
-def run_thermalcam():
-    import pithermalcam as ptc
-    import time
+def run_thermalcam(bus_prefix, heartbeat):
+    import cv2
+    import numpy as np
+    from thermal_capture import ThermalCapture, open_sensor
+    from thermal_display import ThermalDisplay
 
-    while True:
-        try:
-            ptc.display_camera_live()
-        except Exception as e:
-            print(f"Thermal Camera Error {e}")
+    thermal_topic = SensorBus.attach(bus_prefix, "thermal")
+    try:
+        capture = ThermalCapture(open_sensor())
+        frame = np.zeros(thermal_topic.shape, dtype=np.float32)
+        display = ThermalDisplay((640, 480), bgr=True)  # OpenCV windows expect blue first
+        while True:
+            # Frames are read back to back, bad frames are skipped inside capture_frame()
+            if capture.capture_frame():
+                _, timestamp, _ = capture.read(frame)
+                thermal_topic.publish(frame, timestamp)
+                cv2.imshow("Thermal Camera", display.render(frame))
+                cv2.waitKey(1)
+            heartbeat.beat()
+    except Exception as e:
+        # Exit instead of retrying straight away, the supervisor restarts the process with a backoff
+        print(f"Thermal Camera Error {e}")
+        sys.exit(1)
 
 # Function to run the lidar visualization
-def run_fast_lidar():
+def run_fast_lidar(bus_prefix, heartbeat):
     import pygame
     import math
-    from math import floor
-    from adafruit_rplidar import RPLidar
+    from lidar_reader import LidarReader
+    from lidar_render import project_scans, draw_points
+    from scan_buffer import ScanRingBuffer
+    from scan_samples import bin_scan
 
     PORT_NAME = "/dev/ttyUSB0"
-    lidar = RPLidar(None, PORT_NAME, timeout=3)
+    lidar = LidarReader(PORT_NAME)
+    lidar_topic = SensorBus.attach(bus_prefix, "lidar")
     WIDTH, HEIGHT = 800, 800
     CENTER_X, CENTER_Y = WIDTH // 2, HEIGHT // 2
     MAX_DISTANCE = 4000
+    ANGULAR_RESOLUTION = 0.25
 
     pygame.init()
     screen = pygame.display.set_mode((WIDTH, HEIGHT))
@@ -35,15 +61,7 @@ def run_fast_lidar():
     GRID_COLOR = (50, 50, 70)
     CIRCLE_COLOR = (100, 100, 150)
 
-    scan_history = []
-
-    def polar_to_cartesian(angle, distance):
-        if distance > MAX_DISTANCE:
-            distance = MAX_DISTANCE
-        angle_rad = math.radians(angle)
-        x = CENTER_X + int(distance * math.cos(angle_rad) * (WIDTH / 2) / MAX_DISTANCE)
-        y = CENTER_Y + int(distance * math.sin(angle_rad) * (HEIGHT / 2) / MAX_DISTANCE)
-        return x, y
+    scan_history = ScanRingBuffer(3, bins=int(360 / ANGULAR_RESOLUTION))
 
     def draw_grid():
         screen.fill(BACKGROUND_COLOR)
@@ -56,46 +74,68 @@ def run_fast_lidar():
 
     def process_data():
         draw_grid()
-        for data in scan_history:
-            for angle in range(360):
-                distance = data[angle]
-                if distance > 0:
-                    x, y = polar_to_cartesian(angle, distance)
-                    pygame.draw.circle(screen, POINT_COLOR, (x, y), 2)
+        for frames in scan_history.views():
+            xs, ys = project_scans(frames, WIDTH, HEIGHT, MAX_DISTANCE)
+            draw_points(screen, xs, ys, POINT_COLOR)
         pygame.display.flip()
 
     try:
-        for scan in lidar.iter_scans():
-            scan_data = [0] * 360
-            for _, angle, distance in scan:
-                scan_data[min([359, floor(angle)])] = distance
-
-            scan_history.append(scan_data)
-            if len(scan_history) > 3:
-                scan_history.pop(0)
+        lidar.start()
+        running = True
+        while running:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    running = False
+
+            samples = lidar.read_latest()
+            if samples is not None:
+                lidar_topic.publish(samples, lidar.scan_time, lidar.scan_start_time)
+                scan_data, scan_quality = scan_history.next_slot()
+                bin_scan(samples, ANGULAR_RESOLUTION, out=scan_data, quality_out=scan_quality)
+                scan_history.publish(lidar.scan_time)
 
             process_data()
+            heartbeat.beat()
             clock.tick(30)
 
     except KeyboardInterrupt:
         print("Stopping.")
     finally:
+        print(f"Lidar scans received: {lidar.received}, dropped: {lidar.dropped}, errors: {lidar.errors}")
         lidar.stop()
-        lidar.stop_motor()
-        lidar.disconnect()
         pygame.quit()
 
 # Function to run motor control UI
-def run_motor_ui():
+def run_motor_ui(bus_prefix, heartbeat):
+    import numpy as np
+    from PyQt5.QtCore import QTimer
     from PyQt5.QtWidgets import QApplication
+    import motor_ui
     from motor_ui import MotorControlUI
+
+    motor_topic = SensorBus.attach(bus_prefix, "motor")
+    speeds = np.zeros(motor_topic.shape, dtype=np.float32)
+
+    # All the channels of one command are updated, then published once, so readers never see half of it
+    def publish_speeds(first_channel, new_speeds):
+        speeds[first_channel:first_channel + len(new_speeds)] = new_speeds
+        motor_topic.publish(speeds)
+
+    motor_ui.speed_listener = publish_speeds
     app = QApplication(sys.argv)
     window = MotorControlUI()
     window.show()
+
+    # The UI only does work on key presses, so beat from a timer to show the event loop is alive
+    heartbeat_timer = QTimer()
+    heartbeat_timer.timeout.connect(heartbeat.beat)
+    heartbeat_timer.start(1000)
     sys.exit(app.exec_())
 
 # Function to run geophone graph
-def run_differential_graph_display():
+def run_differential_graph_display(bus_prefix, heartbeat):
+    import time
+    import numpy as np
     import matplotlib.pyplot as plt
     import matplotlib.animation as animation
     import Adafruit_ADS1x15
@@ -115,11 +155,26 @@ def run_differential_graph_display():
     plt.xlabel('Data Points (Approximately 25 Readings each Second)')
     plt.ylabel('Voltage Value Post Gain Adjustment')
 
+    # Readings are published a block at a time
+    geophone_topic = SensorBus.attach(bus_prefix, "geophone")
+    block = np.zeros(geophone_topic.shape, dtype=geophone_topic.dtype)
+    block_fill = [0]
+    block_start = [0.0]
+
     def animate(i, ys):
         value = adc.read_adc_difference(0, gain=GAIN)
+        read_time = time.monotonic()
+        if block_fill[0] == 0:
+            block_start[0] = read_time
+        block[block_fill[0]] = value
+        block_fill[0] += 1
+        if block_fill[0] == len(block):
+            geophone_topic.publish(block, read_time, block_start[0])
+            block_fill[0] = 0
         ys.append(value)
         ys = ys[-x_len:]
         line.set_ydata(ys)
+        heartbeat.beat()
         return line,
 
     ani = animation.FuncAnimation(fig, animate, fargs=(ys,), interval=1, blit=True)
@@ -127,17 +182,19 @@ def run_differential_graph_display():
 
 # Main process to manage all sensors
 if __name__ == "__main__":
-    processes = [
-        multiprocessing.Process(target=run_thermalcam),
-        multiprocessing.Process(target=run_fast_lidar),
-        multiprocessing.Process(target=run_motor_ui),
-        multiprocessing.Process(target=run_differential_graph_display),
-    ]
-
-    # Start all processes
-    for process in processes:
-        process.start()
-
-    # Wait for all processes to finish
-    for process in processes:
-        process.join()
+    bus = SensorBus()
+    supervisor = Supervisor([
+        ("thermal", run_thermalcam, (bus.prefix,)),
+        ("lidar", run_fast_lidar, (bus.prefix,)),
+        ("motor", run_motor_ui, (bus.prefix,)),
+        ("geophone", run_differential_graph_display, (bus.prefix,)),
+    ])
+
+    # Run until every window has been closed, restarting processes that crash or hang
+    try:
+        supervisor.run()
+    except KeyboardInterrupt:
+        print("Stopping.")
+    finally:
+        supervisor.stop()
+        bus.close()
@@ -0,0 +1,78 @@
+import os
+import time
+import numpy as np
+from lidar_reader import MAX_SAMPLES
+from scan_samples import SAMPLE_DTYPE
+from seqlock import SeqlockBuffer
+
+# Topics every combined.py process can publish to or read from: name -> (shape, dtype).
+# Each topic holds only the latest message; variable-length messages (lidar scans)
+# fill the front of the array and record how many entries are valid. Every message
+# carries the time.monotonic() span it covers (see sensor_clock.py): when its first
+# sample was taken (start time) and its last one (timestamp).
+TOPICS = {
+    "thermal": ((24, 32), np.float32),          # Latest thermal frame (degrees C)
+    "lidar": ((MAX_SAMPLES,), SAMPLE_DTYPE),    # Latest complete lidar scan (raw samples)
+    "geophone": ((64,), np.int32),              # Latest block of geophone ADC readings
+    "motor": ((7,), np.float32),                # Last speed (-100..100) sent to each servo channel
+}
+
+
+# One topic in shared memory, written by a single publisher and read by any number of processes
+class Topic(SeqlockBuffer):
+    """ Latest message of a topic behind a seqlock (see seqlock.py in the "Lidar Code"
+    folder): nothing is ever locked and nothing is pickled. read() returns
+    (sequence, start time, timestamp, message copy), or None if nothing was published yet.
+    """
+
+    def publish(self, message, timestamp=None, start_time=None):
+        """ Copy a message in. It may be shorter than the topic along the first axis.
+
+        timestamp defaults to now and start_time to timestamp (a single instant).
+        """
+        if timestamp is None:
+            timestamp = time.monotonic()
+        self.write(message, timestamp, start_time)
+
+
+# Class that keeps track of which messages of a topic one consumer has already seen
+class Subscriber:
+    def __init__(self, topic):
+        self.topic = topic
+        self.buffer = np.empty(topic.shape, dtype=topic.dtype)
+        self.last_sequence = 0
+        self.received = 0
+        self.missed = 0  # Messages that were replaced before this subscriber read them
+
+    def read_new(self):
+        """ Returns (start time, timestamp, message) if there is a new message since the last call, else None.
+
+        The message is a view of this subscriber's buffer and is overwritten by the next call.
+        """
+        result = self.topic.read(self.buffer)
+        if result is None or result[0] == self.last_sequence:
+            return None
+        sequence, start_time, timestamp, message = result
+        self.missed += sequence - self.last_sequence - 1
+        self.received += 1
+        self.last_sequence = sequence
+        return start_time, timestamp, message
+
+
+# All topics of one run of combined.py
+class SensorBus:
+    def __init__(self, prefix=None):
+        """ Creates the shared memory for every topic. Pass bus.prefix to other processes. """
+        self.prefix = prefix or f"rccar_{os.getpid()}"
+        self.topics = {name: Topic(f"{self.prefix}_{name}", shape, dtype, create=True)
+                       for name, (shape, dtype) in TOPICS.items()}
+
+    @staticmethod
+    def attach(prefix, name):
+        """ Opens one topic of an existing bus from another process. """
+        shape, dtype = TOPICS[name]
+        return Topic(f"{prefix}_{name}", shape, dtype)
+
+    def close(self):
+        for topic in self.topics.values():
+            topic.close()
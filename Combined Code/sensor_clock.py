@@ -0,0 +1,28 @@
+import time
+
+# Every sensor stamps its data with time.monotonic() (CLOCK_MONOTONIC on Linux). It is one
+# clock for every process on the Pi, so LiDAR scans, thermal frames and geophone blocks
+# from different processes can be compared directly, and unlike time.time() it never
+# jumps when NTP or the user sets the date. SensorClock converts to wall time for logs.
+
+
+# Class that converts the common sensor time to wall-clock time
+class SensorClock:
+    def __init__(self):
+        self.offset = 0.0
+        self.calibrate()
+
+    def calibrate(self, tries=5):
+        """ Measure wall time minus monotonic time, keeping the reading taken fastest. """
+        best = None
+        for _ in range(tries):
+            before = time.monotonic()
+            wall = time.time()
+            after = time.monotonic()
+            if best is None or after - before < best[0]:
+                best = (after - before, wall - (before + after) / 2)
+        self.offset = best[1]
+
+    def to_wall(self, sensor_time):
+        """ time.time() equivalent of a sensor time. """
+        return sensor_time + self.offset
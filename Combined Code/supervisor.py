@@ -0,0 +1,208 @@
+import os
+import json
+import time
+import signal
+import multiprocessing
+
+# Supervisor settings (seconds)
+POLL_INTERVAL = 1.0        # How often workers are checked and the status file is written
+BACKOFF_START = 1.0        # First restart delay, doubled after every failure ...
+BACKOFF_MAX = 60.0         # ... up to this
+STABLE_TIME = 60.0         # A worker that has run this long without failing starts from BACKOFF_START again
+HEARTBEAT_TIMEOUT = 15.0   # A worker that has not called beat() for this long is hung and gets restarted
+STARTUP_TIMEOUT = 60.0     # ... and one that has not called it at all this long after starting (device setup can be slow)
+STATUS_FILE = "combined_status.json"
+
+_CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+
+
+# Handle passed to each worker so it can report that its main loop is still turning
+class Heartbeat:
+    def __init__(self, beats, index):
+        self.beats = beats  # Shared array: [last beat time, beat count] per worker
+        self.index = index
+
+    def beat(self):
+        # Monotonic: the Pi has no RTC, and NTP stepping the wall clock at boot must not look like a hang
+        self.beats[2 * self.index] = time.monotonic()
+        self.beats[2 * self.index + 1] += 1
+
+
+# Function run as each worker process: SIGTERM from the supervisor then exits through the worker's
+# finally blocks (SIGTERM's default action skips them, so a LidarReader child would keep the serial
+# port open). The worker gets its own process group so a worker that does not exit can be killed
+# together with the processes it started.
+def _worker_main(target, args):
+    os.setpgrp()
+    signal.signal(signal.SIGTERM, _exit_on_sigterm)
+    target(*args)
+
+
+def _exit_on_sigterm(signum, frame):
+    raise SystemExit(128 + signum)
+
+
+# Function to stop a worker: SIGTERM so it can clean up, then SIGKILL to its whole process group
+def _stop_process(process, timeout=5):
+    if process.is_alive():
+        process.terminate()
+    process.join(timeout=timeout)
+    try:
+        os.killpg(process.pid, signal.SIGKILL)  # Also children left behind by a clean exit
+    except (ProcessLookupError, PermissionError):
+        pass
+    process.join()
+
+
+# Function to read total CPU seconds and resident memory of a process from /proc
+def _process_usage(pid):
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        with open(f"/proc/{pid}/statm") as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None, None
+    cpu_seconds = (int(fields[11]) + int(fields[12])) / _CLOCK_TICKS  # utime + stime
+    return cpu_seconds, resident_pages * _PAGE_SIZE
+
+
+# State and metrics of one supervised worker process
+class Worker:
+    def __init__(self, name, target, args, heartbeat):
+        self.name = name
+        self.target = target
+        self.args = args
+        self.heartbeat = heartbeat
+        self.process = None
+        self.state = "stopped"
+        self.restarts = 0
+        self.backoff = BACKOFF_START
+        self.restart_at = 0.0
+        self.started_at = 0.0
+        self.last_exit_code = None
+        self.cpu_percent = 0.0
+        self.rss_bytes = 0
+        self.loop_rate = 0.0
+        self._last_sample = None  # (time, cpu seconds, beat count)
+
+    def start(self):
+        beats = self.heartbeat.beats
+        beats[2 * self.heartbeat.index] = 0.0
+        beats[2 * self.heartbeat.index + 1] = 0.0
+        self.process = multiprocessing.Process(target=_worker_main, args=(self.target, self.args + (self.heartbeat,)),
+                                               name=self.name)
+        self.process.start()
+        self.state = "running"
+        self.started_at = time.monotonic()
+        self._last_sample = None
+
+    def status(self):
+        last_beat = self.heartbeat.beats[2 * self.heartbeat.index]
+        return {
+            "state": self.state,
+            "pid": self.process.pid if self.process and self.process.is_alive() else None,
+            "restarts": self.restarts,
+            "last_exit_code": self.last_exit_code,
+            "uptime": round(time.monotonic() - self.started_at, 1) if self.state == "running" else 0.0,
+            "seconds_since_heartbeat": round(time.monotonic() - last_beat, 1) if last_beat else None,
+            "cpu_percent": round(self.cpu_percent, 1),
+            "rss_mb": round(self.rss_bytes / 1e6, 1),
+            "loop_rate_hz": round(self.loop_rate, 1),
+        }
+
+
+# Class that runs the worker processes, restarts them when they crash or hang, and reports health
+class Supervisor:
+    def __init__(self, workers, status_file=STATUS_FILE):
+        """ workers is a list of (name, target, args); each target is called as target(*args, heartbeat). """
+        self.status_file = status_file
+        self.beats = multiprocessing.RawArray("d", 2 * len(workers))
+        self.workers = [Worker(name, target, tuple(args), Heartbeat(self.beats, i))
+                        for i, (name, target, args) in enumerate(workers)]
+
+    def run(self):
+        """ Supervise until every worker has exited cleanly (exit code 0). """
+        for worker in self.workers:
+            worker.start()
+        while any(worker.state != "finished" for worker in self.workers):
+            now = time.monotonic()
+            for worker in self.workers:
+                self._check(worker, now)
+            self._write_status()
+            time.sleep(POLL_INTERVAL)
+        self._write_status()
+
+    def _check(self, worker, now):
+        if worker.state == "waiting":
+            if now >= worker.restart_at:
+                worker.restarts += 1
+                worker.start()
+            return
+        if worker.state != "running":
+            return
+
+        if not worker.process.is_alive():
+            _stop_process(worker.process)  # Reaps children it left behind
+            worker.last_exit_code = worker.process.exitcode
+            if worker.last_exit_code == 0:
+                worker.state = "finished"
+            else:
+                print(f"{worker.name} exited with code {worker.last_exit_code}")
+                self._schedule_restart(worker, now)
+            return
+
+        # A worker stuck before its first beat (opening the camera or the lidar's serial port) is hung too
+        last_beat = worker.heartbeat.beats[2 * worker.heartbeat.index]
+        since = last_beat or worker.started_at
+        timeout = HEARTBEAT_TIMEOUT if last_beat else STARTUP_TIMEOUT
+        if now - since > timeout:
+            print(f"{worker.name} has not responded for {now - since:.0f} s, restarting it")
+            _stop_process(worker.process)
+            worker.last_exit_code = worker.process.exitcode
+            self._schedule_restart(worker, now)
+            return
+
+        self._sample_metrics(worker, now)
+
+    def _schedule_restart(self, worker, now):
+        if now - worker.started_at > STABLE_TIME:
+            worker.backoff = BACKOFF_START
+        worker.state = "waiting"
+        worker.restart_at = now + worker.backoff
+        print(f"Restarting {worker.name} in {worker.backoff:.0f} s")
+        worker.backoff = min(worker.backoff * 2, BACKOFF_MAX)
+        worker.cpu_percent = worker.loop_rate = 0.0
+        worker.rss_bytes = 0
+
+    def _sample_metrics(self, worker, now):
+        cpu_seconds, rss_bytes = _process_usage(worker.process.pid)
+        if cpu_seconds is None:
+            return
+        beat_count = worker.heartbeat.beats[2 * worker.heartbeat.index + 1]
+        if worker._last_sample is not None:
+            last_time, last_cpu, last_count = worker._last_sample
+            elapsed = now - last_time
+            if elapsed > 0:
+                worker.cpu_percent = 100.0 * (cpu_seconds - last_cpu) / elapsed
+                worker.loop_rate = (beat_count - last_count) / elapsed
+        worker.rss_bytes = rss_bytes
+        worker._last_sample = (now, cpu_seconds, beat_count)
+
+    def _write_status(self):
+        status = {"time": time.time(), "workers": {worker.name: worker.status() for worker in self.workers}}
+        temp_file = self.status_file + ".tmp"
+        with open(temp_file, "w") as f:
+            json.dump(status, f, indent=4)
+        os.replace(temp_file, self.status_file)  # Readers never see a half-written file
+
+    def stop(self):
+        for worker in self.workers:
+            if worker.process is not None and worker.process.is_alive():
+                worker.process.terminate()  # All at once, so they clean up in parallel
+        for worker in self.workers:
+            if worker.process is not None:
+                _stop_process(worker.process)
+            worker.state = "stopped"
+        self._write_status()
@@ -0,0 +1,179 @@
+import numpy as np
+
+# Thermal camera field of view across its 32 columns, and the LiDAR bearing (degrees,
+# clockwise like the RPLidar's angles) the middle of the image points at.
+# The MLX90640BAA is 110 x 75 degrees, the BAB is 55 x 35.
+CAMERA_FOV = 110.0
+CAMERA_BEARING = 0.0
+CAMERA_COLUMNS = 32
+
+# How wide a slice of the scan (degrees) is used to find the range at a bearing
+BEARING_WIDTH = 3.0
+
+
+# Class that keeps the last `capacity` messages of one stream in preallocated arrays
+class StreamBuffer:
+    """ Messages must be appended in time order (each sensor's own times always are).
+    Messages shorter than `shape` along the first axis (lidar scans) keep their length.
+    Once full, the oldest message is overwritten, so memory never grows.
+    """
+
+    def __init__(self, capacity, shape=(), dtype=np.float64):
+        self.capacity = capacity
+        self.times = np.zeros(capacity, dtype=np.float64)
+        self.start_times = np.zeros(capacity, dtype=np.float64)
+        self.values = np.zeros((capacity,) + tuple(shape), dtype=dtype)
+        self.lengths = np.zeros(capacity, dtype=np.int64)
+        self.head = 0    # Slot the next message goes into
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def append(self, timestamp, value, start_time=None):
+        """ timestamp is when the message was complete, start_time when it began (default: the same). """
+        slot = self.head
+        if self.values.ndim > 1:
+            length = min(len(value), self.values.shape[1])
+            self.values[slot, :length] = value[:length]
+            self.lengths[slot] = length
+        else:
+            self.values[slot] = value
+        self.times[slot] = timestamp
+        self.start_times[slot] = timestamp if start_time is None else start_time
+        self.head = (self.head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def _slot(self, position):
+        """ Array slot of the message at position 0 (oldest) .. count - 1 (newest). """
+        return position if self.count < self.capacity else (self.head + position) % self.capacity
+
+    def _search(self, t):
+        """ Number of buffered messages with a time before t. """
+        if self.count < self.capacity:
+            return int(np.searchsorted(self.times[:self.count], t))
+        # Full: the buffer is the sorted run times[head:] followed by the sorted run times[:head]
+        older = self.times[self.head:]
+        if self.head == 0 or t <= older[-1]:
+            return int(np.searchsorted(older, t))
+        return len(older) + int(np.searchsorted(self.times[:self.head], t))
+
+    def value(self, position):
+        slot = self._slot(position)
+        if self.values.ndim > 1:
+            return self.values[slot, :self.lengths[slot]]
+        return self.values[slot]
+
+    def time(self, position):
+        return float(self.times[self._slot(position)])
+
+    def nearest(self, t, tolerance=None):
+        """ (time, value) of the message closest to t, or None if there is none within tolerance seconds. """
+        if self.count == 0:
+            return None
+        after = self._search(t)
+        candidates = [p for p in (after - 1, after) if 0 <= p < self.count]
+        best = min(candidates, key=lambda p: abs(self.time(p) - t))
+        if tolerance is not None and abs(self.time(best) - t) > tolerance:
+            return None
+        return self.time(best), self.value(best)
+
+    def interpolate(self, t):
+        """ Value at t, linear between the messages either side of it (numbers and fixed-size
+        arrays only), or None if t is outside the buffered time span. """
+        after = self._search(t)
+        if after == 0:
+            return self.value(0) if self.count and self.time(0) == t else None
+        if after == self.count:
+            return None
+        t0, t1 = self.time(after - 1), self.time(after)
+        v0, v1 = self.value(after - 1), self.value(after)
+        return v0 + (v1 - v0) * ((t - t0) / (t1 - t0))
+
+    def covering(self, t):
+        """ (start time, end time, value) of the message whose time span contains t, or None. """
+        after = self._search(t)
+        if after == self.count:
+            return None
+        slot = self._slot(after)
+        if self.start_times[slot] > t:
+            return None
+        return float(self.start_times[slot]), float(self.times[slot]), self.value(after)
+
+
+# Class that joins several streams at the times of one of them
+class TimeAligner:
+    """ Each stream is added with how its value at a time t is found:
+    - "nearest": the message closest to t, within tolerance seconds
+    - "interpolate": linear interpolation (e.g. the car's pose)
+    - "covering": the message whose start..end span contains t (e.g. the lidar scan
+      being measured at t, or the geophone block that holds the sample at t)
+    """
+
+    def __init__(self):
+        self.streams = {}
+        self.methods = {}
+
+    def add_stream(self, name, capacity, shape=(), dtype=np.float64, method="nearest", tolerance=None):
+        if method not in ("nearest", "interpolate", "covering"):
+            raise ValueError(f"Unknown alignment method: {method}")
+        self.streams[name] = StreamBuffer(capacity, shape, dtype)
+        self.methods[name] = (method, tolerance)
+        return self.streams[name]
+
+    def append(self, name, timestamp, value, start_time=None):
+        self.streams[name].append(timestamp, value, start_time)
+
+    def at(self, t, names=None):
+        """ Dict of stream name -> value at time t (None where a stream has nothing for t). """
+        joined = {}
+        for name in names or self.streams:
+            stream = self.streams[name]
+            method, tolerance = self.methods[name]
+            if method == "nearest":
+                result = stream.nearest(t, tolerance)
+                joined[name] = None if result is None else result[1]
+            elif method == "interpolate":
+                joined[name] = stream.interpolate(t)
+            else:
+                result = stream.covering(t)
+                joined[name] = None if result is None else result[2]
+        return joined
+
+
+# Function giving the LiDAR bearing (degrees) of a thermal image column (may be fractional, e.g. a centroid)
+def column_bearing(column, columns=CAMERA_COLUMNS, fov=CAMERA_FOV, bearing=CAMERA_BEARING):
+    return (bearing + (column + 0.5 - columns / 2.0) * (fov / columns)) % 360.0
+
+
+# Function to find the range (mm) at a bearing in a scan of raw samples, 0 if nothing was measured there
+def range_at_bearing(samples, bearing, width=BEARING_WIDTH):
+    offset = (samples["angle"] - bearing + 180.0) % 360.0 - 180.0
+    distances = samples["distance"][(np.abs(offset) <= width / 2) & (samples["distance"] > 0)]
+    return float(np.median(distances)) if len(distances) else 0.0
+
+
+# Function to place something seen at a bearing and range on the map
+def map_location(bearing, distance, pose=(0.0, 0.0, 0.0)):
+    """ pose is the LiDAR's (x mm, y mm, heading rad) on the map, as used by OccupancyGrid and ScanMatcher. """
+    x, y, heading = pose
+    direction = heading + np.radians(bearing)
+    return x + distance * np.cos(direction), y + distance * np.sin(direction)
+
+
+# Function to attribute a thermal detection to a LiDAR bearing, range and map location
+def locate_detection(aligner, detection_time, column, scan_stream="lidar", pose_stream="pose"):
+    """ Uses the scan being measured at detection_time, and the car's pose at that time if
+    a pose stream was added. Returns (bearing, range mm, (x, y) mm) or None without a scan
+    (or (bearing, 0, None) if the scan has no return at that bearing).
+    """
+    joined = aligner.at(detection_time, [name for name in (scan_stream, pose_stream) if name in aligner.streams])
+    scan = joined.get(scan_stream)
+    if scan is None:
+        return None
+    bearing = column_bearing(column)
+    distance = range_at_bearing(scan, bearing)
+    if distance == 0:
+        return bearing, 0.0, None
+    pose = joined.get(pose_stream)
+    return bearing, distance, map_location(bearing, distance, (0.0, 0.0, 0.0) if pose is None else pose)
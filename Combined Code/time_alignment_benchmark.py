@@ -0,0 +1,89 @@
+import time
+import numpy as np
+from lidar_recording import simulate_scan
+from scan_samples import SAMPLE_DTYPE
+from lidar_reader import MAX_SAMPLES
+from time_alignment import TimeAligner, locate_detection, column_bearing, range_at_bearing, map_location, CAMERA_FOV, CAMERA_COLUMNS
+
+# The car turns back and forth in the simulated room while the thermal camera sees a person
+# standing against the box (lidar_recording.ROOM_WALLS). Each detection is located on the map
+# once it comes out of the thermal pipeline, DETECTION_DELAY later, either:
+# - aligned: with the scan being measured and the pose interpolated at the frame's own time
+# - latest:  with whatever scan and pose are newest when the detection arrives
+PERSON = (1800.0, 1150.0)     # mm, on the face of the box
+SECONDS = 60
+SCAN_PERIOD = 0.1             # 10 scans per second
+FRAME_PERIOD = 0.125          # 8 thermal frames per second
+DETECTION_DELAY = 0.2         # Thermal read + analysis + detection, seconds
+
+
+# Function giving the car's pose at time t: turning back and forth, up to 57 degrees/s
+def pose_at(t):
+    return np.array([0.0, 0.0, 1.0 * np.sin(1.0 * t)])
+
+
+# Function giving the thermal column the person is seen at, or None when out of view
+def person_column(pose):
+    x, y, heading = pose
+    bearing = (np.degrees(np.arctan2(PERSON[1] - y, PERSON[0] - x) - heading) + 180.0) % 360.0 - 180.0
+    column = bearing / (CAMERA_FOV / CAMERA_COLUMNS) + CAMERA_COLUMNS / 2.0 - 0.5
+    return column if 0 <= column < CAMERA_COLUMNS else None
+
+
+def make_scan(start_time, rng):
+    angles, distances = simulate_scan(pose_at(start_time + SCAN_PERIOD / 2), rng=rng)
+    samples = np.zeros(len(angles), dtype=SAMPLE_DTYPE)
+    samples["quality"] = 15
+    samples["angle"] = angles
+    samples["distance"] = distances
+    return samples
+
+
+def main():
+    rng = np.random.default_rng(0)
+    aligner = TimeAligner()
+    aligner.add_stream("lidar", 20, (MAX_SAMPLES,), SAMPLE_DTYPE, method="covering")
+    aligner.add_stream("pose", 50, (3,), method="interpolate")
+
+    # Events in time order: scans (and the pose estimated from each) and detections arriving late
+    events = [(i * SCAN_PERIOD + SCAN_PERIOD, "scan") for i in range(int(SECONDS / SCAN_PERIOD))]
+    events += [(i * FRAME_PERIOD + DETECTION_DELAY, "detection") for i in range(int(SECONDS / FRAME_PERIOD))]
+    events.sort()
+
+    errors = {"aligned": [], "latest": []}
+    locate_time = 0.0
+    latest_scan, latest_pose = None, None
+    for now, kind in events:
+        if kind == "scan":
+            latest_scan = make_scan(now - SCAN_PERIOD, rng)
+            latest_pose = pose_at(now)
+            aligner.append("lidar", now, latest_scan, now - SCAN_PERIOD)
+            aligner.append("pose", now, latest_pose)
+            continue
+        frame_time = now - DETECTION_DELAY
+        column = person_column(pose_at(frame_time))
+        if column is None or latest_scan is None:
+            continue
+
+        start_time = time.perf_counter()
+        result = locate_detection(aligner, frame_time, column)
+        locate_time += time.perf_counter() - start_time
+        if result is not None and result[2] is not None:
+            errors["aligned"].append(np.hypot(result[2][0] - PERSON[0], result[2][1] - PERSON[1]))
+
+        bearing = column_bearing(column)
+        distance = range_at_bearing(latest_scan, bearing)
+        if distance > 0:
+            x, y = map_location(bearing, distance, latest_pose)
+            errors["latest"].append(np.hypot(x - PERSON[0], y - PERSON[1]))
+
+    print(f"{SECONDS} s turning up to 57 deg/s, detections arrive {DETECTION_DELAY * 1000:.0f} ms after their frame")
+    for name, values in errors.items():
+        values = np.array(values)
+        print(f"{name:<8} {len(values):4d} detections located, map error median {np.median(values):6.0f} mm, "
+              f"p95 {np.percentile(values, 95):6.0f} mm")
+    print(f"locate_detection: {locate_time / max(len(errors['aligned']), 1) * 1e6:.0f} us per detection")
+
+
+if __name__ == "__main__":
+    main()
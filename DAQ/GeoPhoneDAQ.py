@@ -1,83 +1,81 @@
 #Geophone DAQ
 
-import time
-import Adafruit_ADS1x15
 import numpy as np
-from scipy.signal import find_peaks
-from scipy.fft import fft, fftfreq
-import csv
-
-#Initializing the ADC (ADS1115)
-adc = Adafruit_ADS1x15.ADS1115(address=0x48, busnum=1)
+from geophone_acquisition import GeophoneAcquisition, open_adc
+from heartbeat_detector import HeartbeatDetector
+from telemetry import TelemetryWriter
+#sensor_clock.py is in the "Combined Code" folder and needs to be copied next to this file
+from sensor_clock import SensorClock
+
+#Initializing the ADC (ADS1115) in continuous-conversion mode
+#Set GEOPHONE_FAKE_ADC=1 to run without the sensor
+adc = open_adc(address=0x48, busnum=1)
 GAIN = 16
+DATA_RATE = 250
+acquisition = GeophoneAcquisition(adc, gain=GAIN, data_rate=DATA_RATE)
 
 #----------------------------------------------------
 #----------------------------------------------------
 
-#Function to collect the data 
-def data_collect():
-
-    data =[]
-    start_time = time.time()
-
-    #Sampling 20 seconds of data at a time
-    #The time different between each data point is 0.01s
-    #This way, we know that each point is at x0=0, x1=0.01, x2 = 0.02...
-    while (time.time() - start_time) < 20:
-        data.append(adc.read_adc_difference(0, gain=GAIN))
-        time.sleep(0.02)
-    return data
+#Function to make a detector for the sample rate measured so far
+def make_detector():
+    sample_rate = acquisition.sample_rate
+    print(f"Measured sample rate: {sample_rate:.2f} Hz")
+    log.write("geophone rate", np.array([sample_rate]))
+    return HeartbeatDetector(sample_rate)
 
 #----------------------------------------------------
 #----------------------------------------------------
 
-#Function is to detect a heartbeat in the dataset acquired from data_collect()
-def heart_detect(data):
-
-    fft_values = fft(data)
-    freqs = fftfreq(len(data), d=0.02)
-
-    pos_freqs = freqs[:len(data)//2]
-    mags = np.abs(fft_values[:len(data)//2])
-
-    main_index = np.argmax(mags)
-    main_freq = pos_freqs[main_index]
-
-    # If the magnitude is significant enough
-    if mags[main_index] > np.mean(mags) * 3:
-        return main_freq
-    
-    return main_freq
+#Function to log a change of result
+def log_result(message, frequency, timestamp):
+    print(message)
+    log.write("geophone message", f"{message}; {frequency:.2f} Hz" if frequency else message, clock.to_wall(timestamp))
 
 #----------------------------------------------------
 #----------------------------------------------------
 
 #This will be the main part of the code
 
-#Writing a csv file with the detected periodic signal frequencies
-filename = "HeartDetect.csv"
-with open(filename, mode='w', newline="") as file:
-    writer = csv.writer(file)
-    writer.writerow(["Date","Time","Message", "Frequency (Hz)"])
-#Looping forever until the program is stopped
+#Everything is logged to telemetry/geophone_*.tlm through one open file (see telemetry.py),
+#run telemetry_export.py on the files to get CSV. Streams:
+#  "geophone block"   - every raw ADC block (int16, BLOCK_SIZE samples), stamped with the time of
+#                       its first sample; the samples are 1 / rate apart
+#  "geophone rate"    - the measured sample rate (Hz), whenever the detector is made
+#  "heartbeat"        - every detector result: detected (0/1), frequency Hz, SNR, p-value
+#  "geophone message" - written whenever the result changes between detected and not detected
+#Times are converted from the sensors' common clock (see sensor_clock.py)
+log = TelemetryWriter("telemetry", "geophone")
+clock = SensorClock()
+result_row = np.zeros(4)
+
+#Sampling continuously, a new result comes out every second (see heartbeat_detector.py)
+print("Measuring the sample rate.")
+for _ in range(2):
+    acquisition.read_block()
+detector = make_detector()
+detected = None
 
-while True:
-    print("Sampling data for 20 seconds.")
-    data = data_collect()
-
-    heartbeat_frequency = heart_detect(data)
-    with open(filename, mode="a", newline="") as file:
-        writer = csv.writer(file)
-        date = time.strftime("%Y-%m-%d")
-        timestamp = time.strftime("%H:%M:%S")
-        if heartbeat_frequency>0:
-            message = "Potential Heartbeat Detected"
-            print(message)
-            writer.writerow([date,timestamp,message, f"{heartbeat_frequency:.2f}"])
-        else:
-            message = "Nothing Detected"
-            print(message)
-            writer.writerow([date,timestamp,message,"None"])
-    
-    #After sampling for 20 seconds, we sleep for 30
-    time.sleep(30)
\ No newline at end of file
+#Looping forever until the program is stopped
+try:
+    while True:
+        block = acquisition.read_block()
+        log.write("geophone block", block.samples, clock.to_wall(block.start_time))
+
+        #Start over if the sample rate has drifted from the one the detector assumes
+        if abs(acquisition.sample_rate - detector.sample_rate) > 0.02 * detector.sample_rate:
+            detector = make_detector()
+
+        for result in detector.push(block.samples, block.end_time):
+            result_row[:] = (result.detected, result.frequency or 0.0, result.snr, result.p_value)
+            log.write("heartbeat", result_row, clock.to_wall(result.time))
+            if result.detected and not detected:
+                log_result("Potential Heartbeat Detected", result.frequency, result.time)
+            elif not result.detected and detected is not False:
+                log_result("Nothing Detected", None, result.time)
+            detected = result.detected
+except KeyboardInterrupt:
+    pass
+finally:
+    acquisition.stop()
+    log.close()
@@ -1,41 +1,68 @@
 #Thermal Cam DAQ
 
-import pithermalcam as ptc
-import csv
 import time
-import board
-import busio
-
-#Need to initialize the camera connected to the i2c bus
-i2c_bus = busio.I2C(board.SCL,board.SDA,frequency=800000)
-mlx = ptc.pi_therm_cam.adafruit_mlx90640.MLX90640(i2c_bus)
-
-def write_csv(data, filename = 'avg_temp.csv'):
-    with open(filename, mode = 'a', newline = '') as file:
-        myWriter = csv.writer(file)
-        myWriter.writewrow(data)
-
-write_csv(["Date & Time", "Avg temp C", "Message"])
-#The camera frame is a 32x24 matrix, so we initialize to 768=32x24
-frame = [0]*768
-while True:
-
-    #Calculating the avg temp in a frame
-    mlx.getFrame(frame)
-    avg_temp_C = sum(frame)/len(frame)
-    message = 'N/A'
-    if avg_temp_C > 30 and avg_temp_C<50:
-        print("There may be a human there.")
-        message = "There may be a human there."
-    elif avg_temp_C >200:
-        print("Don't go further. There may be a fire up ahead.")
-        message = "Don't go further. There may be a fire up ahead."
-    date_time = time.strftime('%Y-%m-%d %H:%M:%S')
-
-    app_row = [date_time, avg_temp_C, message]
-    write_csv(app_row)
-    #Get data every 5 seconds
-    time.sleep(5)
+import numpy as np
+from thermal_analysis import ThermalAnalyzer
+from telemetry import TelemetryWriter
+#thermal_capture.py is in the "ThermalCam Code" folder and needs to be copied next to this file
+from thermal_capture import ThermalCapture, open_sensor
+#sensor_clock.py is in the "Combined Code" folder and needs to be copied next to this file
+from sensor_clock import SensorClock
+
+#Need to initialize the camera connected to the i2c bus (800 kHz)
+#Set THERMAL_SIMULATED=1 to run without the camera
+mlx = open_sensor()
+#Read frames back to back as fast as the sensor makes them instead of one every 5 seconds
+capture = ThermalCapture(mlx, refresh_rate=16)
+#A message is logged whenever it changes, and at least this often (seconds)
+LOG_INTERVAL = 5
+
+#Every frame is logged raw to telemetry/thermal_*.tlm through one open file (see telemetry.py),
+#run telemetry_export.py on the files to get CSV. Streams:
+#  "thermal frame"   - the 24x32 frame in degrees C
+#  "thermal summary" - average temp C, max temp C, frames/s, number of hot regions
+#  "thermal message" - the message and hot regions, e.g. "Human detected; human 3px 34.1C at (10.2, 20.0)"
+#Records are stamped with the time the frame was read (converted from the sensors' common clock)
+log = TelemetryWriter("telemetry", "thermal")
+clock = SensorClock()
+
+#Function to describe the hot regions of a frame, e.g. "human 3px 34.1C at (10.2, 20.0)"
+def describe_blobs(analysis):
+    return "; ".join(f"{blob.label} {blob.area}px {blob.max_temp:.1f}C at ({blob.centroid[0]:.1f}, {blob.centroid[1]:.1f})"
+                     for blob in analysis.blobs)
+
+#The camera frame is a 32x24 matrix
+frame = np.zeros((24, 32), dtype=np.float32)
+#Each frame is split into hot regions (blobs) and every region is classified on its own,
+#so a small, distant person is not averaged away by the background
+analyzer = ThermalAnalyzer()
+summary = np.zeros(4)
+last_message = None
+last_log_time = 0
+try:
+    while True:
+
+        #The sensor occasionally returns a bad frame, which is skipped
+        if not capture.capture_frame():
+            continue
+        _, timestamp, _ = capture.read(frame)
+        frame_time = clock.to_wall(timestamp)
+        analysis = analyzer.analyze(frame)
+        message = analysis.message()
+        if message != last_message and message != 'N/A':
+            print(message)
+
+        log.write("thermal frame", frame, frame_time)
+        summary[:] = (analysis.stats.mean, analysis.stats.max, capture.fps, len(analysis.blobs))
+        log.write("thermal summary", summary, frame_time)
+        if message != last_message or time.monotonic() - last_log_time >= LOG_INTERVAL:
+            log.write("thermal message", f"{message}; {describe_blobs(analysis)}", frame_time)
+            last_message = message
+            last_log_time = time.monotonic()
+except KeyboardInterrupt:
+    pass
+finally:
+    log.close()
 
 
 
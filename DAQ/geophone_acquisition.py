@@ -0,0 +1,190 @@
+import os
+import time
+import numpy as np
+
+# Acquisition settings
+DIFFERENTIAL = 0      # Channel 0 minus channel 1
+GAIN = 16
+DATA_RATE = 250       # Samples per second, one of the ADS1115 rates below
+BLOCK_SIZE = 250      # Samples per block (one second at DATA_RATE)
+ADS1115_DATA_RATES = (8, 16, 32, 64, 128, 250, 475, 860)
+
+# Environment variable used by open_adc(): set it to run with FakeADS1115 instead of the I2C device
+FAKE_ADC_ENV = "GEOPHONE_FAKE_ADC"
+
+
+# One block of consecutive readings with the monotonic times of its first and last sample
+class SampleBlock:
+    def __init__(self, samples, start_time, end_time, late):
+        self.samples = samples        # int16 array, a view of the acquisition's preallocated buffer
+        self.start_time = start_time  # time.monotonic() of the first reading
+        self.end_time = end_time      # time.monotonic() of the last reading
+        self.late = late              # Readings that were taken more than one period late
+
+    @property
+    def sample_rate(self):
+        """ Measured rate of this block in samples per second. """
+        if len(self.samples) < 2 or self.end_time <= self.start_time:
+            return 0.0
+        return (len(self.samples) - 1) / (self.end_time - self.start_time)
+
+
+# Class that reads the ADS1115 in continuous-conversion mode at a fixed rate
+class GeophoneAcquisition:
+    """ Puts the ADC in continuous mode at data_rate and reads the conversion
+    register on a fixed schedule of monotonic deadlines, so the sample interval
+    does not grow with I2C latency the way read + sleep(0.02) did.
+
+    read_block() fills one of two preallocated blocks in turn, so a block stays
+    valid until the next-but-one call; copy it to keep it longer.
+    """
+
+    def __init__(self, adc, differential=DIFFERENTIAL, gain=GAIN, data_rate=DATA_RATE, block_size=BLOCK_SIZE):
+        if data_rate not in ADS1115_DATA_RATES:
+            raise ValueError(f"Data rate must be one of: {ADS1115_DATA_RATES}")
+        self.adc = adc
+        self.differential = differential
+        self.gain = gain
+        self.data_rate = data_rate
+        self.period = 1.0 / data_rate
+        self.blocks = np.zeros((2, block_size), dtype=np.int16)
+        self.block_index = 0
+        self.next_time = None
+        self.total_samples = 0
+        self.total_late = 0
+        self.first_time = None
+        self.last_time = None
+
+    def start(self):
+        self.adc.start_adc_difference(self.differential, gain=self.gain, data_rate=self.data_rate)
+        time.sleep(2 * self.period)  # Let the first conversion finish
+        self.next_time = time.monotonic()
+
+    def stop(self):
+        self.adc.stop_adc()
+        self.next_time = None
+
+    @property
+    def sample_rate(self):
+        """ Measured rate over everything read since start() (0 until there are two samples). """
+        if self.total_samples < 2 or self.last_time <= self.first_time:
+            return 0.0
+        return (self.total_samples - 1) / (self.last_time - self.first_time)
+
+    def read_block(self):
+        """ Returns the next SampleBlock. """
+        if self.next_time is None:
+            self.start()
+        block = self.blocks[self.block_index]
+        self.block_index ^= 1
+        late = 0
+        start_time = None
+        for i in range(len(block)):
+            now = time.monotonic()
+            if now < self.next_time:
+                time.sleep(self.next_time - now)
+                now = time.monotonic()
+            elif now - self.next_time > self.period:
+                # Fell behind (e.g. the process was descheduled): skip the missed
+                # deadlines instead of reading back to back to catch up
+                late += 1
+                self.next_time = now
+            block[i] = self.adc.get_last_result()
+            if start_time is None:
+                start_time = now
+            self.next_time += self.period
+        end_time = now
+
+        if self.first_time is None:
+            self.first_time = start_time
+        self.last_time = end_time
+        self.total_samples += len(block)
+        self.total_late += late
+        return SampleBlock(block, start_time, end_time, late)
+
+    def acquire(self, seconds, out=None):
+        """ Read whole blocks for about `seconds`. Returns (samples, measured sample rate).
+
+        out can be a preallocated int16 array with room for the result.
+        """
+        block_size = self.blocks.shape[1]
+        blocks = max(1, int(round(seconds * self.data_rate / block_size)))
+        if out is None:
+            out = np.empty(blocks * block_size, dtype=np.int16)
+        start_time = end_time = None
+        for i in range(blocks):
+            block = self.read_block()
+            out[i * block_size:(i + 1) * block_size] = block.samples
+            if start_time is None:
+                start_time = block.start_time
+            end_time = block.end_time
+        count = blocks * block_size
+        rate = (count - 1) / (end_time - start_time) if end_time > start_time else float(self.data_rate)
+        return out[:count], rate
+
+
+# Function giving a synthetic geophone signal: a heartbeat-like pulse train plus noise
+def synthetic_geophone(times, heart_rate=1.2, amplitude=300.0, noise=60.0, rng=None):
+    """ times in seconds, heart_rate in Hz. Returns float readings in ADC counts. """
+    rng = rng if rng is not None else np.random.default_rng(0)
+    phase = (np.asarray(times) * heart_rate) % 1.0
+    # Two short pulses per beat (the "lub" and "dub" of a heartbeat)
+    pulse = np.exp(-((phase - 0.1) / 0.04) ** 2) + 0.6 * np.exp(-((phase - 0.35) / 0.04) ** 2)
+    return amplitude * pulse + rng.normal(0, noise, size=np.shape(times))
+
+
+# Stand-in for Adafruit_ADS1x15.ADS1115 that produces synthetic_geophone() readings
+class FakeADS1115:
+    """ Conversions complete on the ADC's own clock, which runs clock_error
+    (a fraction, e.g. 0.02) fast or slow like the real chip's internal oscillator.
+    i2c_delay adds a delay to every register read.
+    """
+
+    def __init__(self, heart_rate=1.2, amplitude=300.0, noise=60.0, clock_error=0.0, i2c_delay=0.0, seed=0):
+        self.heart_rate = heart_rate
+        self.amplitude = amplitude
+        self.noise = noise
+        self.clock_error = clock_error
+        self.i2c_delay = i2c_delay
+        self.rng = np.random.default_rng(seed)
+        self.start_time = time.monotonic()
+        self.data_rate = None
+        self.reads = 0
+
+    def _value(self, conversion_time):
+        value = synthetic_geophone(conversion_time, self.heart_rate, self.amplitude, self.noise, self.rng)
+        return int(np.clip(value, -32768, 32767))
+
+    def _bus_delay(self):
+        self.reads += 1
+        if self.i2c_delay > 0:
+            time.sleep(self.i2c_delay)
+
+    def start_adc_difference(self, differential, gain=1, data_rate=128):
+        self.data_rate = data_rate
+        self.start_time = time.monotonic()
+
+    def stop_adc(self):
+        self.data_rate = None
+
+    def get_last_result(self):
+        self._bus_delay()
+        if self.data_rate is None:
+            return 0
+        period = 1.0 / (self.data_rate * (1.0 + self.clock_error))
+        conversions = int((time.monotonic() - self.start_time) / period)
+        return self._value(conversions * period)
+
+    def read_adc_difference(self, differential, gain=1, data_rate=128):
+        # Single-shot read: the Adafruit driver waits one conversion time before reading
+        time.sleep(1.0 / data_rate + 0.0001)
+        self._bus_delay()
+        return self._value(time.monotonic() - self.start_time)
+
+
+# Function to open the real ADC, or FakeADS1115 when GEOPHONE_FAKE_ADC is set
+def open_adc(address=0x48, busnum=1):
+    if os.environ.get(FAKE_ADC_ENV):
+        return FakeADS1115()
+    import Adafruit_ADS1x15
+    return Adafruit_ADS1x15.ADS1115(address=address, busnum=busnum)
@@ -0,0 +1,52 @@
+import time
+import numpy as np
+from geophone_acquisition import GeophoneAcquisition, FakeADS1115
+
+# Headless comparison of the old read + sleep(0.02) loop and the continuous-mode acquisition,
+# both on a FakeADS1115 with a known heartbeat frequency
+RUN_TIME = 10.0       # Seconds of data per case
+HEART_RATE = 1.2      # Hz, what the analysis should find
+I2C_DELAY = 0.0003    # Seconds per register read, roughly a 100 kHz I2C read of two bytes
+CLOCK_ERROR = 0.03    # The ADS1115 oscillator is only specified to within a few percent
+DATA_RATES = [128, 250, 860]
+
+
+# Function to find the strongest frequency in the heart rate band, given the sample rate the analysis assumes
+def peak_frequency(data, sample_rate, band=(0.5, 3.0)):
+    data = np.asarray(data, dtype=np.float64)
+    mags = np.abs(np.fft.rfft(data - data.mean()))
+    freqs = np.fft.rfftfreq(len(data), d=1.0 / sample_rate)
+    mags[(freqs < band[0]) | (freqs > band[1])] = 0
+    return freqs[np.argmax(mags)]
+
+
+# The original data_collect() loop, which assumes a 0.02 s interval
+def old_collect(adc, seconds):
+    data = []
+    start_time = time.monotonic()
+    while (time.monotonic() - start_time) < seconds:
+        data.append(adc.read_adc_difference(0, gain=16))
+        time.sleep(0.02)
+    return data, len(data) / (time.monotonic() - start_time)
+
+
+def main():
+    print(f"True heartbeat frequency: {HEART_RATE:.2f} Hz, {RUN_TIME:.0f} s per case")
+    print(f"{'method':<28}{'nominal Hz':>11}{'measured Hz':>13}{'late':>6}{'peak (nominal)':>16}{'peak (measured)':>17}")
+
+    adc = FakeADS1115(heart_rate=HEART_RATE, clock_error=CLOCK_ERROR, i2c_delay=I2C_DELAY)
+    data, rate = old_collect(adc, RUN_TIME)
+    print(f"{'read + sleep(0.02)':<28}{50:>11.1f}{rate:>13.2f}{'-':>6}"
+          f"{peak_frequency(data, 50):>16.2f}{peak_frequency(data, rate):>17.2f}")
+
+    for data_rate in DATA_RATES:
+        adc = FakeADS1115(heart_rate=HEART_RATE, clock_error=CLOCK_ERROR, i2c_delay=I2C_DELAY)
+        acquisition = GeophoneAcquisition(adc, data_rate=data_rate, block_size=data_rate)
+        data, rate = acquisition.acquire(RUN_TIME)
+        acquisition.stop()
+        print(f"{'continuous':<28}{data_rate:>11.1f}{rate:>13.2f}{acquisition.total_late:>6}"
+              f"{peak_frequency(data, data_rate):>16.2f}{peak_frequency(data, rate):>17.2f}")
+
+
+if __name__ == "__main__":
+    main()
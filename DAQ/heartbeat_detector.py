@@ -0,0 +1,160 @@
+import numpy as np
+from scipy.stats import chi2
+
+# Detector settings
+WINDOW_SECONDS = 4.0         # FFT segment length, 0.25 Hz resolution; a beat is seen once about 3 s of it are in
+HOP_SECONDS = 1.0            # A new segment (and a new result) every second
+AVERAGES = 16                # Segments averaged into the Welch estimate (19 s of data for weak beats)
+HEART_BAND = (0.7, 3.0)      # Hz searched for a heartbeat (42 to 180 beats per minute)
+NOISE_BAND = (0.5, 10.0)     # Hz used to estimate the noise floor around the heart band
+FALSE_ALARM_RATE = 0.001     # Chance per result that noise alone is reported as a heartbeat
+
+
+# Outcome of one detector update
+class HeartbeatResult:
+    def __init__(self, time, detected, frequency, snr, p_value):
+        self.time = time            # Timestamp of the newest sample in the estimate
+        self.detected = detected
+        self.frequency = frequency  # Hz of the strongest peak in the heart band
+        self.snr = snr              # Peak power over the estimated noise floor
+        self.p_value = p_value      # Chance of a peak this strong from noise alone, over the whole band
+
+    @property
+    def bpm(self):
+        return self.frequency * 60.0
+
+
+# Function to get the equivalent chi-squared degrees of freedom of a Welch estimate
+def welch_dof(window, hop, averages):
+    """ Overlapping segments are correlated, so averaging K of them is worth less
+    than 2K degrees of freedom (Welch 1967, eq. 9).
+    """
+    power = np.sum(window ** 2)
+    lag_sum = 0.0
+    for lag in range(1, averages):
+        shift = lag * hop
+        if shift >= len(window):
+            break
+        c = (np.sum(window[:-shift] * window[shift:]) / power) ** 2
+        lag_sum += (averages - lag) * c
+    return 2.0 * averages ** 2 / (averages + 2.0 * lag_sum)
+
+
+# Streaming heartbeat detector: a sliding Welch power spectrum updated one hop at a time
+class HeartbeatDetector:
+    """ push() sample blocks of any size. Every hop the newest window of samples is
+    transformed and added to a ring of the last `averages` power spectra, and the
+    strongest heart band peak is tested against the noise floor.
+
+    The noise floor is the median of the spectrum over NOISE_BAND. Noise power in a
+    Welch bin follows a scaled chi-squared distribution with welch_dof() degrees of
+    freedom, which gives the chance that noise alone makes a peak as strong as the
+    one seen; that chance is multiplied by the number of heart band bins searched.
+    Memory stays constant however long it runs.
+    """
+
+    def __init__(self, sample_rate, window_seconds=WINDOW_SECONDS, hop_seconds=HOP_SECONDS, averages=AVERAGES,
+                 band=HEART_BAND, noise_band=NOISE_BAND, false_alarm_rate=FALSE_ALARM_RATE):
+        self.sample_rate = sample_rate
+        self.window_size = int(round(window_seconds * sample_rate))
+        self.hop = max(1, int(round(hop_seconds * sample_rate)))
+        self.false_alarm_rate = false_alarm_rate
+        self.window = np.hanning(self.window_size)
+        ramp = np.linspace(-1.0, 1.0, self.window_size)
+        self.ramp = ramp / np.sqrt(ramp @ ramp)  # Unit vector, to remove each segment's linear trend
+
+        freqs = np.fft.rfftfreq(self.window_size, d=1.0 / sample_rate)
+        self.bins = np.flatnonzero(freqs <= noise_band[1])  # Only these bins are kept
+        self.freqs = freqs[self.bins]
+        self.band = np.flatnonzero((self.freqs >= band[0]) & (self.freqs <= band[1]))
+        self.noise = np.flatnonzero(self.freqs >= noise_band[0])
+
+        self.samples = np.zeros(self.window_size)                # Circular buffer of the newest samples
+        self.write = 0
+        self.filled = 0
+        self.since_hop = 0
+        self.spectra = np.zeros((averages, len(self.bins)))      # Ring of segment power spectra
+        self.spectrum_sum = np.zeros(len(self.bins))
+        self.spectrum_index = 0
+        self.spectrum_count = 0
+        self.segment = np.empty(self.window_size)
+
+        # Degrees of freedom and median of a unit-mean chi-squared bin, for 1 to `averages` segments
+        self.dofs = np.array([welch_dof(self.window, self.hop, k) for k in range(1, averages + 1)])
+        self.median_factors = chi2.ppf(0.5, self.dofs) / self.dofs
+
+    def push(self, samples, timestamp=None):
+        """ Add a block of samples. Returns the HeartbeatResults of every hop completed by it.
+
+        timestamp is the time of the block's last sample; result times are derived from it.
+        """
+        samples = np.asarray(samples, dtype=np.float64)
+        results = []
+        position = 0
+        while position < len(samples):
+            take = min(len(samples) - position, self.hop - self.since_hop)
+            self._store(samples[position:position + take])
+            position += take
+            self.since_hop += take
+            if self.since_hop == self.hop:
+                self.since_hop = 0
+                if self.filled == self.window_size:
+                    time = None
+                    if timestamp is not None:
+                        time = timestamp - (len(samples) - position) / self.sample_rate
+                    results.append(self._update(time))
+        return results
+
+    def _store(self, chunk):
+        end = self.write + len(chunk)
+        if end <= self.window_size:
+            self.samples[self.write:end] = chunk
+        else:
+            split = self.window_size - self.write
+            self.samples[self.write:] = chunk[:split]
+            self.samples[:end - self.window_size] = chunk[split:]
+        self.write = end % self.window_size
+        self.filled = min(self.window_size, self.filled + len(chunk))
+
+    def _update(self, time):
+        # Oldest sample first, without the DC offset and the linear trend (ground drift below the
+        # heart band would otherwise leak into its lowest bins with short segments)
+        self.segment[:self.window_size - self.write] = self.samples[self.write:]
+        self.segment[self.window_size - self.write:] = self.samples[:self.write]
+        self.segment -= self.segment.mean()
+        self.segment -= (self.segment @ self.ramp) * self.ramp
+        self.segment *= self.window
+        power = np.abs(np.fft.rfft(self.segment)[self.bins]) ** 2
+
+        self.spectrum_sum += power - self.spectra[self.spectrum_index]
+        self.spectra[self.spectrum_index] = power
+        self.spectrum_index = (self.spectrum_index + 1) % len(self.spectra)
+        if self.spectrum_index == 0:
+            self.spectrum_sum[:] = self.spectra.sum(axis=0)  # Drop accumulated rounding error
+        self.spectrum_count = min(self.spectrum_count + 1, len(self.spectra))
+        return self._test(self.spectrum_sum / self.spectrum_count, time)
+
+    def _test(self, spectrum, time):
+        dof = self.dofs[self.spectrum_count - 1]
+        peak = self.band[np.argmax(spectrum[self.band])]
+        noise_floor = np.median(spectrum[self.noise]) / self.median_factors[self.spectrum_count - 1]
+        if noise_floor <= 0:
+            return HeartbeatResult(time, False, 0.0, 0.0, 1.0)
+        snr = spectrum[peak] / noise_floor
+        p_value = min(1.0, chi2.sf(snr * dof, dof) * len(self.band))
+
+        # Refine the peak frequency between bins (parabola through the log powers)
+        frequency = self.freqs[peak]
+        if 0 < peak < len(spectrum) - 1:
+            left, centre, right = np.log(spectrum[peak - 1:peak + 2] + 1e-12)
+            curvature = left - 2 * centre + right
+            if curvature < 0:
+                frequency += 0.5 * (left - right) / curvature * (self.freqs[1] - self.freqs[0])
+        return HeartbeatResult(time, p_value < self.false_alarm_rate, frequency, snr, p_value)
+
+    def reset(self):
+        self.samples[:] = 0
+        self.write = self.filled = self.since_hop = 0
+        self.spectra[:] = 0
+        self.spectrum_sum[:] = 0
+        self.spectrum_index = self.spectrum_count = 0
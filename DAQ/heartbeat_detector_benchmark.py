@@ -0,0 +1,98 @@
+import time
+import numpy as np
+from geophone_acquisition import synthetic_geophone
+from heartbeat_detector import HeartbeatDetector
+
+# Synthetic recordings: noise only, then a heartbeat that starts at ONSET seconds
+SAMPLE_RATE = 250
+BLOCK_SIZE = 250
+NOISE_SECONDS = 1800.0       # Length of the noise-only recording used to count false alarms
+ONSET = 60.0                 # When the heartbeat starts in the detection recordings
+RECORDING_SECONDS = 120.0
+HEART_RATE = 1.2             # Hz
+NOISE = 60.0                 # ADC counts (standard deviation)
+AMPLITUDES = [300.0, 100.0, 50.0, 30.0]
+ONSETS = 10                  # Recordings per amplitude (different noise) for the onset latency
+LATENCY_TARGET = 5.0         # Seconds from onset to the first detection (median over the recordings)
+
+
+# Function to make a recording: white noise, a slow drift and an optional heartbeat from `onset`
+def synthetic_recording(seconds, amplitude, onset=0.0, seed=0):
+    rng = np.random.default_rng(seed)
+    times = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    data = synthetic_geophone(times, HEART_RATE, amplitude, NOISE, rng)
+    data[times < onset] = rng.normal(0, NOISE, size=np.count_nonzero(times < onset))
+    data += 200 * np.sin(2 * np.pi * 0.1 * times)  # Ground drift, below the heart band
+    return data
+
+
+# Function to feed a recording to the detector a block at a time: returns (results, seconds per block)
+def run_detector(data):
+    detector = HeartbeatDetector(SAMPLE_RATE)
+    results = []
+    start_time = time.perf_counter()
+    blocks = 0
+    for start in range(0, len(data), BLOCK_SIZE):
+        block = data[start:start + BLOCK_SIZE]
+        results.extend(detector.push(block, (start + len(block) - 1) / SAMPLE_RATE))
+        blocks += 1
+    return results, (time.perf_counter() - start_time) / blocks, detector
+
+
+# The original approach: one FFT of a 20 s batch, then 30 s of sleep. Returns the first detection time.
+def old_first_detection(data, threshold=3):
+    batch, cycle = int(20 * SAMPLE_RATE), int(50 * SAMPLE_RATE)
+    for start in range(0, len(data) - batch + 1, cycle):
+        segment = data[start:start + batch]
+        mags = np.abs(np.fft.rfft(segment - segment.mean()))
+        freqs = np.fft.rfftfreq(len(segment), d=1.0 / SAMPLE_RATE)
+        peak = np.argmax(mags)
+        if mags[peak] > np.mean(mags) * threshold and 0.7 <= freqs[peak] <= 3.0:
+            return (start + batch) / SAMPLE_RATE
+    return None
+
+
+def main():
+    results, block_time, detector = run_detector(synthetic_recording(NOISE_SECONDS, 0.0, seed=1))
+    false_alarms = sum(result.detected for result in results)
+    memory = detector.samples.nbytes + detector.spectra.nbytes + detector.segment.nbytes
+    print(f"Noise only: {false_alarms} false alarms in {len(results)} results over {NOISE_SECONDS:.0f} s")
+    print(f"Processing: {block_time * 1e6:.0f} us per {BLOCK_SIZE}-sample block, detector buffers {memory / 1024:.0f} KiB")
+    print()
+
+    print(f"Heartbeat {HEART_RATE} Hz from t={ONSET:.0f} s, noise sd {NOISE:.0f}, {ONSETS} recordings per amplitude")
+    print(f"{'amplitude':>10}{'latency median/max (s)':>24}{'missed':>8}{'detected %':>12}{'freq error (Hz)':>17}"
+          f"{'old latency (s)':>17}")
+    for amplitude in AMPLITUDES:
+        latencies, detected, errors = [], [], []
+        for seed in range(2, 2 + ONSETS):
+            data = synthetic_recording(RECORDING_SECONDS, amplitude, ONSET, seed=seed)
+            results, _, _ = run_detector(data)
+            after = [result for result in results if result.time >= ONSET]
+            hits = [result for result in after if result.detected]
+            latencies.append(hits[0].time - ONSET if hits else np.inf)
+            detected.append(len(hits) / len(after))
+            errors += [abs(result.frequency - HEART_RATE) for result in hits]
+            if seed == 2:
+                old = old_first_detection(data)
+        found = [latency for latency in latencies if np.isfinite(latency)]
+        median = np.median(latencies)
+        latency = f"{median:.1f} / {max(found):.1f}" if np.isfinite(median) else "-"
+        error = f"{np.mean(errors):.3f}" if errors else "-"
+        if old is None:
+            old_latency = "missed"
+        elif old < ONSET:
+            old_latency = "false alarm"
+        else:
+            old_latency = f"{old - ONSET:.1f}"
+        print(f"{amplitude:>10.0f}{latency:>24}{len(latencies) - len(found):>8}{100 * np.mean(detected):>12.0f}"
+              f"{error:>17}{old_latency:>17}")
+
+        # Onset latency check: beats at least as strong as the noise must typically be seen within LATENCY_TARGET
+        if amplitude >= NOISE:
+            within = median <= LATENCY_TARGET
+            print(f"{'':>10}onset latency within {LATENCY_TARGET:.0f} s: {'yes' if within else 'NO'}")
+
+
+if __name__ == "__main__":
+    main()
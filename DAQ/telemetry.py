@@ -0,0 +1,164 @@
+import os
+import struct
+import time
+import numpy as np
+
+# Telemetry file layout: a 16 byte header followed by records that are only ever appended.
+# Every record is a fixed header, the array's shape (one uint32 per dimension) and the raw
+# little-endian data. A stream is declared by name once per file, before its first record,
+# so every file can be read on its own, and a crash can at worst leave one partial record.
+MAGIC = b"TELEMTR1"
+HEADER_SIZE = 16
+RECORD_HEADER = struct.Struct("<HBBBxxxId")  # Stream, kind, dtype, dimensions, payload bytes, time
+DECLARE, ARRAY, TEXT = 0, 1, 2
+DTYPES = [np.dtype(t) for t in ("<f4", "<f8", "<i2", "<i4", "<i8", "<u1", "<u2", "<u4")]
+
+# Writer settings
+BUFFER_SIZE = 256 * 1024          # Bytes collected in memory before they go to the file
+SYNC_INTERVAL = 5.0               # Seconds between fsync() calls (what a power cut can lose)
+MAX_FILE_SIZE = 64 * 1024 * 1024  # A new file is started past this size
+MAX_FILES = 50                    # Oldest files are deleted past this many, None keeps them all
+
+
+# Class that appends timestamped arrays and text to rotating binary files through one open handle
+class TelemetryWriter:
+    """ Records go through a large write buffer and the file is fsync'd every
+    SYNC_INTERVAL seconds, instead of opening and closing a CSV file for every row,
+    which on the Pi's SD card is slow and wears the card. Files are named
+    <prefix>_<date>_<time>_<number>.tlm inside the directory.
+    """
+
+    def __init__(self, directory=".", prefix="telemetry", max_file_size=MAX_FILE_SIZE, max_files=MAX_FILES,
+                 sync_interval=SYNC_INTERVAL, buffer_size=BUFFER_SIZE):
+        self.directory = directory
+        self.prefix = prefix
+        self.max_file_size = max_file_size
+        self.max_files = max_files
+        self.sync_interval = sync_interval
+        self.buffer_size = buffer_size
+        self.started = time.strftime("%Y%m%d_%H%M%S")
+        os.makedirs(directory, exist_ok=True)
+
+        self.streams = {}     # Name -> stream number
+        self.declared = set()  # Streams declared in the current file
+        self.paths = []       # Files of this writer that still exist, oldest first
+        self.file_number = 0
+        self.file = None
+        self.file_size = 0
+        self.last_sync = time.monotonic()
+        self.records = 0
+        self.bytes_written = 0
+        self.syncs = 0
+        self._open_next()
+
+    def _open_next(self):
+        if self.file is not None:
+            self._sync()
+            self.file.close()
+        path = os.path.join(self.directory, f"{self.prefix}_{self.started}_{self.file_number:04d}.tlm")
+        self.file_number += 1
+        self.file = open(path, "ab", buffering=self.buffer_size)
+        self.file.write(MAGIC.ljust(HEADER_SIZE, b"\0"))
+        self.file_size = HEADER_SIZE
+        self.paths.append(path)
+        self.declared = set()
+        if self.max_files is not None:
+            while len(self.paths) > self.max_files:
+                os.remove(self.paths.pop(0))
+
+    def _sync(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.last_sync = time.monotonic()
+        self.syncs += 1
+
+    def _write_record(self, stream, kind, dtype, shape, payload, timestamp):
+        header = RECORD_HEADER.pack(stream, kind, dtype, len(shape), len(payload), timestamp)
+        dims = np.asarray(shape, dtype="<u4").tobytes()
+        self.file.write(header)
+        self.file.write(dims)
+        self.file.write(payload)
+        size = len(header) + len(dims) + len(payload)
+        self.file_size += size
+        self.bytes_written += size
+
+    def write(self, name, value, timestamp=None):
+        """ Append an array (e.g. a raw thermal frame or ADC block) or a string to the named stream. """
+        if timestamp is None:
+            timestamp = time.time()
+        if not isinstance(value, str):
+            # Checked before anything is written, so a bad value leaves no record behind
+            value = np.asarray(value)
+            dtype = value.dtype.newbyteorder("<") if value.dtype.byteorder == ">" else value.dtype
+            if dtype not in DTYPES:
+                raise ValueError(f"Stream {name!r}: dtype {value.dtype} is not supported, "
+                                 f"use one of {', '.join(str(t) for t in DTYPES)}")
+            shape = value.shape  # ascontiguousarray() turns a scalar into shape (1,)
+            value = np.ascontiguousarray(value, dtype=dtype)
+        if self.file_size >= self.max_file_size:
+            self._open_next()
+        stream = self.streams.setdefault(name, len(self.streams))
+        if stream not in self.declared:
+            self._write_record(stream, DECLARE, 0, (), name.encode("utf-8"), timestamp)
+            self.declared.add(stream)
+
+        if isinstance(value, str):
+            self._write_record(stream, TEXT, 0, (), value.encode("utf-8"), timestamp)
+        else:
+            self._write_record(stream, ARRAY, DTYPES.index(dtype), shape, value.data.cast("B"), timestamp)
+        self.records += 1
+
+        if time.monotonic() - self.last_sync >= self.sync_interval:
+            self._sync()
+
+    def close(self):
+        if self.file is not None:
+            self._sync()
+            self.file.close()
+            self.file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _check_header(path, data):
+    if data[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"{path} is not a telemetry file")
+
+
+# Function to read a telemetry file back: yields (stream name, timestamp, array or string)
+def read_records(path):
+    """ Arrays are read-only views of the file's contents. A partial record at the end is ignored. """
+    with open(path, "rb") as f:
+        data = f.read()
+    _check_header(path, data)
+    names = {}
+    position = HEADER_SIZE
+    while position + RECORD_HEADER.size <= len(data):
+        stream, kind, dtype, ndim, length, timestamp = RECORD_HEADER.unpack_from(data, position)
+        start = position + RECORD_HEADER.size + 4 * ndim
+        end = start + length
+        if end > len(data):
+            break
+        shape = struct.unpack_from(f"<{ndim}I", data, position + RECORD_HEADER.size)
+        position = end
+        if kind == DECLARE:
+            names[stream] = data[start:end].decode("utf-8")
+        elif kind == TEXT:
+            yield names[stream], timestamp, data[start:end].decode("utf-8")
+        else:
+            yield names[stream], timestamp, np.frombuffer(data, dtype=DTYPES[dtype], count=length // DTYPES[dtype].itemsize,
+                                                          offset=start).reshape(shape)
+
+
+# Function to collect every record of one stream: returns (timestamps, list of values)
+def read_stream(path, name):
+    times, values = [], []
+    for stream, timestamp, value in read_records(path):
+        if stream == name:
+            times.append(timestamp)
+            values.append(value)
+    return np.array(times), values
@@ -0,0 +1,77 @@
+import csv
+import os
+import sys
+import time
+import numpy as np
+from telemetry import read_records
+
+# Converts telemetry files written by telemetry.py into one CSV (or Parquet) file per stream.
+# Usage: python telemetry_export.py [--parquet] <file.tlm> [<file.tlm> ...]
+# Each row is a record: its date & time, then the flattened array or the text.
+
+
+# Function to gather every record of every stream in the given files, in file order
+def collect(paths):
+    streams = {}
+    for path in paths:
+        for name, timestamp, value in read_records(path):
+            streams.setdefault(name, []).append((timestamp, value))
+    return streams
+
+
+def _output_path(first_path, name, extension):
+    base = os.path.splitext(first_path)[0]
+    return f"{base}_{name.replace(' ', '_')}.{extension}"
+
+
+def _columns(records):
+    value = records[0][1]
+    if isinstance(value, str):
+        return ["Text"]
+    return [f"Value {i}" for i in range(np.size(value))]
+
+
+def write_csv(path, records):
+    with open(path, mode="w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(["Date & Time", "Time (s)"] + _columns(records))
+        for timestamp, value in records:
+            date_time = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(timestamp))
+            values = [value] if isinstance(value, str) else np.ravel(value).tolist()
+            writer.writerow([date_time, f"{timestamp:.6f}"] + values)
+
+
+def write_parquet(path, records):
+    import pandas as pd
+    columns = _columns(records)
+    if columns == ["Text"]:
+        table = pd.DataFrame({"Text": [value for _, value in records]})
+    else:
+        table = pd.DataFrame(np.array([np.ravel(value) for _, value in records]), columns=columns)
+    table.insert(0, "Time (s)", [timestamp for timestamp, _ in records])
+    table.to_parquet(path)
+
+
+def main(args):
+    parquet = "--parquet" in args
+    paths = [arg for arg in args if arg != "--parquet"]
+    if not paths:
+        print("Usage: python telemetry_export.py [--parquet] <file.tlm> [<file.tlm> ...]")
+        return 1
+    for name, records in collect(paths).items():
+        try:
+            if parquet:
+                output = _output_path(paths[0], name, "parquet")
+                write_parquet(output, records)
+            else:
+                output = _output_path(paths[0], name, "csv")
+                write_csv(output, records)
+        except ImportError as e:
+            print(f"Parquet export needs pandas and pyarrow: Error {e}")
+            return 1
+        print(f"{name}: {len(records)} records -> {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
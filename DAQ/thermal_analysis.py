@@ -0,0 +1,131 @@
+import numpy as np
+from scipy import ndimage
+#thermal_capture.py is in the "ThermalCam Code" folder and needs to be copied next to this file
+from thermal_capture import FRAME_SHAPE
+
+# Classification settings (degrees C)
+HOT_THRESHOLD = 30.0      # Pixels at least this warm are segmented into blobs ...
+BACKGROUND_MARGIN = 4.0   # ... and at least this much warmer than the frame's median
+HUMAN_RANGE = (30.0, 50.0)
+FIRE_THRESHOLD = 200.0
+
+# 8-connected neighbourhood, so a diagonal pair of pixels is one blob
+_STRUCTURE = np.ones((3, 3), dtype=bool)
+
+
+# Whole-frame statistics
+class FrameStats:
+    def __init__(self, frame):
+        self.min = float(frame.min())
+        self.max = float(frame.max())
+        self.mean = float(frame.mean())
+        self.median = float(np.median(frame))
+        self.std = float(frame.std())
+
+
+# One connected region of hot pixels
+class Blob:
+    def __init__(self, area, centroid, bbox, max_temp, mean_temp):
+        self.area = area            # Pixels
+        self.centroid = centroid    # (row, column), weighted by temperature above the threshold
+        self.bbox = bbox            # (top, left, bottom, right), bottom and right exclusive
+        self.max_temp = max_temp
+        self.mean_temp = mean_temp
+        self.label = classify_blob(max_temp)
+
+
+# Function to classify a blob by its hottest pixel
+def classify_blob(max_temp):
+    if max_temp > FIRE_THRESHOLD:
+        return "fire"
+    if HUMAN_RANGE[0] <= max_temp <= HUMAN_RANGE[1]:
+        return "human"
+    return "hot"
+
+
+# Result of analyzing one frame
+class FrameAnalysis:
+    def __init__(self, stats, blobs, threshold):
+        self.stats = stats
+        self.blobs = blobs          # Largest first
+        self.threshold = threshold  # Temperature the frame was segmented at
+
+    def labels(self):
+        return {blob.label for blob in self.blobs}
+
+    def message(self):
+        """ The message the DAQ logs for this frame (fire takes priority over a human). """
+        labels = self.labels()
+        if "fire" in labels:
+            return "Don't go further. There may be a fire up ahead."
+        if "human" in labels:
+            return "There may be a human there."
+        return "N/A"
+
+
+# Class that finds and classifies the hot regions of thermal frames
+class ThermalAnalyzer:
+    """ Thresholds a frame at max(HOT_THRESHOLD, median + BACKGROUND_MARGIN), labels the
+    connected hot regions and measures every region at once with bincount, so a
+    small warm region is judged on its own pixels instead of the frame average.
+    """
+
+    def __init__(self, hot_threshold=HOT_THRESHOLD, background_margin=BACKGROUND_MARGIN, min_area=1):
+        self.hot_threshold = hot_threshold
+        self.background_margin = background_margin
+        self.min_area = min_area
+        self.mask = np.zeros(FRAME_SHAPE, dtype=bool)
+        self.labels = np.zeros(FRAME_SHAPE, dtype=np.int32)
+        rows, cols = np.indices(FRAME_SHAPE)
+        self.rows = rows.ravel()
+        self.cols = cols.ravel()
+
+    def analyze(self, frame):
+        """ frame is anything with 768 temperatures (a list from getFrame() or a 24x32 array). """
+        frame = np.asarray(frame, dtype=np.float32).reshape(FRAME_SHAPE)
+        stats = FrameStats(frame)
+        threshold = max(self.hot_threshold, stats.median + self.background_margin)
+        np.greater_equal(frame, threshold, out=self.mask)
+        count = ndimage.label(self.mask, structure=_STRUCTURE, output=self.labels)
+        return FrameAnalysis(stats, self._measure(frame, count, threshold), threshold)
+
+    def _measure(self, frame, count, threshold):
+        if count == 0:
+            return []
+        labels = self.labels.ravel()
+        temps = frame.ravel().astype(np.float64)
+        size = count + 1
+        area = np.bincount(labels, minlength=size)
+        total = np.bincount(labels, weights=temps, minlength=size)
+        weight = np.bincount(labels, weights=temps - threshold + 1e-3, minlength=size)
+        row_sum = np.bincount(labels, weights=(temps - threshold + 1e-3) * self.rows, minlength=size)
+        col_sum = np.bincount(labels, weights=(temps - threshold + 1e-3) * self.cols, minlength=size)
+        max_temp = np.full(size, -np.inf)
+        np.maximum.at(max_temp, labels, temps)
+        boxes = ndimage.find_objects(self.labels, count)
+
+        blobs = []
+        for i in np.argsort(-area[1:]) + 1:
+            if area[i] < self.min_area:
+                break
+            rows, cols = boxes[i - 1]
+            blobs.append(Blob(int(area[i]), (float(row_sum[i] / weight[i]), float(col_sum[i] / weight[i])),
+                              (rows.start, cols.start, rows.stop, cols.stop),
+                              float(max_temp[i]), float(total[i] / area[i])))
+        return blobs
+
+
+# Function to make a synthetic frame: a room at `ambient` with warm people and fires in it
+def synthetic_frame(rng, people=(), fires=(), ambient=20.0, noise=0.3):
+    """ people and fires are lists of (row, column, height, width) in pixels.
+
+    A person is a soft ellipse peaking near skin temperature; a fire peaks at a few
+    hundred degrees. Returns a 24x32 float32 frame in degrees C.
+    """
+    rows, cols = np.indices(FRAME_SHAPE, dtype=np.float32)
+    frame = ambient + 1.5 * cols / FRAME_SHAPE[1] + rng.normal(0, noise, FRAME_SHAPE)
+    for sources, peak in ((people, rng.uniform(33.0, 36.0)), (fires, rng.uniform(300.0, 600.0))):
+        for row, col, height, width in sources:
+            shape = np.exp(-(((rows - row) / (height / 2.0)) ** 2 + ((cols - col) / (width / 2.0)) ** 2) ** 2)
+            frame = np.maximum(frame, ambient + (peak - ambient) * shape)
+    return frame.astype(np.float32)
@@ -0,0 +1,50 @@
+import time
+import numpy as np
+from thermal_analysis import ThermalAnalyzer, synthetic_frame
+
+# Synthetic scenes: empty, a nearby person, a distant (2 pixel) person, and a fire
+FRAMES_PER_SCENE = 500
+SCENES = {
+    "empty room": dict(),
+    "person, 3 m": dict(people=[(12, 16, 12, 5)]),
+    "person, 15 m": dict(people=[(10, 20, 2, 1)]),
+    "fire": dict(fires=[(18, 6, 4, 4)]),
+}
+
+
+# The original per-frame check in ThermalCamDAQ.py: only the average temperature of the frame
+def old_message(frame):
+    avg_temp_C = sum(frame) / len(frame)
+    if avg_temp_C > 30 and avg_temp_C < 50:
+        return "There may be a human there."
+    elif avg_temp_C > 200:
+        return "Don't go further. There may be a fire up ahead."
+    return "N/A"
+
+
+def main():
+    rng = np.random.default_rng(0)
+    analyzer = ThermalAnalyzer()
+    slowest = 0.0
+    print(f"{'scene':<14}{'old us/frame':>14}{'new us/frame':>14}{'old message':>30}{'new message':>30}")
+    for name, sources in SCENES.items():
+        frames = [synthetic_frame(rng, **sources) for _ in range(FRAMES_PER_SCENE)]
+        lists = [frame.ravel().tolist() for frame in frames]  # What mlx.getFrame() fills in
+
+        start_time = time.perf_counter()
+        old = [old_message(frame) for frame in lists]
+        old_time = (time.perf_counter() - start_time) / len(frames)
+
+        start_time = time.perf_counter()
+        new = [analyzer.analyze(frame).message() for frame in lists]
+        new_time = (time.perf_counter() - start_time) / len(frames)
+
+        slowest = max(slowest, new_time)
+        old_common = max(set(old), key=old.count)[:28]
+        new_common = max(set(new), key=new.count)[:28]
+        print(f"{name:<14}{old_time * 1e6:>14.0f}{new_time * 1e6:>14.0f}{old_common:>30}{new_common:>30}")
+    print(f"Slowest scene: {1 / slowest:.0f} frames/s, {100 * slowest * 32:.1f}% of one core at the sensor's 32 Hz")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,47 +2,39 @@ import matplotlib
 matplotlib.use('QtAgg')  # Ensure the QtAgg backend is set before importing pyplot
 
 import sys
-import time
-import Adafruit_ADS1x15
 import matplotlib.pyplot as plt
-import matplotlib.animation as animation
 from multiprocessing import Process, Queue
 from PyQt5.QtWidgets import QApplication, QMainWindow, QVBoxLayout, QWidget
 from PyQt5.QtCore import QTimer
+from geophone_plot import BlitPlot, MAX_FPS
+from geophone_transport import BlockSender, BlockReceiver, block_size_for
+from geophone_acquisition import GeophoneAcquisition, open_adc
 
-# Create an ADS1115 ADC (16-bit) instance
-adc = Adafruit_ADS1x15.ADS1115(address=0x48, busnum=1)
+# Create an ADS1115 ADC (16-bit) instance (set GEOPHONE_FAKE_ADC=1 to run without the sensor)
+adc = open_adc(address=0x48, busnum=1)
 
 # Choose a gain for reading voltages (16 = +/-0.256V)
 GAIN = 16
 
+# Sampling rate, one of the ADS1115 rates (8, 16, 32, 64, 128, 250, 475 or 860 samples per second)
+DATA_RATE = 250
+
 # Graph settings
-x_len = 500  # Number of points to display
+DISPLAY_SECONDS = 20  # Seconds of data shown
+x_len = DISPLAY_SECONDS * DATA_RATE  # Number of points to display
 y_range = [-750, 750]  # Y-axis range
 
-# Sampling rate control (approximately 25 samples per second)
-sampling_interval = 0.04  # In seconds (25Hz)
+# Samples are sent to the window in blocks rather than one queue message each
+QUEUE_BLOCKS = 100  # Blocks the queue can hold before new ones are dropped
 
 # Function to generate data
 def generate_data(queue):
-    """Simulate data collection from the ADC."""
+    """Read the ADC in continuous mode and send the readings a block at a time."""
+    acquisition = GeophoneAcquisition(adc, gain=GAIN, data_rate=DATA_RATE, block_size=block_size_for(DATA_RATE))
+    sender = BlockSender(queue)
     while True:
-        value = adc.read_adc_difference(0, gain=GAIN)
-        queue.put(value)
-        time.sleep(sampling_interval)  # Control the sampling rate to 25Hz
-
-# Function to animate the plot
-def animate(i, ys, queue, line):
-    if not queue.empty():
-        value = queue.get()  # Get new data from the queue
-        ys.append(value)
-    
-    ys = ys[-x_len:]  # Limit to x_len number of data points
-    
-    # Update the line with new Y values
-    line.set_ydata(ys)
-    
-    return line,
+        block = acquisition.read_block()
+        sender.send(block.samples, block.end_time)
 
 # Main window with live graph
 class GeophoneVisualization(QMainWindow):
@@ -62,7 +54,7 @@ class GeophoneVisualization(QMainWindow):
         self.fig, self.ax = plt.subplots()
         self.ax.set_ylim(y_range)
         self.ax.set_title('Geophone Data')
-        self.ax.set_xlabel('Data Points (Approximately 25 Readings each Second)')
+        self.ax.set_xlabel(f'Data Points ({DATA_RATE} Readings each Second)')
         self.ax.set_ylabel('Voltage Value Post Gain Adjustment')
 
         # Initialize data
@@ -71,32 +63,33 @@ class GeophoneVisualization(QMainWindow):
         self.line, = self.ax.plot(self.xs, self.ys)
 
         # Set up the queue for multiprocessing
-        self.queue = Queue()
+        self.queue = Queue(maxsize=QUEUE_BLOCKS)
+        self.receiver = BlockReceiver(self.queue)
         
         # Start the data generation process in a separate process
         self.p = Process(target=generate_data, args=(self.queue,))
         self.p.daemon = True  # Allow the process to exit when the main program exits
         self.p.start()
 
-        # Set up FuncAnimation for live updates
-        self.ani = animation.FuncAnimation(self.fig, animate, fargs=(self.ys, self.queue, self.line), interval=50, blit=True)
-
         # Embed the plot into the PyQt5 window
         from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg  # Import this here
         self.canvas = FigureCanvasQTAgg(self.fig)
         layout.addWidget(self.canvas)
 
-        # Set up a timer to periodically update the UI and process events
+        # The last x_len samples are kept in a fixed ring buffer and only the line is redrawn
+        self.plot = BlitPlot(self.ax, self.line, x_len)
+
+        # Set up a timer to move new samples to the plot, at most MAX_FPS times a second
         self.timer = QTimer(self)
-        self.timer.timeout.connect(self.update_ui)
-        self.timer.start(50)  # 50ms for smooth UI updates
+        self.timer.timeout.connect(self.update_plot)
+        self.timer.start(int(1000 / MAX_FPS))
 
         self.show()
 
-    def update_ui(self):
-        """Periodically updates the UI and processes events."""
-        QApplication.processEvents()  # Allow UI to process events (keep the UI responsive)
-        self.canvas.draw()  # Redraw the canvas to show the updated plot
+    def update_plot(self):
+        """Takes all samples that arrived since the last frame and redraws the line if there were any."""
+        self.plot.add(self.receiver.receive())
+        self.plot.update()
 
     def closeEvent(self, event):
         """Override close event to stop the data generation process"""
@@ -0,0 +1,91 @@
+from queue import Empty
+import numpy as np
+
+# Fastest the plot is redrawn (frames per second); frames without new samples are skipped
+MAX_FPS = 30
+
+
+# Function to take every sample waiting in a multiprocessing queue
+def drain_queue(queue):
+    values = []
+    try:
+        while True:
+            values.append(queue.get_nowait())
+    except Empty:
+        pass
+    return values
+
+
+# Fixed-size ring of the newest samples, so the plot's memory never grows
+class SampleRing:
+    def __init__(self, length, dtype=np.float32):
+        self.data = np.zeros(length, dtype=dtype)
+        self.write = 0   # Index the next sample goes to (also the oldest sample)
+        self.total = 0   # Samples added since the start
+
+    def extend(self, values):
+        values = np.asarray(values)
+        length = len(self.data)
+        count = len(values)
+        if count >= length:
+            self.data[:] = values[-length:]
+            self.write = 0
+        else:
+            end = self.write + count
+            if end <= length:
+                self.data[self.write:end] = values
+            else:
+                split = length - self.write
+                self.data[self.write:] = values[:split]
+                self.data[:end - length] = values[split:]
+            self.write = end % length
+        self.total += count
+
+    def ordered(self, out):
+        """ Copies the samples into out, oldest first, and returns it. """
+        split = len(self.data) - self.write
+        out[:split] = self.data[self.write:]
+        out[split:] = self.data[:self.write]
+        return out
+
+
+# Live line plot that only redraws the line on top of a cached background (blitting)
+class BlitPlot:
+    """ The axes, labels and grid are drawn once into a background image, which
+    is saved again whenever the canvas is fully redrawn (e.g. on a resize). A
+    frame restores that image, draws the line and blits the axes area; update()
+    does nothing when no samples arrived since the last frame.
+    """
+
+    def __init__(self, ax, line, length):
+        self.ax = ax
+        self.line = line
+        self.canvas = ax.figure.canvas
+        self.ring = SampleRing(length)
+        self.ydata = np.zeros(length, dtype=np.float32)
+        self.background = None
+        self.dirty = False
+        self.frames = 0
+        line.set_animated(True)  # Keep the line out of full redraws, it is drawn by update()
+        self.canvas.mpl_connect("draw_event", self._on_draw)
+
+    def _on_draw(self, event):
+        self.background = self.canvas.copy_from_bbox(self.ax.bbox)
+        self.dirty = True
+
+    def add(self, values):
+        if len(values):
+            self.ring.extend(values)
+            self.dirty = True
+
+    def update(self):
+        """ Draw a frame if there is anything new. Returns True if a frame was drawn. """
+        if not self.dirty or self.background is None:
+            return False
+        self.canvas.restore_region(self.background)
+        self.line.set_ydata(self.ring.ordered(self.ydata))
+        self.ax.draw_artist(self.line)
+        self.canvas.blit(self.ax.bbox)
+        self.dirty = False
+        self.frames += 1
+        return True
@@ -0,0 +1,110 @@
+import matplotlib
+matplotlib.use("Agg")  # Run headless (no window needed)
+
+import time
+from multiprocessing import Process, Queue, Value
+import numpy as np
+import matplotlib.pyplot as plt
+from geophone_plot import BlitPlot, MAX_FPS, drain_queue
+
+# Same graph settings as geophone_data_visualization.py
+x_len = 500
+y_range = [-750, 750]
+
+RUN_TIME = 5.0                # Seconds per case
+SAMPLE_RATES = [25, 250, 860]
+
+
+# Producer: puts one sample per reading like generate_data(), on an exact schedule.
+# The value is the sample number, so the consumer knows when the sample it shows was taken.
+def produce(queue, sample_rate, start_time, cpu_seconds):
+    cpu_start = time.process_time()
+    for n in range(int(sample_rate * RUN_TIME)):
+        delay = start_time + n / sample_rate - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        queue.put(n)
+    cpu_seconds.value = time.process_time() - cpu_start
+
+
+def make_plot():
+    fig, ax = plt.subplots()
+    ax.set_ylim(y_range)
+    line, = ax.plot(range(x_len), [0] * x_len)
+    return fig, ax, line
+
+
+# The original consumer: one queue.get() per 50 ms tick and a full redraw of the canvas
+def old_frame(state, queue):
+    if not queue.empty():
+        state["ys"].append(queue.get())
+    ys = state["ys"][-x_len:]
+    state["line"].set_ydata([y % 1500 - 750 for y in ys])
+    state["fig"].canvas.draw()
+    return state["ys"][-1] if state["ys"] else None
+
+
+def old_setup():
+    fig, ax, line = make_plot()
+    return {"fig": fig, "line": line, "ys": [0] * x_len}, 0.05
+
+
+# The new consumer: drain everything waiting, then blit the line if anything arrived
+def new_frame(state, queue):
+    values = drain_queue(queue)
+    state["plot"].add(np.asarray(values) % 1500 - 750)
+    state["plot"].update()
+    return values[-1] if values else None
+
+
+def new_setup():
+    fig, ax, line = make_plot()
+    plot = BlitPlot(ax, line, x_len)
+    fig.canvas.draw()  # First full draw saves the background
+    return {"plot": plot}, 1.0 / MAX_FPS
+
+
+# Function to run one case: returns (consumer CPU %, producer CPU %, mean latency, samples behind at the end)
+def run_case(setup, frame, sample_rate):
+    state, interval = setup()
+    queue = Queue()
+    cpu_seconds = Value("d", 0.0)
+    start_time = time.monotonic() + 0.5
+    producer = Process(target=produce, args=(queue, sample_rate, start_time, cpu_seconds))
+    producer.start()
+
+    latencies = []
+    newest = -1
+    time.sleep(max(0.0, start_time - time.monotonic()))
+    cpu_start = time.process_time()
+    next_frame = time.monotonic()
+    while time.monotonic() - start_time < RUN_TIME:
+        shown = frame(state, queue)
+        now = time.monotonic()
+        if shown is not None:
+            newest = shown
+        if newest >= 0:
+            latencies.append(now - (start_time + newest / sample_rate))
+        next_frame += interval
+        time.sleep(max(0.0, next_frame - time.monotonic()))
+    consumer_cpu = 100.0 * (time.process_time() - cpu_start) / RUN_TIME
+
+    produced = int(sample_rate * RUN_TIME)
+    while producer.is_alive():  # A producer cannot exit while its queue still holds samples
+        drain_queue(queue)
+        producer.join(0.1)
+    plt.close("all")
+    return consumer_cpu, 100.0 * cpu_seconds.value / RUN_TIME, np.mean(latencies), produced - 1 - newest
+
+
+def main():
+    print(f"{'method':<28}{'rate':>6}{'plot CPU %':>12}{'reader CPU %':>14}{'latency (s)':>13}{'behind':>8}")
+    for name, setup, frame in [("list + full redraw (old)", old_setup, old_frame),
+                               ("ring buffer + blitting", new_setup, new_frame)]:
+        for sample_rate in SAMPLE_RATES:
+            consumer_cpu, producer_cpu, latency, behind = run_case(setup, frame, sample_rate)
+            print(f"{name:<28}{sample_rate:>6}{consumer_cpu:>12.1f}{producer_cpu:>14.1f}{latency:>13.3f}{behind:>8}")
+
+
+if __name__ == "__main__":
+    main()
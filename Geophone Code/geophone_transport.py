@@ -0,0 +1,59 @@
+from queue import Empty, Full
+import numpy as np
+
+# Blocks are sent about this often, so even at 860 samples/s the queue carries ~20 messages a second
+BLOCK_SECONDS = 0.05
+
+
+# Function to pick a block size for a sample rate
+def block_size_for(sample_rate, block_seconds=BLOCK_SECONDS):
+    return max(1, int(sample_rate * block_seconds))
+
+
+# Producer side: sends blocks of samples with a sequence number through a multiprocessing queue
+class BlockSender:
+    """ Each message is (sequence, timestamp, raw bytes of the block). The bytes
+    are copied when send() is called, so the caller can reuse its buffer straight
+    away. If the queue is full the block is dropped instead of stalling sampling;
+    the receiver sees the gap in the sequence numbers.
+    """
+
+    def __init__(self, queue):
+        self.queue = queue
+        self.sequence = 0
+        self.dropped = 0
+
+    def send(self, samples, timestamp):
+        try:
+            self.queue.put_nowait((self.sequence, timestamp, np.ascontiguousarray(samples).tobytes()))
+        except Full:
+            self.dropped += 1
+        self.sequence += 1
+
+
+# Consumer side: takes every block waiting in the queue
+class BlockReceiver:
+    def __init__(self, queue, dtype=np.int16):
+        self.queue = queue
+        self.dtype = dtype
+        self.next_sequence = 0
+        self.received = 0     # Blocks received
+        self.missed = 0       # Blocks the sender dropped (gaps in the sequence)
+        self.timestamp = None  # Timestamp of the newest block
+
+    def receive(self):
+        """ Returns all samples that arrived since the last call as one array (may be empty). """
+        blocks = []
+        try:
+            while True:
+                sequence, timestamp, data = self.queue.get_nowait()
+                self.missed += sequence - self.next_sequence
+                self.next_sequence = sequence + 1
+                self.received += 1
+                self.timestamp = timestamp
+                blocks.append(np.frombuffer(data, dtype=self.dtype))
+        except Empty:
+            pass
+        if not blocks:
+            return np.zeros(0, dtype=self.dtype)
+        return blocks[0] if len(blocks) == 1 else np.concatenate(blocks)
@@ -0,0 +1,72 @@
+import time
+from multiprocessing import Process, Queue, Value
+import numpy as np
+from geophone_plot import drain_queue
+from geophone_transport import BlockSender, BlockReceiver, block_size_for
+
+# How many samples each case pushes through the queue as fast as it can
+TOTAL_SAMPLES = 200000
+BLOCK_SIZES = [16, block_size_for(860), 256]
+
+
+# Producer used by generate_data() before: one queue.put() per reading
+def send_samples(queue, cpu_seconds):
+    cpu_start = time.process_time()
+    for value in range(TOTAL_SAMPLES):
+        queue.put(value & 0x7FFF)
+    cpu_seconds.value = time.process_time() - cpu_start
+
+
+def send_blocks(queue, block_size, cpu_seconds):
+    cpu_start = time.process_time()
+    sender = BlockSender(queue)
+    block = np.zeros(block_size, dtype=np.int16)
+    for start in range(0, TOTAL_SAMPLES, block_size):
+        block[:] = (np.arange(start, start + block_size) & 0x7FFF)
+        sender.send(block, time.monotonic())
+    cpu_seconds.value = time.process_time() - cpu_start
+
+
+# Function to time one case: returns (samples per second, producer CPU us/sample, consumer CPU us/sample)
+def run_case(target, args, receive):
+    queue = Queue()
+    cpu_seconds = Value("d", 0.0)
+    producer = Process(target=target, args=(queue,) + args + (cpu_seconds,))
+    start_time = time.monotonic()
+    cpu_start = time.process_time()
+    producer.start()
+    received = 0
+    while received < TOTAL_SAMPLES:
+        count = receive(queue)
+        received += count
+        if count == 0:
+            time.sleep(0.001)
+    elapsed = time.monotonic() - start_time
+    consumer_cpu = time.process_time() - cpu_start
+    producer.join()
+    return (received / elapsed, 1e6 * cpu_seconds.value / received, 1e6 * consumer_cpu / received)
+
+
+def main():
+    print(f"{TOTAL_SAMPLES} samples per case (the ADS1115 tops out at 860 samples/s)")
+    print(f"{'transport':<24}{'samples/s':>12}{'send us/sample':>16}{'receive us/sample':>19}")
+
+    rate, send_cpu, receive_cpu = run_case(send_samples, (), lambda queue: len(drain_queue(queue)))
+    print(f"{'one put per sample':<24}{rate:>12.0f}{send_cpu:>16.2f}{receive_cpu:>19.2f}")
+
+    for block_size in BLOCK_SIZES:
+        receiver = None
+
+        def receive(queue):
+            nonlocal receiver
+            if receiver is None:
+                receiver = BlockReceiver(queue)
+            return len(receiver.receive())
+
+        rate, send_cpu, receive_cpu = run_case(send_blocks, (block_size,), receive)
+        name = f"blocks of {block_size}"
+        print(f"{name:<24}{rate:>12.0f}{send_cpu:>16.2f}{receive_cpu:>19.2f}   missed blocks: {receiver.missed}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,9 @@
 import pygame
 import math
-from math import floor
-from adafruit_rplidar import RPLidar
+from lidar_reader import LidarReader
+from lidar_render import project_scans, draw_points
+from scan_buffer import ScanRingBuffer
+from scan_samples import bin_scan
 from PyQt5.QtWidgets import QApplication, QWidget, QVBoxLayout, QPushButton, QLabel, QHBoxLayout, QProgressBar, QFileDialog, QSlider
 from PyQt5.QtCore import QThread, pyqtSignal, Qt
 import csv
@@ -9,9 +11,9 @@ import json
 import numpy as np
 from PyQt5.QtGui import QImage, QPainter
 
-# Setup the RPLidar
+# Setup the RPLidar (it is read in its own process so the UI never holds up the serial port)
 PORT_NAME = "/dev/ttyUSB0"
-lidar = RPLidar(None, PORT_NAME, timeout=3)
+lidar = LidarReader(PORT_NAME)  # Set RPLIDAR_REPLAY=<file> to replay a recording
 
 # Screen settings
 WIDTH, HEIGHT = 800, 800
@@ -31,21 +33,13 @@ GRID_COLOR = (50, 50, 70)
 CIRCLE_COLOR = (100, 100, 150)
 
 # Initialize data storage
-scan_history = []  # Store recent scan frames
+HISTORY_DEPTH = 3  # Number of recent scan frames to draw
+ANGULAR_RESOLUTION = 0.25  # Degrees per bin
+scan_history = ScanRingBuffer(HISTORY_DEPTH, bins=int(360 / ANGULAR_RESOLUTION))  # Store recent scan frames
 zoom_level = 1
 scan_speed = 30  # Scan update speed (frames per second)
 
 
-# Function to map lidar data to screen coordinates
-def polar_to_cartesian(angle, distance, zoom_factor):
-    if distance > MAX_DISTANCE:
-        distance = MAX_DISTANCE
-    angle_rad = math.radians(angle)
-    x = CENTER_X + int(distance * math.cos(angle_rad) * (WIDTH / 2) / MAX_DISTANCE * zoom_factor)
-    y = CENTER_Y + int(distance * math.sin(angle_rad) * (HEIGHT / 2) / MAX_DISTANCE * zoom_factor)
-    return x, y
-
-
 # Function to draw grid and circles for reference
 def draw_grid(show_grid=True):
     screen.fill(BACKGROUND_COLOR)
@@ -62,13 +56,10 @@ def draw_grid(show_grid=True):
 def process_data():
     draw_grid(show_grid=True)  # Clear screen and draw grid
 
-    # Draw each scan frame in the history
-    for data in scan_history:
-        for angle in range(360):
-            distance = data[angle]
-            if distance > 0:
-                x, y = polar_to_cartesian(angle, distance, zoom_level)
-                pygame.draw.circle(screen, POINT_COLOR, (x, y), 2)
+    # Draw every scan frame in the history in one batch
+    for frames in scan_history.views():
+        xs, ys = project_scans(frames, WIDTH, HEIGHT, MAX_DISTANCE, zoom_level)
+        draw_points(screen, xs, ys, POINT_COLOR)
 
     pygame.display.flip()  # Update display
 
@@ -85,31 +76,30 @@ class LidarWorker(QThread):
     def run(self):
         try:
             self.status_signal.emit("Scanning...")
-            for scan in lidar.iter_scans():
-                if not self.running:
-                    break
-
-                # Prepare scan data for this frame
-                scan_data = [0] * 360
-                for _, angle, distance in scan:
-                    scan_data[min([359, floor(angle)])] = distance
-
-                # Append current frame to history and keep only last 3 frames
-                scan_history.append(scan_data)
-                if len(scan_history) > 3:
-                    scan_history.pop(0)
-
-                # Trigger update signal to refresh the PyQt5 window
-                self.update_signal.emit()
-
-                clock.tick(scan_speed)  # Control the speed of scan updates
+            lidar.start()
+            dropped = 0
+            while self.running:
+                # Take the newest complete scan, if one arrived since the last update
+                samples = lidar.read_latest()
+                if samples is not None:
+                    # Bin this frame straight into the next history slot (the oldest frame drops out)
+                    scan_data, scan_quality = scan_history.next_slot()
+                    bin_scan(samples, ANGULAR_RESOLUTION, out=scan_data, quality_out=scan_quality)
+                    scan_history.publish(lidar.scan_time)
+
+                    # Trigger update signal to refresh the PyQt5 window
+                    self.update_signal.emit()
+
+                    if lidar.dropped != dropped:
+                        dropped = lidar.dropped
+                        self.status_signal.emit(f"Scanning... ({dropped} scans skipped)")
+
+                clock.tick(scan_speed)  # Control the speed of display updates (the lidar is always read at full speed)
 
         except KeyboardInterrupt:
             print("Lidar stopped.")
         finally:
             lidar.stop()
-            lidar.stop_motor()
-            lidar.disconnect()
             self.status_signal.emit("Idle")
 
 
@@ -217,8 +207,8 @@ class LidarUI(QWidget):
         show_grid = not show_grid
 
     def clear_data(self):
-        global scan_history
-        scan_history = []
+        # Only hides the current frames, the worker thread keeps writing into the same buffer
+        scan_history.clear()
         print("Scan data cleared!")
 
     def save_scan_data(self):
@@ -233,13 +223,14 @@ class LidarUI(QWidget):
 
     def save_to_json(self, file_path):
         with open(file_path, 'w') as f:
-            json.dump(scan_history, f, indent=4)
+            json.dump(scan_history.snapshot().tolist(), f, indent=4)
         print(f"Scan data saved to {file_path}")
 
     def save_to_csv(self, file_path):
         with open(file_path, 'w', newline='') as f:
             writer = csv.writer(f)
-            writer.writerows(scan_history)
+            for frames in scan_history.views():
+                writer.writerows(frames.tolist())
         print(f"Scan data saved to {file_path}")
 
 
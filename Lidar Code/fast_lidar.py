@@ -1,11 +1,13 @@
 import pygame
 import math
-from math import floor
-from adafruit_rplidar import RPLidar
+from lidar_reader import LidarReader
+from lidar_render import project_scans, draw_points
+from scan_buffer import ScanRingBuffer
+from scan_samples import bin_scan
 
-# Setup the RPLidar
+# Setup the RPLidar (it is read in its own process so drawing never holds up the serial port)
 PORT_NAME = "/dev/ttyUSB0"
-lidar = RPLidar(None, PORT_NAME, timeout=3)
+lidar = LidarReader(PORT_NAME)  # Set RPLIDAR_REPLAY=<file> to replay a recording
 
 # Screen settings
 WIDTH, HEIGHT = 800, 800
@@ -25,16 +27,9 @@ GRID_COLOR = (50, 50, 70)
 CIRCLE_COLOR = (100, 100, 150)
 
 # Initialize data storage
-scan_history = []  # Store recent scan frames
-
-# Function to map lidar data to screen coordinates
-def polar_to_cartesian(angle, distance):
-    if distance > MAX_DISTANCE:
-        distance = MAX_DISTANCE
-    angle_rad = math.radians(angle)
-    x = CENTER_X + int(distance * math.cos(angle_rad) * (WIDTH / 2) / MAX_DISTANCE)
-    y = CENTER_Y + int(distance * math.sin(angle_rad) * (HEIGHT / 2) / MAX_DISTANCE)
-    return x, y
+HISTORY_DEPTH = 3  # Number of recent scan frames to draw
+ANGULAR_RESOLUTION = 0.25  # Degrees per bin
+scan_history = ScanRingBuffer(HISTORY_DEPTH, bins=int(360 / ANGULAR_RESOLUTION))  # Store recent scan frames
 
 # Function to draw grid and circles for reference
 def draw_grid():
@@ -50,36 +45,38 @@ def draw_grid():
 def process_data():
     draw_grid()  # Clear screen and draw grid
 
-    # Draw each scan frame in the history
-    for data in scan_history:
-        for angle in range(360):
-            distance = data[angle]
-            if distance > 0:
-                x, y = polar_to_cartesian(angle, distance)
-                pygame.draw.circle(screen, POINT_COLOR, (x, y), 2)
+    # Draw every scan frame in the history in one batch
+    for frames in scan_history.views():
+        xs, ys = project_scans(frames, WIDTH, HEIGHT, MAX_DISTANCE)
+        draw_points(screen, xs, ys, POINT_COLOR)
 
     pygame.display.flip()  # Update display
 
-try:
-    for scan in lidar.iter_scans():
-        # Prepare scan data for this frame
-        scan_data = [0] * 360
-        for _, angle, distance in scan:
-            scan_data[min([359, floor(angle)])] = distance
+if __name__ == "__main__":
+    try:
+        lidar.start()
+        running = True
+        while running:
+            # Closing the window stops the loop
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    running = False
 
-        # Append current frame to history and keep only last 3 frames
-        scan_history.append(scan_data)
-        if len(scan_history) > 3:
-            scan_history.pop(0)
+            # Take the newest complete scan, if one arrived since the last frame
+            samples = lidar.read_latest()
+            if samples is not None:
+                # Bin this frame straight into the next history slot (the oldest frame drops out)
+                scan_data, scan_quality = scan_history.next_slot()
+                bin_scan(samples, ANGULAR_RESOLUTION, out=scan_data, quality_out=scan_quality)
+                scan_history.publish(lidar.scan_time)
 
-        # Process and visualize the recent frames
-        process_data()
-        clock.tick(30)  # Limit to 30 frames per second
+            # Process and visualize the recent frames
+            process_data()
+            clock.tick(30)  # Limit to 30 frames per second
 
-except KeyboardInterrupt:
-    print("Stopping.")
-finally:
-    lidar.stop()
-    lidar.stop_motor()
-    lidar.disconnect()
-    pygame.quit()
+    except KeyboardInterrupt:
+        print("Stopping.")
+    finally:
+        print(f"Scans received: {lidar.received}, dropped: {lidar.dropped}, lidar errors: {lidar.errors}")
+        lidar.stop()
+        pygame.quit()
@@ -0,0 +1,127 @@
+import time
+import multiprocessing
+from lidar_recording import open_lidar
+from scan_samples import SAMPLE_DTYPE, scan_to_samples
+from seqlock import SeqlockBuffer, FREE_FIELD
+
+PORT_NAME = "/dev/ttyUSB0"
+MAX_SAMPLES = 2048    # More than one RPLidar revolution ever holds
+ERROR_BACKOFF = 0.1   # Seconds to wait before restarting the scan after a driver error
+
+# Reader counters kept in the free header fields of the shared scan
+_PUBLISHED, _ERRORS = FREE_FIELD, FREE_FIELD + 1
+
+
+# Latest complete scan in shared memory, written by one process and read by any number
+class SharedScan(SeqlockBuffer):
+    """ Holds one scan of raw samples behind a seqlock (see seqlock.py), along with
+    how many scans were published and how many driver errors the reader had.
+    Opened without a name it creates the segment; pass self.name to other processes.
+    """
+
+    def __init__(self, name=None, max_samples=MAX_SAMPLES):
+        super().__init__(name, (max_samples,), SAMPLE_DTYPE, create=name is None)
+
+    @property
+    def published(self):
+        return int(self.header[_PUBLISHED])
+
+    @property
+    def errors(self):
+        return int(self.header[_ERRORS])
+
+    def write(self, samples, timestamp, start_time=None):
+        """ timestamp is when the scan completed and start_time when it began (time.monotonic()). """
+        super().write(samples, timestamp, start_time)
+        self.header[_PUBLISHED] += 1
+
+    def count_error(self):
+        self.header[_ERRORS] += 1
+
+
+# Function run in the reader process: drain the lidar as fast as it delivers scans
+def _reader_main(shm_name, port_name, stop_event):
+    shared = SharedScan(shm_name)
+    lidar = open_lidar(port_name, timeout=3)
+    try:
+        while not stop_event.is_set():
+            try:
+                # Scans are stamped with time.monotonic(), the clock every sensor uses; a scan
+                # began when the previous one ended.
+                # The first scan after a (re)start is dropped: its span would include the motor
+                # spinning up or the reconnect, not just the scan.
+                start_time = None
+                for scan in lidar.iter_scans():
+                    end_time = time.monotonic()
+                    if start_time is not None:
+                        shared.write(scan_to_samples(scan), end_time, start_time)
+                    start_time = end_time
+                    if stop_event.is_set():
+                        break
+            except Exception as e:
+                # Typically "Incorrect descriptor starting bytes" after the serial buffer
+                # overflowed. Stop the scan (which flushes the input) and start again.
+                print(f"Lidar Error {e}")
+                shared.count_error()
+                try:
+                    lidar.stop()
+                except Exception:
+                    pass
+                time.sleep(ERROR_BACKOFF)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        lidar.stop()
+        lidar.stop_motor()
+        lidar.disconnect()
+        shared.close()
+
+
+# Class that runs the reader process and hands the latest scan to the UI at its own rate
+class LidarReader:
+    def __init__(self, port_name=PORT_NAME):
+        self.port_name = port_name
+        self.shared = None
+        self.process = None
+        self.stop_event = multiprocessing.Event()
+        self.last_sequence = 0
+        self.received = 0
+        self.dropped = 0  # Scans the reader published that were replaced before being read
+        self.scan_start_time = None  # time.monotonic() when the latest scan began and ended
+        self.scan_time = None
+
+    def start(self):
+        self.shared = SharedScan()
+        self.stop_event.clear()
+        self.last_sequence = 0
+        self.process = multiprocessing.Process(target=_reader_main, args=(self.shared.name, self.port_name, self.stop_event), daemon=True)
+        self.process.start()
+
+    def read_latest(self):
+        """ Returns the samples of the newest scan, or None if there is no new scan since the last call. """
+        result = self.shared.read()
+        if result is None:
+            return None
+        sequence, start_time, end_time, samples = result
+        if sequence == self.last_sequence:
+            return None
+        self.scan_start_time, self.scan_time = start_time, end_time
+        self.dropped += sequence - self.last_sequence - 1
+        self.received += 1
+        self.last_sequence = sequence
+        return samples
+
+    @property
+    def errors(self):
+        return self.shared.errors if self.shared else 0
+
+    def stop(self):
+        if self.process is None:
+            return
+        self.stop_event.set()
+        self.process.join(timeout=3)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process = None
+        self.shared.close()
+        self.shared = None
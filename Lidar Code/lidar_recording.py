@@ -0,0 +1,260 @@
+import os
+import sys
+import time
+import numpy as np
+
+# Recording file layout: a 16 byte header followed by fixed-size sample records.
+# Records are only ever appended, so a file can be memory-mapped while it grows
+# and a crash can at worst leave one partial record at the end (ScanRecorder cuts it off
+# before appending again).
+MAGIC = b"RPLSCAN1"
+HEADER_SIZE = 16
+RECORD_DTYPE = np.dtype([
+    ("scan", "<u4"),       # Scan number, increases by one per iter_scans() scan
+    ("time", "<f8"),       # time.time() when the scan was received
+    ("quality", "u1"),
+    ("angle", "<f4"),      # Degrees [0, 360)
+    ("distance", "<f4"),   # Millimeters
+])
+
+# Environment variables used by open_lidar()
+REPLAY_ENV = "RPLIDAR_REPLAY"              # Path of a recording to replay instead of the sensor
+REPLAY_SPEED_ENV = "RPLIDAR_REPLAY_SPEED"  # "realtime" (default) or "max"
+
+
+# Class to append iter_scans() output to a recording file
+class ScanRecorder:
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "ab")
+        if self.file.tell() == 0:
+            self.file.write(MAGIC.ljust(HEADER_SIZE, b"\0"))
+            self.scan_count = 0
+        else:
+            _check_header(path)
+            # Drop a partial record left by a crash, or every record appended after it would be misaligned
+            count = (self.file.tell() - HEADER_SIZE) // RECORD_DTYPE.itemsize
+            self.file.truncate(HEADER_SIZE + count * RECORD_DTYPE.itemsize)
+            records = load_recording(path)
+            self.scan_count = int(records["scan"][-1]) + 1 if len(records) else 0
+
+    def write_scan(self, scan, timestamp=None):
+        """ Append one scan (list of (quality, angle, distance) tuples). """
+        if timestamp is None:
+            timestamp = time.time()
+        records = np.zeros(len(scan), dtype=RECORD_DTYPE)
+        records["scan"] = self.scan_count
+        records["time"] = timestamp
+        if len(scan):
+            samples = np.asarray(scan, dtype=np.float64)
+            records["quality"] = samples[:, 0]
+            records["angle"] = samples[:, 1]
+            records["distance"] = samples[:, 2]
+        self.file.write(records.tobytes())
+        self.file.flush()
+        self.scan_count += 1
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _check_header(path):
+    with open(path, "rb") as f:
+        if f.read(HEADER_SIZE)[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a LiDAR scan recording")
+
+
+# Function to memory-map the records of a recording (ignores a partial trailing record)
+def load_recording(path):
+    _check_header(path)
+    count = (os.path.getsize(path) - HEADER_SIZE) // RECORD_DTYPE.itemsize
+    if count == 0:
+        return np.zeros(0, dtype=RECORD_DTYPE)
+    return np.memmap(path, dtype=RECORD_DTYPE, mode="r", offset=HEADER_SIZE, shape=(count,))
+
+
+# Function to split records back into scans: yields (timestamp, records of one scan)
+def iter_recorded_scans(records):
+    if len(records) == 0:
+        return
+    bounds = np.flatnonzero(np.diff(records["scan"])) + 1
+    starts = np.concatenate(([0], bounds))
+    ends = np.concatenate((bounds, [len(records)]))
+    for start, end in zip(starts, ends):
+        yield float(records["time"][start]), records[start:end]
+
+
+# Drop-in replacement for adafruit_rplidar.RPLidar that replays a recording
+class FakeRPLidar:
+    def __init__(self, path, realtime=True, loop=False):
+        self.path = path
+        self.realtime = realtime
+        self.loop = loop
+        self.records = load_recording(path)
+        self.motor_running = False
+        self.scanning = False
+
+    @property
+    def info(self):
+        return {"model": 0, "firmware": (0, 0), "hardware": 0, "serialnumber": "replay"}
+
+    @property
+    def health(self):
+        return ("Good", 0)
+
+    def connect(self):
+        pass
+
+    def disconnect(self):
+        pass
+
+    def start_motor(self):
+        self.motor_running = True
+
+    def stop_motor(self):
+        self.motor_running = False
+
+    def start(self, scan_type=0):
+        self.scanning = True
+
+    def stop(self):
+        self.scanning = False
+
+    def clear_input(self):
+        pass
+
+    def _iter_timed_scans(self):
+        while True:
+            start = time.monotonic()
+            first_time = None
+            for timestamp, scan in iter_recorded_scans(self.records):
+                if self.realtime:
+                    if first_time is None:
+                        first_time = timestamp
+                    delay = (timestamp - first_time) - (time.monotonic() - start)
+                    if delay > 0:
+                        time.sleep(delay)
+                yield scan
+            if not self.loop:
+                return
+
+    def iter_scans(self, max_buf_meas=500, min_len=5):
+        """ Same output as RPLidar.iter_scans(): lists of (quality, angle, distance). """
+        self.start_motor()
+        self.start()
+        for scan in self._iter_timed_scans():
+            if len(scan) > min_len:
+                yield list(zip(scan["quality"].tolist(), scan["angle"].tolist(), scan["distance"].tolist()))
+
+    def iter_measurements(self, max_buf_meas=500, scan_type=0):
+        """ Same output as RPLidar.iter_measurements(): (new_scan, quality, angle, distance). """
+        self.start_motor()
+        self.start()
+        for scan in self._iter_timed_scans():
+            for i, (quality, angle, distance) in enumerate(zip(scan["quality"].tolist(), scan["angle"].tolist(), scan["distance"].tolist())):
+                yield i == 0, quality, angle, distance
+
+
+# Function to open the LiDAR, replaying a recording when RPLIDAR_REPLAY is set
+def open_lidar(port_name, timeout=3):
+    replay_path = os.environ.get(REPLAY_ENV)
+    if replay_path:
+        realtime = os.environ.get(REPLAY_SPEED_ENV, "realtime") != "max"
+        return FakeRPLidar(replay_path, realtime=realtime, loop=True)
+    from adafruit_rplidar import RPLidar
+    return RPLidar(None, port_name, timeout=timeout)
+
+
+# Walls of the simulated room used for synthetic recordings: (x1, y1, x2, y2) in mm
+ROOM_WALLS = np.array([
+    (-3000, -2000, 3000, -2000),
+    (3000, -2000, 3000, 2000),
+    (3000, 2000, -3000, 2000),
+    (-3000, 2000, -3000, -2000),
+    # A box and a partition so the room is not symmetric
+    (1800, 900, 2400, 900),
+    (2400, 900, 2400, 1400),
+    (2400, 1400, 1800, 1400),
+    (1800, 1400, 1800, 900),
+    (-2200, -2000, -2200, -1100),
+], dtype=np.float64)
+
+
+# Function giving the pose (x mm, y mm, heading rad) of the simulated car at scan i
+def synthetic_pose(i):
+    t = i * 0.1  # 10 scans per second
+    return (1200 * np.sin(0.15 * t), 700 * np.sin(0.3 * t), 0.4 * np.sin(0.1 * t))
+
+
+# Function to ray-cast a scan of the simulated room from the given pose
+def simulate_scan(pose, samples=400, max_distance=12000, noise=10.0, rng=None):
+    """ Returns (angles in degrees, distances in mm) like one RPLidar revolution. """
+    rng = np.random.default_rng() if rng is None else rng
+    x, y, heading = pose
+    angles = np.sort((np.arange(samples) + rng.random(samples)) * (360.0 / samples))
+    directions = heading + np.radians(angles)
+    dx, dy = np.cos(directions)[:, None], np.sin(directions)[:, None]
+
+    # Ray/segment intersection for every ray against every wall
+    x1, y1, x2, y2 = (ROOM_WALLS[:, k] for k in range(4))
+    ex, ey = x2 - x1, y2 - y1
+    denom = dx * ey - dy * ex
+    with np.errstate(divide="ignore", invalid="ignore"):
+        dist = ((x1 - x) * ey - (y1 - y) * ex) / denom
+        along = ((x1 - x) * dy - (y1 - y) * dx) / denom
+    hit = (dist > 0) & (along >= 0) & (along <= 1)
+    distances = np.where(hit, dist, np.inf).min(axis=1)
+
+    distances = distances + rng.normal(0, noise, samples)
+    distances[(distances > max_distance) | ~np.isfinite(distances)] = 0
+    return angles, distances
+
+
+# Function to write a synthetic recording of the car driving around the simulated room
+def write_synthetic_recording(path, scans, seed=0):
+    rng = np.random.default_rng(seed)
+    with ScanRecorder(path) as recorder:
+        start = time.time()
+        for i in range(scans):
+            angles, distances = simulate_scan(synthetic_pose(i), rng=rng)
+            valid = distances > 0
+            quality = np.full(valid.sum(), 15)
+            recorder.write_scan(list(zip(quality, angles[valid], distances[valid])), start + i * 0.1)
+
+
+# Function to record scans from the real sensor
+def record(path, scans, port_name="/dev/ttyUSB0"):
+    from adafruit_rplidar import RPLidar
+    lidar = RPLidar(None, port_name, timeout=3)
+    try:
+        with ScanRecorder(path) as recorder:
+            for i, scan in enumerate(lidar.iter_scans()):
+                recorder.write_scan(scan)
+                print(f"Recorded scan {i + 1}/{scans}")
+                if i + 1 >= scans:
+                    break
+    except KeyboardInterrupt:
+        print("Stopping.")
+    finally:
+        lidar.stop()
+        lidar.stop_motor()
+        lidar.disconnect()
+
+
+if __name__ == "__main__":
+    # Usage: python lidar_recording.py record|synthetic <file> [scans]
+    if len(sys.argv) < 3 or sys.argv[1] not in ("record", "synthetic"):
+        print("Usage: python lidar_recording.py record|synthetic <file> [scans]")
+        sys.exit(1)
+    scan_count = int(sys.argv[3]) if len(sys.argv) > 3 else 600
+    if sys.argv[1] == "record":
+        record(sys.argv[2], scan_count)
+    else:
+        write_synthetic_recording(sys.argv[2], scan_count)
+        print(f"Wrote {scan_count} synthetic scans to {sys.argv[2]}")
@@ -0,0 +1,55 @@
+import numpy as np
+import pygame
+
+# Precomputed cos/sin tables for the angular bins, cached per bin count
+_trig_tables = {}
+
+
+# Function to get the cos/sin tables for a scan with the given number of bins
+def trig_tables(bins=360):
+    tables = _trig_tables.get(bins)
+    if tables is None:
+        angles = np.radians(np.arange(bins) * (360.0 / bins))
+        tables = (np.cos(angles), np.sin(angles))
+        _trig_tables[bins] = tables
+    return tables
+
+
+# Function to map a whole scan history to screen coordinates in one pass
+def project_scans(history, width, height, max_distance, zoom_factor=1):
+    """ Convert a (frames x bins) array of distances to pixel coordinates.
+
+    Matches polar_to_cartesian(): distances are clamped to max_distance,
+    scaled to half the screen and multiplied by the zoom factor. Empty bins
+    (distance 0) are skipped. Returns two int arrays (x, y).
+    """
+    history = np.asarray(history, dtype=np.float32)
+    if history.ndim == 1:
+        history = history[np.newaxis, :]
+    cos_table, sin_table = trig_tables(history.shape[1])
+
+    frame_idx, bin_idx = np.nonzero(history > 0)
+    distances = np.minimum(history[frame_idx, bin_idx], max_distance)
+
+    x = width // 2 + np.trunc(distances * cos_table[bin_idx] * ((width / 2) / max_distance * zoom_factor))
+    y = height // 2 + np.trunc(distances * sin_table[bin_idx] * ((height / 2) / max_distance * zoom_factor))
+    return x.astype(np.intp), y.astype(np.intp)
+
+
+# Offsets making up one point "dot" (a 3x3 block, close to draw.circle radius 2)
+_DOT_OFFSETS = np.array([(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1)])
+
+
+# Function to blit all projected points onto a surface at once
+def draw_points(surface, xs, ys, color):
+    """ Write every point into the surface pixels in a single array assignment. """
+    if len(xs) == 0:
+        return
+    width, height = surface.get_size()
+    px = (xs[:, np.newaxis] + _DOT_OFFSETS[:, 0]).ravel()
+    py = (ys[:, np.newaxis] + _DOT_OFFSETS[:, 1]).ravel()
+    on_screen = (px >= 0) & (px < width) & (py >= 0) & (py < height)
+
+    pixels = pygame.surfarray.pixels3d(surface)
+    pixels[px[on_screen], py[on_screen]] = color[:3]
+    del pixels  # Release the surface lock
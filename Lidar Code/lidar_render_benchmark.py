@@ -0,0 +1,84 @@
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")  # Run headless (no window needed)
+
+import math
+import time
+import numpy as np
+import pygame
+from lidar_render import project_scans, draw_points
+
+# Same screen settings as fast_lidar.py
+WIDTH, HEIGHT = 800, 800
+CENTER_X, CENTER_Y = WIDTH // 2, HEIGHT // 2
+MAX_DISTANCE = 4000
+BACKGROUND_COLOR = (20, 20, 30)
+POINT_COLOR = (255, 215, 0)
+
+# How long to run each case for (seconds) and which history depths to test
+RUN_TIME = 3.0
+HISTORY_DEPTHS = [3, 30, 100]
+
+
+# Function to make synthetic scans of a rectangular room with some noise and dropouts
+def synthetic_scans(count, seed=0):
+    rng = np.random.default_rng(seed)
+    angles = np.radians(np.arange(360))
+    half_w, half_h = 3000.0, 2000.0
+    with np.errstate(divide="ignore"):
+        room = np.minimum(np.abs(half_w / np.cos(angles)), np.abs(half_h / np.sin(angles)))
+    scans = room + rng.normal(0, 20, size=(count, 360))
+    scans[rng.random((count, 360)) < 0.05] = 0  # Missing returns
+    return np.clip(scans, 0, None).astype(np.uint16)
+
+
+# The original per-point loop from process_data(), kept for comparison
+def polar_to_cartesian(angle, distance):
+    if distance > MAX_DISTANCE:
+        distance = MAX_DISTANCE
+    angle_rad = math.radians(angle)
+    x = CENTER_X + int(distance * math.cos(angle_rad) * (WIDTH / 2) / MAX_DISTANCE)
+    y = CENTER_Y + int(distance * math.sin(angle_rad) * (HEIGHT / 2) / MAX_DISTANCE)
+    return x, y
+
+
+def draw_loop(screen, scan_history):
+    for data in scan_history:
+        for angle in range(360):
+            distance = data[angle]
+            if distance > 0:
+                x, y = polar_to_cartesian(angle, distance)
+                pygame.draw.circle(screen, POINT_COLOR, (x, y), 2)
+
+
+def draw_vectorized(screen, scan_history):
+    xs, ys = project_scans(scan_history, WIDTH, HEIGHT, MAX_DISTANCE)
+    draw_points(screen, xs, ys, POINT_COLOR)
+
+
+# Function to measure frames per second for one drawing method
+def measure_fps(screen, draw, scan_history):
+    frames = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < RUN_TIME:
+        screen.fill(BACKGROUND_COLOR)
+        draw(screen, scan_history)
+        frames += 1
+    return frames / (time.perf_counter() - start)
+
+
+def main():
+    pygame.init()
+    screen = pygame.Surface((WIDTH, HEIGHT))
+
+    print(f"{'history':>8} {'loop FPS':>10} {'numpy FPS':>10} {'speedup':>8}")
+    for depth in HISTORY_DEPTHS:
+        scans = synthetic_scans(depth)
+        loop_fps = measure_fps(screen, draw_loop, scans.tolist())
+        numpy_fps = measure_fps(screen, draw_vectorized, scans)
+        print(f"{depth:>8} {loop_fps:>10.1f} {numpy_fps:>10.1f} {numpy_fps / loop_fps:>7.1f}x")
+
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+import numpy as np
+
+# Map settings (distances in millimeters, like the lidar)
+RESOLUTION = 50.0     # Cell size (5 cm)
+MAX_RANGE = 12000.0   # Readings at or past this range only clear space
+TILE_SIZE = 128       # Cells per tile side, tiles are only allocated where the car has seen
+
+# Log-odds update for a cell a ray ends in / passes through, and the clamping range
+L_OCCUPIED = 0.85
+L_FREE = -0.4
+L_MIN, L_MAX = -4.0, 4.0
+
+
+# Function to pack integer cell coordinates into a single int64 key
+def _cell_keys(cx, cy):
+    return (cx.astype(np.int64) << 32) | (cy.astype(np.int64) & 0xFFFFFFFF)
+
+
+def _unpack_keys(keys):
+    return keys >> 32, (keys & 0xFFFFFFFF).astype(np.uint32).view(np.int32).astype(np.int64)
+
+
+# Log-odds occupancy grid stored as square tiles that are created as the map grows
+class OccupancyGrid:
+    def __init__(self, resolution=RESOLUTION, max_range=MAX_RANGE, tile_size=TILE_SIZE):
+        self.resolution = resolution
+        self.max_range = max_range
+        self.tile_size = tile_size
+        self.tiles = {}  # (tile x, tile y) -> tile_size x tile_size float32 log-odds, indexed [y, x]
+        self.scan_count = 0
+        self._steps = np.arange(int(np.ceil(max_range / resolution)) + 2)
+
+    @property
+    def memory_bytes(self):
+        return len(self.tiles) * self.tile_size * self.tile_size * 4
+
+    def ingest_scan(self, distances, pose=(0.0, 0.0, 0.0), angles=None):
+        """ Add one scan to the map.
+
+        distances is a scan_data array (evenly spaced angle bins) or, with angles in
+        degrees, raw samples. pose is the sensor (x mm, y mm, heading rad).
+        """
+        distances = np.asarray(distances, dtype=np.float64)
+        if angles is None:
+            angles = np.arange(len(distances)) * (360.0 / len(distances))
+        angles = np.asarray(angles, dtype=np.float64)
+        valid = distances > 0
+        distances, angles = distances[valid], angles[valid]
+        hit = distances < self.max_range
+        distances = np.minimum(distances, self.max_range)
+
+        x, y, heading = pose
+        directions = heading + np.radians(angles)
+        start_x = int(np.floor(x / self.resolution))
+        start_y = int(np.floor(y / self.resolution))
+        end_x = np.floor((x + distances * np.cos(directions)) / self.resolution).astype(np.int64)
+        end_y = np.floor((y + distances * np.sin(directions)) / self.resolution).astype(np.int64)
+
+        # Trace every ray at once: step i of a ray with n steps is at round(i * delta / n),
+        # which visits the same cells as Bresenham's line. The end cell is not included.
+        dx, dy = end_x - start_x, end_y - start_y
+        steps = np.maximum(np.abs(dx), np.abs(dy))
+        if len(steps):
+            t = self._steps[:steps.max()]
+            on_ray = t[np.newaxis, :] < steps[:, np.newaxis]
+            scale = t[np.newaxis, :] / np.maximum(steps, 1)[:, np.newaxis]
+            free_x = start_x + np.rint(dx[:, np.newaxis] * scale).astype(np.int64)[on_ray]
+            free_y = start_y + np.rint(dy[:, np.newaxis] * scale).astype(np.int64)[on_ray]
+            occupied = np.unique(_cell_keys(end_x[hit], end_y[hit]))
+            free = np.unique(_cell_keys(free_x, free_y))
+            free = free[~np.isin(free, occupied, assume_unique=True)]
+            self._update(free, L_FREE)
+            self._update(occupied, L_OCCUPIED)
+        self.scan_count += 1
+
+    # Function to add a log-odds value to a set of distinct cells, one tile at a time
+    def _update(self, keys, value):
+        if len(keys) == 0:
+            return
+        cx, cy = _unpack_keys(keys)
+        tx, ty = cx // self.tile_size, cy // self.tile_size
+        lx, ly = cx - tx * self.tile_size, cy - ty * self.tile_size
+
+        tile_keys = _cell_keys(tx, ty)
+        order = np.argsort(tile_keys, kind="stable")
+        tile_keys, lx, ly = tile_keys[order], lx[order], ly[order]
+        bounds = np.flatnonzero(np.diff(tile_keys)) + 1
+        starts = np.concatenate(([0], bounds))
+        ends = np.concatenate((bounds, [len(tile_keys)]))
+
+        tile_xs, tile_ys = _unpack_keys(tile_keys[starts])
+        for tile_x, tile_y, start, end in zip(tile_xs.tolist(), tile_ys.tolist(), starts, ends):
+            tile = self.tiles.get((tile_x, tile_y))
+            if tile is None:
+                tile = np.zeros((self.tile_size, self.tile_size), dtype=np.float32)
+                self.tiles[(tile_x, tile_y)] = tile
+            rows, cols = ly[start:end], lx[start:end]
+            tile[rows, cols] = np.clip(tile[rows, cols] + value, L_MIN, L_MAX)
+
+    def bounds(self):
+        """ Returns the covered area as (min x, min y, max x, max y) in mm. """
+        if not self.tiles:
+            return (0.0, 0.0, 0.0, 0.0)
+        keys = np.array(list(self.tiles.keys()))
+        span = self.tile_size * self.resolution
+        return (keys[:, 0].min() * span, keys[:, 1].min() * span,
+                (keys[:, 0].max() + 1) * span, (keys[:, 1].max() + 1) * span)
+
+    def to_array(self):
+        """ Returns (log-odds array indexed [y, x], (origin x mm, origin y mm)) of the whole map. """
+        if not self.tiles:
+            return np.zeros((0, 0), dtype=np.float32), (0.0, 0.0)
+        keys = np.array(list(self.tiles.keys()))
+        min_x, min_y = keys.min(axis=0)
+        width, height = keys.max(axis=0) - (min_x, min_y) + 1
+        size = self.tile_size
+        grid = np.zeros((height * size, width * size), dtype=np.float32)
+        for (tile_x, tile_y), tile in self.tiles.items():
+            row, col = (tile_y - min_y) * size, (tile_x - min_x) * size
+            grid[row:row + size, col:col + size] = tile
+        return grid, (min_x * size * self.resolution, min_y * size * self.resolution)
+
+    def to_image(self):
+        """ Returns the map as a uint8 image (0 = occupied, 255 = free, 127 = unknown). """
+        grid, origin = self.to_array()
+        probability = 1.0 / (1.0 + np.exp(grid))
+        return (probability * 255).astype(np.uint8), origin
+
+    def clear(self):
+        self.tiles = {}
+        self.scan_count = 0
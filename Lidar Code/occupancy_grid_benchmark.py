@@ -0,0 +1,44 @@
+import time
+import numpy as np
+from occupancy_grid import OccupancyGrid
+
+# Explore a 50 m x 50 m area at 5 cm resolution
+AREA = 50000.0        # mm
+RESOLUTION = 50.0     # mm
+SCANS = 600           # One minute of driving at 10 scans per second
+
+
+# Function to make a lawnmower path over the area with random scans along it
+def synthetic_drive(scans, seed=0):
+    rng = np.random.default_rng(seed)
+    lanes = 5
+    for i in range(scans):
+        progress = i / scans * lanes
+        lane = int(progress)
+        along = (progress - lane) * AREA
+        x = along if lane % 2 == 0 else AREA - along
+        y = (lane + 0.5) * AREA / lanes
+        heading = 0.0 if lane % 2 == 0 else np.pi
+        distances = rng.uniform(500, 12000, 360)
+        distances[rng.random(360) < 0.1] = 0  # Missing returns
+        yield distances, (x - AREA / 2, y - AREA / 2, heading)
+
+
+def main():
+    grid = OccupancyGrid(resolution=RESOLUTION)
+    drive = list(synthetic_drive(SCANS))
+
+    start = time.perf_counter()
+    for distances, pose in drive:
+        grid.ingest_scan(distances, pose)
+    elapsed = time.perf_counter() - start
+
+    min_x, min_y, max_x, max_y = grid.bounds()
+    print(f"Ingested {SCANS} scans in {elapsed:.2f} s: {SCANS / elapsed:.1f} scans/s "
+          f"({elapsed / SCANS * 1000:.2f} ms per scan)")
+    print(f"Map covers {(max_x - min_x) / 1000:.1f} m x {(max_y - min_y) / 1000:.1f} m "
+          f"with {len(grid.tiles)} tiles, {grid.memory_bytes / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
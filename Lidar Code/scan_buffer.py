@@ -0,0 +1,84 @@
+import time
+import numpy as np
+
+# Default number of scans kept in the history
+HISTORY_DEPTH = 3
+
+
+# Fixed-size scan history shared by one producer (the lidar thread) and one consumer (the UI)
+class ScanRingBuffer:
+    """ Preallocated ring of scans: distances (uint16 mm) and quality per bin, plus a timestamp.
+
+    The producer fills the row returned by next_slot() in place and then calls
+    publish(). The consumer only ever sees published rows, and the row being
+    filled is a spare one, so no lock is needed: the only counters are
+    `written` (changed by the producer) and `cleared` (changed by the consumer).
+    A visible row is reused for new data once depth more scans have been
+    published after it, so a consumer must finish with a view within that time.
+    """
+
+    def __init__(self, depth=HISTORY_DEPTH, bins=360):
+        self.depth = depth
+        self.bins = bins
+        self.slots = depth + 1  # One spare row for the producer to fill
+        self.distances = np.zeros((self.slots, bins), dtype=np.uint16)
+        self.quality = np.zeros((self.slots, bins), dtype=np.uint8)
+        self.timestamps = np.zeros(self.slots, dtype=np.float64)
+        self.written = 0
+        self.cleared = 0
+
+    # Producer side
+
+    def next_slot(self):
+        """ Returns the zeroed (distances, quality) rows to fill for the next scan. """
+        index = self.written % self.slots
+        self.distances[index] = 0
+        self.quality[index] = 0
+        return self.distances[index], self.quality[index]
+
+    def publish(self, timestamp=None):
+        """ timestamp is when the scan was measured, on time.monotonic() like every sensor (default: now). """
+        index = self.written % self.slots
+        self.timestamps[index] = time.monotonic() if timestamp is None else timestamp
+        self.written += 1
+
+    def push(self, distances, quality=None, timestamp=None):
+        slot_distances, slot_quality = self.next_slot()
+        slot_distances[:] = distances
+        if quality is not None:
+            slot_quality[:] = quality
+        self.publish(timestamp)
+
+    # Consumer side
+
+    def __len__(self):
+        return min(self.depth, self.written - self.cleared)
+
+    def _ranges(self):
+        written = self.written
+        count = min(self.depth, written - self.cleared)
+        start = (written - count) % self.slots
+        if start + count <= self.slots:
+            return [(start, start + count)] if count else []
+        return [(start, self.slots), (0, start + count - self.slots)]
+
+    def views(self, column="distances"):
+        """ Returns the visible rows, oldest first, as 0 to 2 array views (no copying). """
+        data = getattr(self, column)
+        return [data[start:end] for start, end in self._ranges()]
+
+    def latest(self, column="distances"):
+        """ Returns a view of the most recent scan, or None if there is none. """
+        if len(self) == 0:
+            return None
+        return getattr(self, column)[(self.written - 1) % self.slots]
+
+    def snapshot(self, column="distances"):
+        """ Returns a copy of the visible rows, oldest first, as one array. """
+        views = self.views(column)
+        if not views:
+            return np.zeros((0, self.bins), dtype=getattr(self, column).dtype)
+        return np.concatenate(views)
+
+    def clear(self):
+        self.cleared = self.written
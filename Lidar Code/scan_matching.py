@@ -0,0 +1,142 @@
+import numpy as np
+from scipy.spatial import cKDTree
+
+# ICP settings (distances in millimeters)
+MAX_ITERATIONS = 30
+MAX_CORRESPONDENCE = 300.0   # Ignore point pairs further apart than this
+TOLERANCE = 1e-4             # Stop when an iteration moves less than this (mm / rad)
+MIN_POINTS = 20              # Scans with fewer points than this are not matched
+MAX_NEIGHBOUR_GAP = 200.0    # Points further apart than this do not form a line for normals
+KEYFRAME_DISTANCE = 300.0    # Match against the same reference scan until the car moves this far
+KEYFRAME_ANGLE = np.radians(10)  # ... or turns this much
+
+
+# Function to convert a scan to (N x 2) points in the sensor frame
+def scan_to_points(distances, angles=None):
+    """ distances is a scan_data array (evenly spaced angle bins) or, with angles in degrees, raw samples. """
+    distances = np.asarray(distances, dtype=np.float64)
+    if angles is None:
+        angles = np.arange(len(distances)) * (360.0 / len(distances))
+    angles = np.radians(np.asarray(angles, dtype=np.float64))
+    valid = distances > 0
+    return np.column_stack((distances[valid] * np.cos(angles[valid]), distances[valid] * np.sin(angles[valid])))
+
+
+# Function to estimate the surface normal at each point from its neighbours in scan order
+def line_normals(points):
+    before, after = np.roll(points, 1, axis=0), np.roll(points, -1, axis=0)
+    tangent = after - before
+    length = np.hypot(tangent[:, 0], tangent[:, 1])
+    usable = ((np.hypot(*(after - points).T) < MAX_NEIGHBOUR_GAP)
+              & (np.hypot(*(points - before).T) < MAX_NEIGHBOUR_GAP) & (length > 0))
+    normals = np.zeros_like(points)
+    normals[usable, 0] = -tangent[usable, 1] / length[usable]
+    normals[usable, 1] = tangent[usable, 0] / length[usable]
+    return normals, usable
+
+
+def _transform(points, pose):
+    x, y, theta = pose
+    c, s = np.cos(theta), np.sin(theta)
+    return points @ np.array([[c, s], [-s, c]]) + (x, y)
+
+
+def _compose(a, b):
+    """ Pose b expressed in the frame of pose a, returned in a's parent frame. """
+    c, s = np.cos(a[2]), np.sin(a[2])
+    return (a[0] + c * b[0] - s * b[1], a[1] + s * b[0] + c * b[1], a[2] + b[2])
+
+
+def _inverse(a):
+    c, s = np.cos(a[2]), np.sin(a[2])
+    return (-c * a[0] - s * a[1], s * a[0] - c * a[1], -a[2])
+
+
+# Class holding a reference scan and its KD-tree so it can be matched against repeatedly
+class ReferenceScan:
+    def __init__(self, points):
+        self.points = points
+        self.tree = cKDTree(points)
+        self.normals, self.usable = line_normals(points)
+
+
+# Function to register a scan against a reference scan with ICP
+def icp(points, reference, initial=(0.0, 0.0, 0.0), method="point_to_line"):
+    """ Find the pose of the scan in the reference scan's frame.
+
+    method is "point_to_line" (default, converges in fewer iterations on
+    walls) or "point_to_point". Returns ((x, y, theta), rms error, iterations).
+    """
+    pose = tuple(initial)
+    rms = np.inf
+    for iteration in range(1, MAX_ITERATIONS + 1):
+        moved = _transform(points, pose)
+        distance, index = reference.tree.query(moved, distance_upper_bound=MAX_CORRESPONDENCE)
+        matched = np.isfinite(distance)
+        if method == "point_to_line":
+            matched &= reference.usable[np.minimum(index, len(reference.points) - 1)]
+        if matched.sum() < MIN_POINTS:
+            break
+        source, target = moved[matched], reference.points[index[matched]]
+
+        if method == "point_to_line":
+            # Linearized least squares on the distance of each point to its matched line
+            normals = reference.normals[index[matched]]
+            a = np.column_stack((normals, normals[:, 1] * source[:, 0] - normals[:, 0] * source[:, 1]))
+            b = np.einsum("ij,ij->i", normals, target - source)
+            step, *_ = np.linalg.lstsq(a, b, rcond=None)
+            rms = np.sqrt(np.mean(b ** 2))
+        else:
+            # Closed form rigid alignment of the matched pairs
+            source_mean, target_mean = source.mean(axis=0), target.mean(axis=0)
+            h = (source - source_mean).T @ (target - target_mean)
+            theta = np.arctan2(h[0, 1] - h[1, 0], h[0, 0] + h[1, 1])
+            c, s = np.cos(theta), np.sin(theta)
+            shift = target_mean - source_mean @ np.array([[c, s], [-s, c]])
+            step = (shift[0], shift[1], theta)
+            rms = np.sqrt(np.mean(distance[matched] ** 2))
+
+        # The step was solved around the origin of the reference frame, apply it on top of pose
+        c, s = np.cos(step[2]), np.sin(step[2])
+        pose = (c * pose[0] - s * pose[1] + step[0], s * pose[0] + c * pose[1] + step[1], pose[2] + step[2])
+        if abs(step[0]) + abs(step[1]) < TOLERANCE and abs(step[2]) < TOLERANCE:
+            break
+    return pose, rms, iteration
+
+
+# Class tracking the car pose by matching each scan against a recent reference scan.
+# The reference is only replaced once the car has moved enough, so small errors from
+# scan to scan do not pile up while the car is creeping or standing still.
+class ScanMatcher:
+    def __init__(self, method="point_to_line"):
+        self.method = method
+        self.reset()
+
+    def reset(self):
+        self.pose = (0.0, 0.0, 0.0)      # x mm, y mm, heading rad in the first scan's frame
+        self.reference = None
+        self.reference_pose = (0.0, 0.0, 0.0)
+        self.offset = (0.0, 0.0, 0.0)    # Pose of the last scan in the reference scan's frame
+        self.motion = (0.0, 0.0, 0.0)    # Motion between the last two scans, used to predict the next
+        self.rms = 0.0
+
+    def update(self, distances, angles=None):
+        """ Add the next scan and return the updated pose. """
+        points = scan_to_points(distances, angles)
+        if len(points) < MIN_POINTS:
+            return self.pose
+        if self.reference is None:
+            self.reference = ReferenceScan(points)
+            return self.pose
+
+        guess = _compose(self.offset, self.motion)
+        offset, self.rms, _ = icp(points, self.reference, guess, self.method)
+        self.motion = _compose(_inverse(self.offset), offset)
+        self.offset = offset
+        self.pose = _compose(self.reference_pose, offset)
+
+        if np.hypot(offset[0], offset[1]) > KEYFRAME_DISTANCE or abs(offset[2]) > KEYFRAME_ANGLE:
+            self.reference = ReferenceScan(points)
+            self.reference_pose = self.pose
+            self.offset = (0.0, 0.0, 0.0)
+        return self.pose
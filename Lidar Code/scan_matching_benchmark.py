@@ -0,0 +1,63 @@
+import os
+import sys
+import time
+import tempfile
+import numpy as np
+from lidar_recording import FakeRPLidar, write_synthetic_recording, synthetic_pose
+from scan_matching import ScanMatcher
+
+# Number of scans in the synthetic recording (one minute at 10 scans per second)
+SCANS = 600
+
+
+# Function to replay a recording through the scan matcher and time every scan
+def run(path, method):
+    lidar = FakeRPLidar(path, realtime=False)
+    matcher = ScanMatcher(method)
+    latencies, poses = [], []
+    for scan in lidar.iter_scans():
+        samples = np.asarray(scan, dtype=np.float64)
+        start = time.perf_counter()
+        poses.append(matcher.update(samples[:, 2], samples[:, 1]))
+        latencies.append(time.perf_counter() - start)
+    return np.array(latencies[1:]) * 1000, np.array(poses)
+
+
+# Function to compare the estimated path with the simulated car's real path
+def drift(poses):
+    truth = np.array([synthetic_pose(i) for i in range(len(poses))])
+    # Express the true path relative to the first pose, like the scan matcher does
+    x0, y0, h0 = truth[0]
+    c, s = np.cos(-h0), np.sin(-h0)
+    dx, dy = truth[:, 0] - x0, truth[:, 1] - y0
+    truth = np.column_stack((c * dx - s * dy, s * dx + c * dy, truth[:, 2] - h0))
+    position_error = np.hypot(poses[:, 0] - truth[:, 0], poses[:, 1] - truth[:, 1])
+    heading_error = np.degrees(np.abs(np.angle(np.exp(1j * (poses[:, 2] - truth[:, 2])))))
+    path_length = np.sum(np.hypot(np.diff(truth[:, 0]), np.diff(truth[:, 1])))
+    return position_error, heading_error, path_length
+
+
+def main():
+    # Usage: python scan_matching_benchmark.py [recording]
+    # Without a recording a synthetic one is made, which also lets drift be measured
+    synthetic = len(sys.argv) < 2
+    if synthetic:
+        path = os.path.join(tempfile.mkdtemp(), "synthetic.rplscan")
+        write_synthetic_recording(path, SCANS)
+    else:
+        path = sys.argv[1]
+
+    for method in ("point_to_line", "point_to_point"):
+        latencies, poses = run(path, method)
+        print(f"{method}: {len(poses)} scans, latency mean {latencies.mean():.2f} ms, "
+              f"p95 {np.percentile(latencies, 95):.2f} ms, max {latencies.max():.2f} ms "
+              f"({1000 / latencies.mean():.0f} scans/s possible)")
+        if synthetic:
+            position_error, heading_error, path_length = drift(poses)
+            print(f"    drift after {path_length / 1000:.1f} m: position {position_error[-1]:.0f} mm "
+                  f"(max {position_error.max():.0f} mm), heading {heading_error[-1]:.2f} deg "
+                  f"(max {heading_error.max():.2f} deg)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import numpy as np
+
+# One raw RPLidar measurement, same field order as the iter_scans() tuples
+SAMPLE_DTYPE = np.dtype([("quality", "u1"), ("angle", "<f4"), ("distance", "<f4")])
+
+# Default bin size (degrees) when a scan is reduced to evenly spaced bins
+ANGULAR_RESOLUTION = 0.25
+
+
+# Function to convert an iter_scans() scan to a structured array in one call
+def scan_to_samples(scan):
+    """ scan is a list of (quality, angle, distance) tuples. Fields keep full angle precision. """
+    return np.array(scan, dtype=SAMPLE_DTYPE)
+
+
+# Function to reduce raw samples to a fixed number of angular bins
+def bin_scan(samples, resolution=ANGULAR_RESOLUTION, reducer="min", out=None, quality_out=None):
+    """ Returns the distance for each bin of `resolution` degrees (0 where there was no return).
+
+    When several samples fall in one bin, reducer picks the nearest ("min") or
+    the median ("median") distance instead of whichever came last. out and
+    quality_out can be preallocated rows (e.g. from ScanRingBuffer.next_slot())
+    to write into; their length must be 360 / resolution.
+    """
+    bins = int(round(360.0 / resolution))
+    if out is None:
+        out = np.zeros(bins, dtype=np.float32)
+    else:
+        out[:] = 0
+    if quality_out is not None:
+        quality_out[:] = 0
+
+    valid = samples[samples["distance"] > 0]
+    if len(valid) == 0:
+        return out
+    index = np.minimum((valid["angle"] / resolution).astype(np.intp), bins - 1)
+    distance = valid["distance"]
+
+    # Sort by bin, then by distance, so each bin's samples are a sorted run
+    order = np.lexsort((distance, index))
+    index, distance, quality = index[order], distance[order], valid["quality"][order]
+    starts = np.flatnonzero(np.concatenate(([True], index[1:] != index[:-1])))
+    counts = np.diff(np.append(starts, len(index)))
+
+    if reducer == "min":
+        chosen = starts
+        values = distance[chosen]
+    elif reducer == "median":
+        chosen = starts + (counts - 1) // 2
+        values = (distance[chosen] + distance[starts + counts // 2]) / 2
+    else:
+        raise ValueError(f"Unknown reducer: {reducer}")
+
+    out[index[starts]] = values
+    if quality_out is not None:
+        quality_out[index[starts]] = quality[chosen]
+    return out
@@ -0,0 +1,80 @@
+from multiprocessing import shared_memory
+import numpy as np
+
+# Header fields (int64, the two times are float64) in front of the data. Fields from
+# FREE_FIELD on are left to subclasses for their own counters.
+_SEQUENCE, _COUNT, _TIMESTAMP, _START_TIME = range(4)
+FREE_FIELD = 4
+HEADER_FIELDS = 8
+_HEADER_SIZE = HEADER_FIELDS * 8
+
+
+# Latest message in shared memory, written by one process and read by any number
+class SeqlockBuffer:
+    """ Holds one message behind a sequence counter (a seqlock).
+
+    The writer makes the sequence odd while it copies a message in and even
+    again when it is done. A reader copies the message out and keeps it only
+    if it saw the same even sequence before and after, so nothing is ever
+    locked and nothing is pickled. Messages may be shorter than the buffer
+    along the first axis; the header records how many entries are valid.
+    SharedScan (lidar_reader.py) and the sensor bus topics (sensor_bus.py)
+    are both built on this.
+    """
+
+    def __init__(self, name, shape, dtype, create=False):
+        """ name can be None with create=True to get a unique name (see self.name). """
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        size = _HEADER_SIZE + int(np.prod(self.shape)) * self.dtype.itemsize
+        self.owner = create
+        self.shm = shared_memory.SharedMemory(name=name, create=create, size=size)
+        self.name = self.shm.name
+        self.header = np.ndarray((HEADER_FIELDS,), dtype=np.int64, buffer=self.shm.buf)
+        self.timestamp = np.ndarray((1,), dtype=np.float64, buffer=self.shm.buf, offset=_TIMESTAMP * 8)
+        self.start_time = np.ndarray((1,), dtype=np.float64, buffer=self.shm.buf, offset=_START_TIME * 8)
+        self.data = np.ndarray(self.shape, dtype=self.dtype, buffer=self.shm.buf, offset=_HEADER_SIZE)
+        if create:
+            self.header[:] = 0
+
+    @property
+    def sequence(self):
+        return int(self.header[_SEQUENCE]) // 2
+
+    def write(self, message, timestamp, start_time=None):
+        """ timestamp is when the message's last sample was taken and start_time its first
+        (time.monotonic(), start_time defaults to timestamp: a single instant). """
+        count = min(len(message), len(self.data))
+        self.header[_SEQUENCE] += 1  # Odd: write in progress
+        self.data[:count] = message[:count]
+        self.header[_COUNT] = count
+        self.timestamp[0] = timestamp
+        self.start_time[0] = timestamp if start_time is None else start_time
+        self.header[_SEQUENCE] += 1  # Even: message complete
+
+    def read(self, out=None):
+        """ Returns (sequence, start time, timestamp, message copy), or None if nothing was written yet.
+
+        out can be a preallocated array of the buffer's shape to copy into.
+        """
+        if out is None:
+            out = np.empty(self.shape, dtype=self.dtype)
+        for _ in range(100):
+            before = int(self.header[_SEQUENCE])
+            if before == 0:
+                return None
+            if before % 2:
+                continue
+            count = int(self.header[_COUNT])
+            out[:count] = self.data[:count]
+            timestamp = float(self.timestamp[0])
+            start_time = float(self.start_time[0])
+            if int(self.header[_SEQUENCE]) == before:
+                return before // 2, start_time, timestamp, out[:count]
+        return None  # The writer stopped part way through a message
+
+    def close(self):
+        del self.header, self.timestamp, self.start_time, self.data
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
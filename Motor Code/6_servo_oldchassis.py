@@ -1,11 +1,8 @@
 import time
-import board
-import busio
-from adafruit_pca9685 import PCA9685
+from simulated_pca9685 import open_pca9685
 
-# Configure I2C
-i2c = busio.I2C(board.SCL, board.SDA)
-pca = PCA9685(i2c)
+# Configure I2C (set MOTOR_SIMULATED=1 to run without the car)
+pca = open_pca9685()
 
 # Set PWM frequency for the servos
 pca.frequency = 50  # Standard frequency for servos (50Hz)
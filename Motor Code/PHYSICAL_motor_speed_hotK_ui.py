@@ -1,16 +1,20 @@
 import sys
 import time
-import board
-import busio
-from adafruit_pca9685 import PCA9685
+from drivetrain import Drivetrain
+from simulated_pca9685 import open_pca9685
+from motor_commands import MotorCommands
+from motor_control import ControlLoop
+from skid_steer import keys_to_command
 from PyQt5.QtWidgets import QApplication, QWidget, QVBoxLayout, QLabel, QPushButton, QSlider
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer
 
-# Initialize I2C and PCA9685 for servo control
-i2c = busio.I2C(board.SCL, board.SDA)
-pca = PCA9685(i2c)
+# Initialize I2C and PCA9685 for servo control (set MOTOR_SIMULATED=1 to run without the car)
+pca = open_pca9685()
 pca.frequency = 50  # Standard frequency for servos (50Hz)
 
+# Writes the six wheel channels (0-5) in one I2C transaction, see drivetrain.py
+drivetrain = Drivetrain(pca)
+
 # Assign channels to the 6 servos for movement and 1 for lifting
 front_left_servo = pca.channels[0]
 front_right_servo = pca.channels[1]
@@ -20,72 +24,33 @@ rear_left_servo = pca.channels[4]
 rear_right_servo = pca.channels[5]
 lifter_servo = pca.channels[6]
 
-# Function to set servo speed
-def set_servo_speed(channel, speed):
-    if speed == 0:
-        channel.duty_cycle = 0
-    else:
-        pulse_width = int((speed / 100.0) * 500 + 1500)  # -100 -> 1ms, 100 -> 2ms
-        pwm_value = int((pulse_width / 20000) * 65535)
-        channel.duty_cycle = pwm_value
-
-# Define movement functions
-def move_forward(speed):
-    print(f"La voiture avance à vitesse {speed}")
-    set_servo_speed(front_left_servo, speed)
-    set_servo_speed(front_right_servo, speed)
-    set_servo_speed(middle_left_servo, speed)
-    set_servo_speed(middle_right_servo, speed)
-    set_servo_speed(rear_left_servo, speed)
-    set_servo_speed(rear_right_servo, speed)
-
-def move_backward(speed):
-    print(f"La voiture recule à vitesse {speed}")
-    set_servo_speed(front_left_servo, -speed)
-    set_servo_speed(front_right_servo, -speed)
-    set_servo_speed(middle_left_servo, -speed)
-    set_servo_speed(middle_right_servo, -speed)
-    set_servo_speed(rear_left_servo, -speed)
-    set_servo_speed(rear_right_servo, -speed)
-
-def turn_left(speed):
-    print(f"La voiture tourne à gauche (pivot) à vitesse {speed}")
-    set_servo_speed(front_left_servo, -speed)
-    set_servo_speed(front_right_servo, speed)
-    set_servo_speed(middle_left_servo, -speed)
-    set_servo_speed(middle_right_servo, speed)
-    set_servo_speed(rear_left_servo, -speed)
-    set_servo_speed(rear_right_servo, speed)
-
-def turn_right(speed):
-    print(f"La voiture tourne à droite (pivot) à vitesse {speed}")
-    set_servo_speed(front_left_servo, speed)
-    set_servo_speed(front_right_servo, -speed)
-    set_servo_speed(middle_left_servo, speed)
-    set_servo_speed(middle_right_servo, -speed)
-    set_servo_speed(rear_left_servo, speed)
-    set_servo_speed(rear_right_servo, -speed)
+# The UI only posts requests; the control loop's thread is the only one talking to the
+# PCA9685: 100 times a second it takes the newest requests, ramps the wheels towards them
+# and writes what changed (see motor_commands.py and motor_control.py)
+commands = MotorCommands(drivetrain, lifter_servo)
+control_loop = ControlLoop(commands)
+
+# Function to drive the car: linear is the forward speed, angular the turning speed (positive
+# turns left). The control loop mixes it into the six wheel speeds, see skid_steer.py
+def drive(linear, angular):
+    print(f"La voiture roule: vitesse {linear:.0f}, rotation {angular:.0f}")
+    commands.request_drive(linear, angular)
 
 def stop_all():
     print("La voiture s'arrête")
-    set_servo_speed(front_left_servo, 0)
-    set_servo_speed(front_right_servo, 0)
-    set_servo_speed(middle_left_servo, 0)
-    set_servo_speed(middle_right_servo, 0)
-    set_servo_speed(rear_left_servo, 0)
-    set_servo_speed(rear_right_servo, 0)
+    commands.request_drive(0, 0)
 
 def lift_object():
     print("Lever l'objet")
-    set_servo_speed(lifter_servo, 100)
+    commands.request_lifter(100)
 
 def lower_object():
     print("Abaisser l'objet")
-    set_servo_speed(lifter_servo, -100)
+    commands.request_lifter(-100)
 
 def stop_lifter():
     print("Arrêter le lifter")
-    set_servo_speed(lifter_servo, 0)
+    commands.request_lifter(0)
 
 # MotorControlUI class
 class MotorControlUI(QWidget):
@@ -140,8 +105,26 @@ class MotorControlUI(QWidget):
         layout.addWidget(self.speed_label)
         layout.addWidget(self.slider)
 
+        # Labels showing the requests and bus writes, and how steady the control loop runs
+        self.bus_label = QLabel(commands.summary())
+        layout.addWidget(self.bus_label)
+        self.loop_label = QLabel(control_loop.summary())
+        layout.addWidget(self.loop_label)
+
         self.setLayout(layout)
 
+        # Movement chosen with the buttons, as (forward, backward, left, right); held keys take over from it
+        self.button_move = (False, False, False, False)
+        self.command = (0, 0)   # Last (linear, angular) sent
+
+        # The control loop writes to the PCA9685 in its own thread, so the window never waits on the bus
+        control_loop.start()
+
+        # Refresh the statistics twice a second
+        self.stats_timer = QTimer(self)
+        self.stats_timer.timeout.connect(self.update_stats)
+        self.stats_timer.start(500)
+
         # To track if the movement keys are pressed
         self.key_states = {
             Qt.Key_W: False,  # Move forward
@@ -154,30 +137,50 @@ class MotorControlUI(QWidget):
         }
 
     def update_speed(self):
-        # Update the displayed speed value
+        # Update the displayed speed value, and the movement in progress (the control loop
+        # writes only the last of several quick slider or scroll changes)
         speed = self.slider.value()
         self.speed_label.setText(f"Speed: {speed}")
         print(f"Speed changed to: {speed}")
+        self.update_drive()
+
+    def update_drive(self):
+        # One (linear, angular) command from every movement key held (W+A curves left) and the
+        # slider, or from the last movement button if no movement key is held
+        keys = (self.key_states[Qt.Key_W], self.key_states[Qt.Key_S],
+                self.key_states[Qt.Key_A], self.key_states[Qt.Key_D])
+        if not any(keys):
+            keys = self.button_move
+        command = keys_to_command(*keys, self.slider.value())
+        if command == self.command:
+            return
+        self.command = command
+        if command == (0, 0):
+            stop_all()
+            self.status_label.setText("Motor Status: Stopped")
+        else:
+            drive(*command)
+            self.status_label.setText(f"Motor Status: Driving (speed {command[0]:.0f}, turn {command[1]:.0f})")
+
+    def update_stats(self):
+        self.bus_label.setText(commands.summary())
+        self.loop_label.setText(control_loop.summary())
+
+    def start_move(self, forward=False, backward=False, left=False, right=False):
+        self.button_move = (forward, backward, left, right)
+        self.update_drive()
 
     def move_forward(self):
-        speed = self.slider.value()
-        move_forward(speed)
-        self.status_label.setText("Motor Status: Moving Forward")
+        self.start_move(forward=True)
 
     def move_backward(self):
-        speed = self.slider.value()
-        move_backward(speed)
-        self.status_label.setText("Motor Status: Moving Backward")
+        self.start_move(backward=True)
 
     def turn_left(self):
-        speed = self.slider.value()
-        turn_left(speed)
-        self.status_label.setText("Motor Status: Turning Left")
+        self.start_move(left=True)
 
     def turn_right(self):
-        speed = self.slider.value()
-        turn_right(speed)
-        self.status_label.setText("Motor Status: Turning Right")
+        self.start_move(right=True)
 
     def lift_object(self):
         lift_object()
@@ -188,6 +191,8 @@ class MotorControlUI(QWidget):
         self.status_label.setText("Motor Status: Lowering Object")
 
     def stop_all(self):
+        self.button_move = (False, False, False, False)
+        self.command = (0, 0)
         stop_all()
         stop_lifter()
         self.status_label.setText("Motor Status: Stopped")
@@ -205,19 +210,14 @@ class MotorControlUI(QWidget):
 
     def keyPressEvent(self, event):
         # Handle key press events for movement and other actions
-        speed = self.slider.value()  # Get the current speed value
-        if event.key() == Qt.Key_W:
-            self.key_states[Qt.Key_W] = True
-            move_forward(speed)  # Call without self
-        elif event.key() == Qt.Key_S:
-            self.key_states[Qt.Key_S] = True
-            move_backward(speed)  # Call without self
-        elif event.key() == Qt.Key_A:
-            self.key_states[Qt.Key_A] = True
-            turn_left(speed)  # Call without self
-        elif event.key() == Qt.Key_D:
-            self.key_states[Qt.Key_D] = True
-            turn_right(speed)  # Call without self
+        # Holding a key makes the OS repeat it (~30 per second); only the first press counts
+        if event.isAutoRepeat():
+            return
+        if event.key() in (Qt.Key_W, Qt.Key_S, Qt.Key_A, Qt.Key_D):
+            # Movement keys combine: W+A curves left, W+S cancel out
+            self.key_states[event.key()] = True
+            self.button_move = (False, False, False, False)
+            self.update_drive()
         elif event.key() == Qt.Key_1:
             self.key_states[Qt.Key_1] = True
             lift_object()  # Call without self
@@ -226,11 +226,22 @@ class MotorControlUI(QWidget):
             lower_object()  # Call without self
         elif event.key() == Qt.Key_Backspace:
             self.key_states[Qt.Key_Backspace] = True
+            self.button_move = (False, False, False, False)
+            self.command = (0, 0)
             stop_all()  # Call without self
 
     def keyReleaseEvent(self, event):
-        # Handle key release events to stop movement
+        # Handle key release events to stop movement (repeats also send releases, ignore them)
+        if event.isAutoRepeat():
+            return
         if event.key() in self.key_states:
             self.key_states[event.key()] = False
             if all(not state for state in self.key_states.values()):
-                stop_all()  # Stop all actions when no key is pressed
+                self.button_move = (False, False, False, False)  # Stop all movement when no key is pressed
+            self.update_drive()  # The keys still held decide the movement
+
+    def closeEvent(self, event):
+        control_loop.stop()  # Stops the wheels
+        print(f"Motor commands: {commands.summary()}")
+        print(f"Control loop: {control_loop.summary()}")
+        event.accept()
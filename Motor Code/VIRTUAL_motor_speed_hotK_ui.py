@@ -1,10 +1,17 @@
 import sys
 from PyQt5.QtWidgets import QApplication, QWidget, QVBoxLayout, QLabel, QPushButton, QSlider
 from PyQt5.QtCore import Qt
+from drivetrain import speed_to_duty
+from simulated_pca9685 import SimulatedPCA9685
 
-# Simulate servo control (no actual hardware interaction)
+# Simulated PCA9685 (no actual hardware), its I2C writes take as long as on the car's bus
+pca = SimulatedPCA9685()
+pca.frequency = 50
+
+# Simulate servo control: the duty cycle is written to the simulated chip and read back
 def set_servo_speed(channel, speed):
-    print(f"Setting servo on channel {channel} to speed {speed}")
+    pca.channels[channel].duty_cycle = speed_to_duty(speed)
+    print(f"Setting servo on channel {channel} to speed {speed} (duty cycle {pca.channels[channel].duty_cycle})")
 
 # Define movement functions (simulated)
 def move_forward(speed):
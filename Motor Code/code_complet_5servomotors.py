@@ -1,11 +1,8 @@
 import time
-import board
-import busio
-from adafruit_pca9685 import PCA9685
+from simulated_pca9685 import open_pca9685
 
-# Configurer I2C
-i2c = busio.I2C(board.SCL, board.SDA)
-pca = PCA9685(i2c)
+# Configurer I2C (MOTOR_SIMULATED=1 pour lancer sans la voiture)
+pca = open_pca9685()
 
 # Régler la fréquence PWM pour les servos
 pca.frequency = 50  # Fréquence standard pour les servomoteurs (50Hz)
@@ -0,0 +1,95 @@
+import struct
+
+# PCA9685 registers (see the datasheet, section 7.3)
+MODE1 = 0x00
+MODE1_RESTART = 0x80
+MODE1_AI = 0x20            # Register auto-increment: a write continues into the next registers
+LED0_ON_L = 0x06           # Each channel has 4 registers: ON_L, ON_H, OFF_L, OFF_H
+REGISTERS_PER_CHANNEL = 4
+FULL_ON = 0x1000           # Bit 4 of ON_H / OFF_H
+
+# Speeds go from -MAX_SPEED (full reverse) to MAX_SPEED (full forward)
+MAX_SPEED = 100
+
+# Wheel channels in order: front left, front right, middle left, middle right, rear left, rear right.
+# They are consecutive so their 24 registers can be written in one go.
+WHEEL_CHANNELS = (0, 1, 2, 3, 4, 5)
+
+
+# Function to convert a speed (-100..100) to a 16 bit duty cycle (same as set_servo_speed)
+def speed_to_duty(speed):
+    if speed == 0:
+        return 0
+    pulse_width = int((speed / 100.0) * 500 + 1500)  # -100 -> 1ms, 100 -> 2ms
+    return int((pulse_width / 20000) * 65535)
+
+
+# Duty cycle of every whole speed, DUTY_TABLE[speed + MAX_SPEED], so writing a speed needs no float math
+DUTY_TABLE = [speed_to_duty(speed) for speed in range(-MAX_SPEED, MAX_SPEED + 1)]
+
+
+# Function to look up the duty cycle of a speed (-100..100, fractions are dropped)
+def lookup_duty(speed):
+    speed = int(speed)
+    if not -MAX_SPEED <= speed <= MAX_SPEED:
+        raise ValueError(f"Out of range: speed {speed} not -{MAX_SPEED} <= speed <= {MAX_SPEED}")
+    return DUTY_TABLE[speed + MAX_SPEED]
+
+
+# Function to convert a 16 bit duty cycle to a channel's (ON, OFF) counts, like adafruit_pca9685 does
+def duty_to_counts(duty):
+    if duty == 0xFFFF:
+        return FULL_ON, 0
+    if duty < 0x0010:
+        return 0, FULL_ON
+    return 0, duty >> 4
+
+
+# Class that sets all the wheel channels of a PCA9685 in one I2C write
+class Drivetrain:
+    """ Setting channel.duty_cycle is one I2C transaction per channel, so with six
+    wheels the first wheel changes speed several milliseconds before the last one
+    and each command costs six bus round trips. With auto-increment on, one write
+    starting at the first wheel's LED register fills all of them, and the PCA9685
+    applies the new values together at the end of the transaction (the default
+    MODE2 OCH setting).
+
+    The last duties written are kept, and a write that would not change any of
+    them is skipped.
+    """
+
+    def __init__(self, pca, channels=WHEEL_CHANNELS):
+        if list(channels) != list(range(channels[0], channels[0] + len(channels))):
+            raise ValueError("Drivetrain channels must be consecutive")
+        self.pca = pca
+        self.channels = tuple(channels)
+        # Register address followed by 4 bytes per channel, reused for every write
+        self.buffer = bytearray(1 + REGISTERS_PER_CHANNEL * len(channels))
+        self.buffer[0] = LED0_ON_L + REGISTERS_PER_CHANNEL * channels[0]
+        self.duties = [0] * len(channels)   # Last duties written to the chip
+        self.written = False                # Nothing is known about the chip until the first write
+        self.writes = 0
+        self.skipped = 0
+        # adafruit_pca9685 turns auto-increment on when the frequency is set; make sure it is on
+        # (writing 0 to RESTART leaves the outputs alone)
+        self.pca.mode1_reg = (self.pca.mode1_reg & ~MODE1_RESTART & 0xFF) | MODE1_AI
+
+    def set_duties(self, duties):
+        """ Write one 16 bit duty cycle per channel. Returns False if nothing changed, so nothing was written. """
+        if self.written and list(duties) == self.duties:
+            self.skipped += 1
+            return False
+        for i, duty in enumerate(duties):
+            if not 0 <= duty <= 0xFFFF:
+                raise ValueError(f"Out of range: value {duty} not 0 <= value <= 65,535")
+            struct.pack_into("<HH", self.buffer, 1 + REGISTERS_PER_CHANNEL * i, *duty_to_counts(duty))
+        with self.pca.i2c_device as i2c:
+            i2c.write(self.buffer)
+        self.duties[:] = duties  # Only once the write went through
+        self.written = True
+        self.writes += 1
+        return True
+
+    def set_speeds(self, speeds):
+        """ Write one speed (-100..100) per channel. Returns False if nothing changed. """
+        return self.set_duties([lookup_duty(speed) for speed in speeds])
@@ -0,0 +1,59 @@
+import time
+import numpy as np
+from drivetrain import Drivetrain, speed_to_duty, LED0_ON_L, WHEEL_CHANNELS
+from simulated_pca9685 import SimulatedPCA9685, SimulatedI2CBus, BUS_FREQUENCY, TRANSACTION_OVERHEAD
+
+# Measures how long a six wheel command takes to reach every wheel, writing each channel's
+# duty_cycle (what the motor scripts did) against one burst write, on a simulated PCA9685
+# whose I2C transactions take as long as they would on the Pi's bus
+COMMANDS = 500
+
+
+def wheel_update_times(device):
+    registers = [LED0_ON_L + 4 * channel + 3 for channel in WHEEL_CHANNELS]  # OFF_H is written last
+    return device.updated[registers]
+
+
+def measure(name, command, pca, speeds):
+    latencies, skews = [], []
+    device = pca.i2c_device
+    start_transactions = pca.i2c_bus.transactions
+    for row in speeds:
+        start_time = time.monotonic()
+        command(row)
+        updated = wheel_update_times(device)
+        latencies.append((updated.max() - start_time) * 1000)
+        skews.append((updated.max() - updated.min()) * 1000)
+    transactions = (pca.i2c_bus.transactions - start_transactions) / len(speeds)
+    print(f"{name:<22} {transactions:4.1f} transactions, all wheels updated after {np.mean(latencies):5.2f} ms "
+          f"(p99 {np.percentile(latencies, 99):5.2f}), first to last wheel {np.mean(skews):5.2f} ms")
+
+
+def main():
+    rng = np.random.default_rng(0)
+    speeds = rng.integers(-100, 101, size=(COMMANDS, len(WHEEL_CHANNELS)))
+    print(f"{COMMANDS} six wheel commands, {BUS_FREQUENCY // 1000} kHz I2C, "
+          f"{TRANSACTION_OVERHEAD * 1e6:.0f} us overhead per transaction")
+
+    pca = SimulatedPCA9685(SimulatedI2CBus())
+    pca.frequency = 50
+
+    def per_channel(row):
+        for channel, speed in zip(WHEEL_CHANNELS, row):
+            pca.channels[channel].duty_cycle = speed_to_duty(speed)
+
+    measure("duty_cycle per channel", per_channel, pca, speeds)
+    drivetrain = Drivetrain(pca)
+    measure("Drivetrain burst", drivetrain.set_speeds, pca, speeds)
+
+    # Both must leave the same register contents
+    check = SimulatedPCA9685(SimulatedI2CBus(overhead=0.0, bus_frequency=1e9))
+    check.frequency = 50
+    for channel, speed in zip(WHEEL_CHANNELS, speeds[-1]):
+        check.channels[channel].duty_cycle = speed_to_duty(speed)
+    same = check.i2c_device.registers[LED0_ON_L:LED0_ON_L + 24] == pca.i2c_device.registers[LED0_ON_L:LED0_ON_L + 24]
+    print(f"Registers match: {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+from drivetrain import lookup_duty
+
+
+# Class that collects motor requests from the UI and writes only what changed, once per control
+# loop tick (CONTROL_RATE in motor_control.py)
+class MotorCommands:
+    """ request_drive(), request_wheels() and request_lifter() only keep the newest
+    request, so a slider dragged through twenty values between two ticks costs one bus
+    write, and a write that would not change the chip's registers is skipped. The I2C bus is shared with
+    the geophone ADC and the thermal camera, so every write saved is bus time for them.
+
+    Each request replaces a (request number, value) tuple in one attribute store and
+    the take_*() methods read it in one attribute load, both atomic in Python,
+    so the UI thread can post while another thread (see motor_control.py) takes, with
+    no lock for either side to wait on. tick() takes and writes the wheel and lifter
+    requests in one go; drive commands need the control loop's mixer.
+    """
+
+    def __init__(self, drivetrain, lifter_channel=None):
+        self.drivetrain = drivetrain
+        self.lifter_channel = lifter_channel
+        self.drive_slot = (0, None)   # Replaced whole by every request, never modified
+        self.wheel_slot = (0, None)
+        self.lifter_slot = (0, None)
+        self.drive_taken = 0          # Request number last taken
+        self.wheels_taken = 0
+        self.lifter_taken = 0
+        self.lifter_duty = None       # Last duty written to the lifter channel
+
+        self.bus_writes = 0
+        self.coalesced = 0            # Requests replaced by a newer one before they were taken
+        self.unchanged = 0            # Writes skipped because the chip already had those values
+
+    def request_drive(self, linear, angular):
+        """ A (linear, angular) command for the control loop's mixer, see skid_steer.py. """
+        self.drive_slot = (self.drive_slot[0] + 1, (linear, angular))
+
+    def request_wheels(self, speeds):
+        """ Six wheel speeds (-100..100): front left, front right, middle left, middle right, rear left, rear right. """
+        self.wheel_slot = (self.wheel_slot[0] + 1, tuple(speeds))
+
+    def request_lifter(self, speed):
+        self.lifter_slot = (self.lifter_slot[0] + 1, speed)
+
+    def take_drive(self):
+        """ The newest (linear, angular) command, or None if there is none since the last call. """
+        number, command = self.drive_slot
+        if number == self.drive_taken:
+            return None
+        self.coalesced += number - self.drive_taken - 1
+        self.drive_taken = number
+        return command
+
+    def take_wheels(self):
+        """ The newest wheel request, or None if there is none since the last call. """
+        number, speeds = self.wheel_slot
+        if number == self.wheels_taken:
+            return None
+        self.coalesced += number - self.wheels_taken - 1
+        self.wheels_taken = number
+        return speeds
+
+    def take_lifter(self):
+        number, speed = self.lifter_slot
+        if number == self.lifter_taken:
+            return None
+        self.coalesced += number - self.lifter_taken - 1
+        self.lifter_taken = number
+        return speed
+
+    def write_wheels(self, speeds):
+        """ Returns True if the registers changed. """
+        if self.drivetrain.set_speeds(speeds):
+            self.bus_writes += 1
+            return True
+        self.unchanged += 1
+        return False
+
+    def write_lifter(self, speed):
+        duty = lookup_duty(speed)
+        if duty == self.lifter_duty:
+            self.unchanged += 1
+            return False
+        self.lifter_channel.duty_cycle = duty
+        self.lifter_duty = duty
+        self.bus_writes += 1
+        return True
+
+    def tick(self):
+        """ Write the newest requests. Returns True if anything was written. """
+        wrote = False
+        speeds = self.take_wheels()
+        if speeds is not None:
+            wrote = self.write_wheels(speeds) or wrote
+        speed = self.take_lifter()
+        if speed is not None:
+            wrote = self.write_lifter(speed) or wrote
+        return wrote
+
+    @property
+    def requests(self):
+        return self.drive_slot[0] + self.wheel_slot[0] + self.lifter_slot[0]
+
+    def summary(self):
+        # With the control loop ramping the wheels, one request can take several writes
+        return (f"{self.requests} requests, {self.bus_writes} bus writes "
+                f"({self.coalesced} coalesced, {self.unchanged} unchanged)")
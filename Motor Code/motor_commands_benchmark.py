@@ -0,0 +1,99 @@
+import numpy as np
+from drivetrain import Drivetrain, speed_to_duty, WHEEL_CHANNELS
+from simulated_pca9685 import SimulatedPCA9685, SimulatedI2CBus
+from motor_commands import MotorCommands
+from motor_control import CONTROL_RATE
+
+# Replays a few seconds of driving with the keyboard and the speed slider through the old
+# event handlers (every event writes all six channels) and through MotorCommands, and counts
+# the I2C traffic each puts on the bus the geophone ADC and thermal camera also use
+KEY_REPEAT = 1 / 30.0    # OS auto-repeat interval while a key is held
+SLIDER_STEP = 0.0025     # Seconds between slider valueChanged events while dragging
+CONTROL_TICK = 1.0 / CONTROL_RATE   # Seconds between the control loop's writes
+
+
+# Function to make the session: (time, event, value), in time order
+def make_session():
+    events = []
+
+    def hold(key, start, end):
+        events.append((start, "press", key))
+        t = start + 0.5   # Repeat delay
+        while t < end:
+            events.append((t, "repeat release", key))
+            events.append((t, "repeat press", key))
+            t += KEY_REPEAT
+        events.append((end, "release", key))
+
+    hold("W", 0.0, 3.0)
+    for i, t in enumerate(np.arange(1.0, 1.5, SLIDER_STEP)):    # Drag the slider from 50 to 100 while driving
+        events.append((t, "slider", min(100, 50 + i // 4)))
+    hold("D", 4.0, 6.0)
+    for i, t in enumerate(np.arange(4.5, 4.9, 0.01)):          # Scroll 40 notches down while turning
+        events.append((t, "slider", 100 - i - 1))
+    events.sort(key=lambda event: event[0])
+    return events
+
+
+MOVES = {"W": (1, 1, 1, 1, 1, 1), "D": (1, -1, 1, -1, 1, -1)}
+
+
+def run_old(events, pca):
+    """ The old handlers: every press (repeats too) writes six channels, and every release
+    (repeats too) stops all six wheels; the slider only changes the next command's speed. """
+    speed = 50
+    for _, event, value in events:
+        if event == "slider":
+            speed = value
+        elif event.endswith("press"):
+            for channel, direction in zip(WHEEL_CHANNELS, MOVES[value]):
+                pca.channels[channel].duty_cycle = speed_to_duty(direction * speed)
+        else:
+            for channel in WHEEL_CHANNELS:
+                pca.channels[channel].duty_cycle = 0
+
+
+def run_new(events, pca):
+    """ MotorCommands: repeats are ignored, the slider updates the movement in progress,
+    and a control tick writes the newest request if it changed anything. """
+    commands = MotorCommands(Drivetrain(pca))
+    speed, held = 50, None
+    next_tick = CONTROL_TICK
+    for t, event, value in events + [(events[-1][0] + CONTROL_TICK, "end", None)]:
+        while next_tick <= t:
+            commands.tick()
+            next_tick += CONTROL_TICK
+        if event.startswith("repeat") or event == "end":
+            continue
+        if event == "slider":
+            speed = value
+        elif event == "press":
+            held = value
+        else:
+            held = None
+            commands.request_wheels([0] * 6)
+            continue
+        if held is not None:
+            commands.request_wheels([direction * speed for direction in MOVES[held]])
+    return commands
+
+
+def main():
+    events = make_session()
+    print(f"{len(events)} UI events in {events[-1][0]:.1f} s of driving")
+    for name, run in (("old handlers", run_old), ("MotorCommands", run_new)):
+        pca = SimulatedPCA9685(SimulatedI2CBus(overhead=0.0, bus_frequency=1e9))  # Count the traffic, do not wait for it
+        pca.frequency = 50
+        bus = pca.i2c_bus
+        start_transactions, start_bytes = bus.transactions, bus.bytes
+        result = run(events, pca)
+        transactions = bus.transactions - start_transactions
+        bus_bytes = bus.bytes - start_bytes
+        bus_time = (transactions * 150e-6 + bus_bytes * 9 / 100000) * 1000
+        print(f"{name:<14} {transactions:5d} I2C transactions, {bus_bytes:6d} bytes, ~{bus_time:6.0f} ms of bus time at 100 kHz")
+        if result is not None:
+            print(f"               {result.summary()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+import time
+import threading
+import numpy as np
+from skid_steer import SkidSteerMixer
+
+# Control loop settings
+CONTROL_RATE = 100          # Ticks per second
+MAX_ACCELERATION = 250.0    # Speed units (-100..100) per second while a wheel speeds up: 0 to 100 in 0.4 s
+MAX_DECELERATION = 500.0    # ... while it slows down or reverses, so stopping stays quick
+JITTER_HISTORY = 1000       # Ticks kept for the jitter statistics
+
+
+# Function to move each wheel's speed towards its target by at most the allowed change for dt seconds
+def slew(current, target, dt, max_acceleration=MAX_ACCELERATION, max_deceleration=MAX_DECELERATION, out=None):
+    """ current and target are arrays of speeds. A wheel is speeding up when its target is
+    further from 0 than its current speed and on the same side. """
+    speeding_up = (np.abs(target) > np.abs(current)) & (target * current >= 0)
+    step = np.where(speeding_up, max_acceleration, max_deceleration) * dt
+    return np.add(current, np.clip(target - current, -step, step), out=out)
+
+
+# Class that owns the PCA9685 and updates the wheels at a fixed rate in its own thread
+class ControlLoop:
+    """ The UI only posts requests to MotorCommands, which never waits, so an I2C hiccup
+    stalls this thread and not the window. Every tick the loop takes the newest
+    requests (a drive command goes through the skid steer mixer once, here, whatever
+    number of key and slider events it replaced), ramps each wheel towards its target
+    (slew()) and writes the wheels in one burst (skipped when nothing changed).
+    Ticks are scheduled on monotonic deadlines; a tick that finishes after the next
+    deadline is an overrun and the ticks it ran into are skipped instead of being
+    run late in a burst.
+    """
+
+    def __init__(self, commands, rate=CONTROL_RATE, max_acceleration=MAX_ACCELERATION,
+                 max_deceleration=MAX_DECELERATION, wheels=6, mixer=None):
+        self.commands = commands
+        self.mixer = mixer if mixer is not None else SkidSteerMixer()
+        self.period = 1.0 / rate
+        self.max_acceleration = max_acceleration
+        self.max_deceleration = max_deceleration
+        self.target = np.zeros(wheels)
+        self.current = np.zeros(wheels)
+        self.dirty = False   # Wheels not yet written as they are now
+        self.lifter_speed = None   # Lifter request not yet written
+        self.thread = None
+        self.running = False
+
+        self.ticks = 0
+        self.overruns = 0
+        self.skipped_ticks = 0
+        self.errors = 0
+        self.last_error = None
+        self.failed = None     # The exception that ended the loop, if one did
+        self.jitter = np.zeros(JITTER_HISTORY)   # Seconds each tick started after its deadline
+        self.work_time = np.zeros(JITTER_HISTORY)
+
+    def step(self, dt):
+        """ One tick: take new requests, ramp, write. Idle ticks do not touch the bus. """
+        speeds = self.commands.take_wheels()
+        if speeds is not None:
+            self.target[:] = speeds
+            self.dirty = True
+        command = self.commands.take_drive()
+        if command is not None:
+            self.target[:] = self.mixer.mix(*command)
+            self.dirty = True
+        if not np.array_equal(self.current, self.target):
+            slew(self.current, self.target, dt, self.max_acceleration, self.max_deceleration, out=self.current)
+            self.dirty = True
+        if self.dirty:
+            self.commands.write_wheels(np.round(self.current).astype(int).tolist())
+            self.dirty = False   # Stays set if the write raised, so the next tick tries again
+        speed = self.commands.take_lifter()
+        if speed is not None:
+            self.lifter_speed = speed
+        if self.lifter_speed is not None:
+            self.commands.write_lifter(self.lifter_speed)
+            self.lifter_speed = None   # Kept if the write raised: a lost stop would leave the lifter running
+
+    def _run(self):
+        try:
+            self._loop()
+        except BaseException as e:
+            self.failed = e
+            raise   # A bug (anything but an I2C error) ends the loop with its traceback
+        finally:
+            self.running = False
+            self._write_stop()   # The chip keeps its last duties, so a dead loop must not leave the car driving
+
+    def _loop(self):
+        deadline = time.monotonic()
+        while self.running:
+            now = time.monotonic()
+            if now < deadline:
+                time.sleep(deadline - now)
+                now = time.monotonic()
+            index = self.ticks % JITTER_HISTORY
+            self.jitter[index] = now - deadline
+            try:
+                self.step(self.period)
+            except OSError as e:
+                # I2C errors: keep the loop going, the next tick writes again
+                self.errors += 1
+                self.last_error = str(e)
+            finished = time.monotonic()
+            self.work_time[index] = finished - now
+            self.ticks += 1
+
+            deadline += self.period
+            if finished > deadline:
+                self.overruns += 1
+                missed = int((finished - deadline) / self.period) + 1
+                self.skipped_ticks += missed
+                deadline += missed * self.period
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """ Stop the thread, then stop the wheels straight away (no ramp). """
+        self.running = False
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        self._write_stop()
+
+    def _write_stop(self):
+        """ Set the wheels to 0 at once. An I2C error is counted, not raised: this runs
+        from closeEvent(), where an exception would abort the process. """
+        self.target[:] = 0
+        self.current[:] = 0
+        self.dirty = False
+        try:
+            self.commands.write_wheels([0] * len(self.current))
+        except OSError as e:
+            self.errors += 1
+            self.last_error = str(e)
+            print(f"Motor Error {e}")
+
+    def jitter_stats(self):
+        """ (mean, 99th percentile, max) tick lateness in milliseconds over the last ticks. """
+        count = min(self.ticks, JITTER_HISTORY)
+        if count == 0:
+            return 0.0, 0.0, 0.0
+        jitter = self.jitter[:count] * 1000
+        return float(jitter.mean()), float(np.percentile(jitter, 99)), float(jitter.max())
+
+    def summary(self):
+        mean, p99, worst = self.jitter_stats()
+        stopped = f"STOPPED by {type(self.failed).__name__}: {self.failed}, " if self.failed is not None else ""
+        return (f"{stopped}{self.ticks} ticks, jitter mean {mean:.2f} ms / p99 {p99:.2f} ms / max {worst:.2f} ms, "
+                f"{self.overruns} overruns ({self.skipped_ticks} ticks skipped), {self.errors} errors")
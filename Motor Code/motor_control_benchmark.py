@@ -0,0 +1,99 @@
+import time
+import numpy as np
+from drivetrain import Drivetrain
+from simulated_pca9685 import SimulatedPCA9685, SimulatedI2CBus
+from motor_commands import MotorCommands
+from motor_control import ControlLoop, CONTROL_RATE
+
+# Drives a simulated PCA9685 whose bus is shared with the geophone ADC and now and then stalls
+# (the thermal camera holding it, clock stretching) and compares:
+# - the old way: the UI handler writes the wheels itself and waits for the bus
+# - ControlLoop: the UI posts a request and the loop's thread does the writing
+SECONDS = 5
+UI_EVENT_PERIOD = 0.0025     # Slider drag: a request every 2.5 ms
+STALL_PROBABILITY = 0.01     # Per transaction
+STALL_TIME = 0.030           # Seconds the bus is held
+ADC_ADDRESS = 0x48
+ADC_RATE = 250               # Geophone readings per second on the same bus
+
+
+def make_pca():
+    bus = SimulatedI2CBus(stall_probability=STALL_PROBABILITY, stall_time=STALL_TIME)
+    bus.add_load(ADC_ADDRESS, 2, 1.0 / ADC_RATE)
+    pca = SimulatedPCA9685(bus)
+    pca.frequency = 50
+    return pca
+
+
+def random_speeds(rng):
+    return rng.integers(-100, 101, size=6).tolist()
+
+
+def ui_synchronous():
+    """ The UI thread writes every request itself. """
+    rng = np.random.default_rng(1)
+    drivetrain = Drivetrain(make_pca())
+    latencies = []
+    end_time = time.perf_counter() + SECONDS
+    while time.perf_counter() < end_time:
+        start_time = time.perf_counter()
+        drivetrain.set_speeds(random_speeds(rng))
+        latencies.append(time.perf_counter() - start_time)
+        time.sleep(UI_EVENT_PERIOD)
+    drivetrain.pca.i2c_bus.stop()
+    return np.array(latencies) * 1000, drivetrain.pca.i2c_bus.stalls
+
+
+def ui_control_loop():
+    """ The UI thread posts; ControlLoop writes at CONTROL_RATE. """
+    rng = np.random.default_rng(1)
+    pca = make_pca()
+    commands = MotorCommands(Drivetrain(pca))
+    loop = ControlLoop(commands)
+    loop.start()
+    latencies = []
+    end_time = time.perf_counter() + SECONDS
+    while time.perf_counter() < end_time:
+        start_time = time.perf_counter()
+        commands.request_wheels(random_speeds(rng))
+        latencies.append(time.perf_counter() - start_time)
+        time.sleep(UI_EVENT_PERIOD)
+    loop.stop()
+    pca.i2c_bus.stop()
+    return np.array(latencies) * 1000, pca.i2c_bus.stalls, loop, commands
+
+
+def ramp_time(loop, start, target):
+    """ Seconds of simulated ticks for the wheels to go from start to target. """
+    loop.current[:] = start
+    loop.target[:] = start
+    loop.commands.request_wheels([target] * 6)
+    ticks = 0
+    while loop.current[0] != target:
+        loop.step(loop.period)
+        ticks += 1
+    return ticks * loop.period
+
+
+def main():
+    print(f"{SECONDS} s of UI requests every {UI_EVENT_PERIOD * 1000:.1f} ms, ADC read {ADC_RATE} times/s on the same bus, "
+          f"bus stalls {STALL_TIME * 1000:.0f} ms on {STALL_PROBABILITY:.0%} of transactions")
+
+    latencies, stalls = ui_synchronous()
+    print(f"UI writes itself  {len(latencies):5d} requests, UI blocked mean {latencies.mean():7.3f} ms, "
+          f"p99 {np.percentile(latencies, 99):7.3f} ms, max {latencies.max():7.3f} ms ({stalls} stalls)")
+
+    latencies, stalls, loop, commands = ui_control_loop()
+    print(f"ControlLoop       {len(latencies):5d} requests, UI blocked mean {latencies.mean():7.3f} ms, "
+          f"p99 {np.percentile(latencies, 99):7.3f} ms, max {latencies.max():7.3f} ms ({stalls} stalls)")
+    print(f"  {CONTROL_RATE} Hz loop: {loop.summary()}")
+    print(f"  {commands.summary()}")
+
+    # Ramps, stepped by hand so they do not depend on the machine's timing
+    ramp_loop = ControlLoop(MotorCommands(Drivetrain(SimulatedPCA9685(SimulatedI2CBus(overhead=0.0, bus_frequency=1e9)))))
+    print(f"Ramps: 0 -> 100 in {ramp_time(ramp_loop, 0, 100):.2f} s, 100 -> 0 in {ramp_time(ramp_loop, 100, 0):.2f} s, "
+          f"100 -> -100 in {ramp_time(ramp_loop, 100, -100):.2f} s")
+
+
+if __name__ == "__main__":
+    main()
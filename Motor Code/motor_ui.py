@@ -1,15 +1,20 @@
 import sys
 import time
-import board
-import busio
-from adafruit_pca9685 import PCA9685
+from drivetrain import Drivetrain
+from simulated_pca9685 import open_pca9685
+from skid_steer import SkidSteerMixer
 from PyQt5.QtWidgets import QApplication, QWidget, QVBoxLayout, QLabel, QPushButton
 
-# Initialize I2C and PCA9685 for servo control
-i2c = busio.I2C(board.SCL, board.SDA)
-pca = PCA9685(i2c)
+# Initialize I2C and PCA9685 for servo control (set MOTOR_SIMULATED=1 to run without the car)
+pca = open_pca9685()
 pca.frequency = 50  # Standard frequency for servos (50Hz)
 
+# Writes the six wheel channels (0-5) in one I2C transaction, see drivetrain.py
+drivetrain = Drivetrain(pca)
+
+# Turns a (linear, angular) command into the six wheel speeds, see skid_steer.py
+mixer = SkidSteerMixer()
+
 # Assign channels to the 6 servos for movement and 1 for lifting
 front_left_servo = pca.channels[0]
 front_right_servo = pca.channels[1]
@@ -18,6 +23,12 @@ middle_right_servo = pca.channels[3]  # New motor
 rear_left_servo = pca.channels[4]
 rear_right_servo = pca.channels[5]
 lifter_servo = pca.channels[6]
+servos = [front_left_servo, front_right_servo, middle_left_servo, middle_right_servo,
+          rear_left_servo, rear_right_servo, lifter_servo]
+
+# Optional function(first channel number, speeds) called once after every speed change with the new
+# speeds of that channel and the ones after it, so a wheel command is one call (combined.py uses it)
+speed_listener = None
 
 # Function to set servo speed
 def set_servo_speed(channel, speed):
@@ -27,52 +38,39 @@ def set_servo_speed(channel, speed):
         pulse_width = int((speed / 100.0) * 500 + 1500)  # -100 -> 1ms, 100 -> 2ms
         pwm_value = int((pulse_width / 20000) * 65535)
         channel.duty_cycle = pwm_value
+    if speed_listener is not None:
+        speed_listener(servos.index(channel), (speed,))
+
+# Function to set all six wheels at once: front left, front right, middle left, middle right, rear left, rear right
+def set_wheel_speeds(*speeds):
+    drivetrain.set_speeds(speeds)
+    if speed_listener is not None:
+        speed_listener(0, speeds)
+
+# Function to drive the car: linear is the forward speed, angular the turning speed (positive turns left)
+def drive(linear, angular):
+    set_wheel_speeds(*mixer.mix(linear, angular))
 
 # Define movement functions
 def move_forward():
     print("La voiture avance")
-    set_servo_speed(front_left_servo, 100)
-    set_servo_speed(front_right_servo, 100)
-    set_servo_speed(middle_left_servo, 100)
-    set_servo_speed(middle_right_servo, 100)
-    set_servo_speed(rear_left_servo, 100)
-    set_servo_speed(rear_right_servo, 100)
+    drive(100, 0)
 
 def move_backward():
     print("La voiture recule")
-    set_servo_speed(front_left_servo, -100)
-    set_servo_speed(front_right_servo, -100)
-    set_servo_speed(middle_left_servo, -100)
-    set_servo_speed(middle_right_servo, -100)
-    set_servo_speed(rear_left_servo, -100)
-    set_servo_speed(rear_right_servo, -100)
+    drive(-100, 0)
 
 def turn_left():
     print("La voiture tourne à gauche (pivot)")
-    set_servo_speed(front_left_servo, -50)
-    set_servo_speed(front_right_servo, 50)
-    set_servo_speed(middle_left_servo, -50)
-    set_servo_speed(middle_right_servo, 50)
-    set_servo_speed(rear_left_servo, -50)
-    set_servo_speed(rear_right_servo, 50)
+    drive(0, 50)
 
 def turn_right():
     print("La voiture tourne à droite (pivot)")
-    set_servo_speed(front_left_servo, 50)
-    set_servo_speed(front_right_servo, -50)
-    set_servo_speed(middle_left_servo, 50)
-    set_servo_speed(middle_right_servo, -50)
-    set_servo_speed(rear_left_servo, 50)
-    set_servo_speed(rear_right_servo, -50)
+    drive(0, -50)
 
 def stop_all():
     print("La voiture s'arrête")
-    set_servo_speed(front_left_servo, 0)
-    set_servo_speed(front_right_servo, 0)
-    set_servo_speed(middle_left_servo, 0)
-    set_servo_speed(middle_right_servo, 0)
-    set_servo_speed(rear_left_servo, 0)
-    set_servo_speed(rear_right_servo, 0)
+    drive(0, 0)
 
 def lift_object():
     print("Lever l'objet")
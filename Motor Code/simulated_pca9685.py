@@ -0,0 +1,236 @@
+import os
+import time
+import threading
+import collections
+import numpy as np
+from drivetrain import MODE1, MODE1_AI, MODE1_RESTART, LED0_ON_L, FULL_ON, duty_to_counts
+
+# Environment variable used by open_pca9685(): set it to drive SimulatedPCA9685 instead of the chip
+SIMULATED_ENV = "MOTOR_SIMULATED"
+
+# Bus timing
+BUS_FREQUENCY = 100000         # Hz, the Pi's default I2C clock
+TRANSACTION_OVERHEAD = 150e-6  # Seconds per transaction for the start/stop and the driver call
+SPIN_TIME = 0.0005             # The end of each transaction is busy waited, sleep() alone is too coarse
+TRACE_LENGTH = 100000          # Transactions kept in the trace
+
+# PCA9685 (see the datasheet, section 7.3)
+PCA9685_ADDRESS = 0x40
+PRESCALE = 0xFE
+MODE1_SLEEP = 0x10
+REFERENCE_CLOCK_SPEED = 25000000
+
+
+# Function to wait until a time.monotonic() time without oversleeping much
+def wait_until(end_time):
+    remaining = end_time - time.monotonic() - SPIN_TIME
+    if remaining > 0:
+        time.sleep(remaining)  # Lets other threads run, like the real driver waiting on the kernel
+    while time.monotonic() < end_time:
+        pass
+
+
+# Class that stands in for the Pi's I2C bus: one transaction at a time, each taking as long as it would on the wire
+class SimulatedI2CBus:
+    """ A transaction takes overhead plus 9 clocks (8 bits and the ACK) per byte,
+    address bytes included. A device that finds the bus busy waits for it, the time
+    spent waiting is added to wait_time. With stall_probability, a transaction
+    holds the bus stall_time longer (clock stretching, a slow device).
+
+    add_load() adds the other devices on the bus (the thermal camera, the geophone
+    ADC) as threads doing a transaction of their own at a fixed period.
+
+    Every transaction is appended to trace as (start, end, address, data, read_count),
+    times from time.monotonic() like the rest of the sensor code.
+    """
+
+    def __init__(self, bus_frequency=BUS_FREQUENCY, overhead=TRANSACTION_OVERHEAD, stall_probability=0.0,
+                 stall_time=0.030, trace_length=TRACE_LENGTH, seed=0):
+        self.bus_frequency = bus_frequency
+        self.overhead = overhead
+        self.stall_probability = stall_probability
+        self.stall_time = stall_time
+        self.rng = np.random.default_rng(seed)
+        self.lock = threading.Lock()
+        self.trace = collections.deque(maxlen=trace_length)
+        self.transactions = 0
+        self.bytes = 0
+        self.stalls = 0
+        self.wait_time = 0.0
+        self.loads = []
+        self.running = True
+
+    def transaction_time(self, byte_count):
+        return self.overhead + byte_count * 9 / self.bus_frequency
+
+    def transfer(self, address, data, read_count=0):
+        """ Hold the bus for one transaction writing data then reading read_count bytes.
+        Returns the (start, end) time.monotonic() of the transaction. """
+        requested = time.monotonic()
+        with self.lock:
+            start_time = time.monotonic()
+            self.wait_time += start_time - requested
+            byte_count = len(data) + read_count + (2 if read_count else 1)  # A read repeats the address
+            duration = self.transaction_time(byte_count)
+            if self.stall_probability and self.rng.random() < self.stall_probability:
+                duration += self.stall_time
+                self.stalls += 1
+            end_time = start_time + duration
+            wait_until(end_time)
+            self.transactions += 1
+            self.bytes += byte_count
+            self.trace.append((start_time, end_time, address, bytes(data), read_count))
+        return start_time, end_time
+
+    def add_load(self, address, byte_count, period):
+        """ Another device reading byte_count bytes every period seconds, until stop(). """
+        def run():
+            next_time = time.monotonic()
+            while self.running:
+                wait_until(next_time)
+                self.transfer(address, b"\x00", byte_count)
+                next_time = max(next_time + period, time.monotonic())
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        self.loads.append(thread)
+
+    def stop(self):
+        self.running = False
+        for thread in self.loads:
+            thread.join()
+        self.loads = []
+
+
+# Stand-in for adafruit_bus_device's I2CDevice: the device's registers, with auto-increment
+class SimulatedI2CDevice:
+    def __init__(self, bus, address):
+        self.bus = bus
+        self.address = address
+        self.registers = bytearray(256)
+        self.updated = np.zeros(256)   # time.monotonic() when each register last took effect
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def _auto_increment(self):
+        return self.registers[MODE1] & MODE1_AI
+
+    def write(self, buffer, *, start=0, end=None):
+        buffer = bytes(buffer[start:end])
+        _, end_time = self.bus.transfer(self.address, buffer)
+        register = buffer[0]
+        count = len(buffer) - 1 if self._auto_increment() else 1
+        self.registers[register:register + count] = buffer[1:1 + count]
+        self.updated[register:register + count] = end_time  # Outputs change at the STOP condition
+
+    def write_then_readinto(self, out_buffer, in_buffer, *, out_start=0, out_end=None, in_start=0, in_end=None):
+        out_buffer = bytes(out_buffer[out_start:out_end])
+        in_end = len(in_buffer) if in_end is None else in_end
+        self.bus.transfer(self.address, out_buffer, in_end - in_start)
+        register = out_buffer[0]
+        count = in_end - in_start if self._auto_increment() else 1
+        in_buffer[in_start:in_start + count] = self.registers[register:register + count]
+
+
+# Channel with the same duty_cycle property as adafruit_pca9685.PWMChannel: one transaction per access
+class SimulatedChannel:
+    def __init__(self, pca, index):
+        self.pca = pca
+        self.index = index
+
+    @property
+    def duty_cycle(self):
+        buffer = bytearray(4)
+        with self.pca.i2c_device as i2c:
+            i2c.write_then_readinto(bytes([LED0_ON_L + 4 * self.index]), buffer)
+        on = buffer[0] | buffer[1] << 8
+        off = buffer[2] | buffer[3] << 8
+        if on == FULL_ON:
+            return 0xFFFF
+        if off == FULL_ON:
+            return 0
+        return off << 4
+
+    @duty_cycle.setter
+    def duty_cycle(self, value):
+        if not 0 <= value <= 0xFFFF:
+            raise ValueError(f"Out of range: value {value} not 0 <= value <= 65,535")
+        on, off = duty_to_counts(value)
+        with self.pca.i2c_device as i2c:
+            i2c.write(bytes([LED0_ON_L + 4 * self.index, on & 0xFF, on >> 8, off & 0xFF, off >> 8]))
+
+
+# Class with the parts of adafruit_pca9685.PCA9685 the motor code uses, on a SimulatedI2CBus
+class SimulatedPCA9685:
+    def __init__(self, i2c_bus=None, *, address=PCA9685_ADDRESS, reference_clock_speed=REFERENCE_CLOCK_SPEED):
+        self.i2c_bus = i2c_bus if i2c_bus is not None else SimulatedI2CBus()
+        self.i2c_device = SimulatedI2CDevice(self.i2c_bus, address)
+        self.reference_clock_speed = reference_clock_speed
+        self.channels = [SimulatedChannel(self, i) for i in range(16)]
+        self.reset()
+
+    def _read_register(self, register):
+        buffer = bytearray(1)
+        with self.i2c_device as i2c:
+            i2c.write_then_readinto(bytes([register]), buffer)
+        return buffer[0]
+
+    def _write_register(self, register, value):
+        with self.i2c_device as i2c:
+            i2c.write(bytes([register, value]))
+
+    @property
+    def mode1_reg(self):
+        return self._read_register(MODE1)
+
+    @mode1_reg.setter
+    def mode1_reg(self, value):
+        self._write_register(MODE1, value)
+
+    @property
+    def prescale_reg(self):
+        return self._read_register(PRESCALE)
+
+    @prescale_reg.setter
+    def prescale_reg(self, value):
+        self._write_register(PRESCALE, value)
+
+    def reset(self):
+        self.mode1_reg = 0x00
+
+    @property
+    def frequency(self):
+        prescale_result = self.prescale_reg
+        if prescale_result < 3:
+            raise ValueError("The device pre_scale register (0xFE) was not read or returned a value < 3")
+        return self.reference_clock_speed / 4096 / prescale_result
+
+    @frequency.setter
+    def frequency(self, freq):
+        # Same register sequence as the adafruit driver, which leaves auto-increment on
+        prescale = int(self.reference_clock_speed / 4096.0 / freq + 0.5)
+        if prescale < 3:
+            raise ValueError("PCA9685 cannot output at the given frequency")
+        old_mode = self.mode1_reg
+        self.mode1_reg = (old_mode & 0x7F) | MODE1_SLEEP
+        self.prescale_reg = prescale
+        self.mode1_reg = old_mode
+        time.sleep(0.005)
+        self.mode1_reg = old_mode | MODE1_RESTART | MODE1_AI
+
+    def deinit(self):
+        self.reset()
+
+
+# Function to open the PCA9685 on the Pi's I2C bus, or SimulatedPCA9685 when MOTOR_SIMULATED is set
+def open_pca9685():
+    if os.environ.get(SIMULATED_ENV):
+        return SimulatedPCA9685()
+    import board
+    import busio
+    from adafruit_pca9685 import PCA9685
+    return PCA9685(busio.I2C(board.SCL, board.SDA))
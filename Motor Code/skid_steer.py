@@ -0,0 +1,56 @@
+import numpy as np
+from drivetrain import MAX_SPEED
+
+# Side of each wheel in Drivetrain order (front left, front right, middle left, middle right,
+# rear left, rear right): -1 left, 1 right
+WHEEL_SIDES = (-1, 1, -1, 1, -1, 1)
+
+# Speed multiplier per wheel, same order. A wheel that runs faster than the others at the same
+# command (measured on the car: drive straight and see which way it pulls) gets a value below 1.
+WHEEL_TRIM = (1.0, 1.0, 1.0, 1.0, 1.0, 1.0)
+
+# Angular command per unit of speed while turning on the spot, and while also driving forward
+# or backward: 1/3 gives the old gentle curve (one side at half the speed of the other)
+PIVOT_GAIN = 1.0
+CURVE_GAIN = 1.0 / 3.0
+
+
+# Function to turn the movement keys held and the speed slider into a (linear, angular) command
+def keys_to_command(forward, backward, left, right, speed):
+    """ Opposite keys cancel out, W+A curves left, A alone turns left on the spot. """
+    linear = speed * (int(forward) - int(backward))
+    turn = int(left) - int(right)
+    angular = speed * turn * (CURVE_GAIN if linear else PIVOT_GAIN)
+    return linear, angular
+
+
+# Class that mixes a (linear, angular) command into the six wheel speeds of the skid steer chassis
+class SkidSteerMixer:
+    """ linear is the forward speed and angular the turning speed, both in wheel speed units
+    (-100..100); a positive angular turns left. The left wheels get linear - angular and the
+    right wheels linear + angular, so (0, 50) is the old pivot turn_left() and (75, 25) the old
+    gentle_curve_left(). Each wheel is then multiplied by its trim.
+
+    When a wheel would go past max_speed, all six are scaled down by the same factor instead of
+    clipping that wheel: the car still follows the curve it was asked for, only slower. Clipping
+    only the fast side would straighten the curve (or turn a tight curve into a pivot).
+    """
+
+    def __init__(self, trim=WHEEL_TRIM, sides=WHEEL_SIDES, max_speed=MAX_SPEED):
+        self.trim = np.array(trim, dtype=float)
+        self.sides = np.array(sides, dtype=float)
+        self.max_speed = max_speed
+        self.speeds = np.zeros(len(self.trim))   # Reused for every mix
+        self.saturated = 0                         # Commands that had to be scaled down
+
+    def mix(self, linear, angular):
+        """ Six whole wheel speeds (a list of ints) for Drivetrain.set_speeds. """
+        speeds = self.speeds
+        np.multiply(self.sides, angular, out=speeds)
+        speeds += linear
+        speeds *= self.trim
+        peak = np.abs(speeds).max()
+        if peak > self.max_speed:
+            speeds *= self.max_speed / peak
+            self.saturated += 1
+        return np.rint(speeds).astype(int).tolist()
@@ -0,0 +1,45 @@
+import time
+import numpy as np
+from drivetrain import speed_to_duty, lookup_duty
+from skid_steer import SkidSteerMixer, keys_to_command
+
+# Cost of one control tick's wheel computation: the skid steer mix and the duty cycles of the
+# six wheels, looked up in DUTY_TABLE against computed with speed_to_duty for each channel.
+# Also prints what each combination of movement keys drives, where the old UI only used the last key.
+TICKS = 20000
+
+
+def main():
+    rng = np.random.default_rng(0)
+    mixer = SkidSteerMixer(trim=(1.0, 0.97, 1.0, 0.97, 1.0, 0.97))
+    commands = [(float(linear), float(angular)) for linear, angular in rng.uniform(-100, 100, size=(TICKS, 2))]
+    wheel_speeds = [mixer.mix(linear, angular) for linear, angular in commands]
+
+    start_time = time.perf_counter()
+    for speeds in wheel_speeds:
+        [speed_to_duty(speed) for speed in speeds]
+    computed = (time.perf_counter() - start_time) / TICKS * 1e6
+
+    start_time = time.perf_counter()
+    for speeds in wheel_speeds:
+        [lookup_duty(speed) for speed in speeds]
+    looked_up = (time.perf_counter() - start_time) / TICKS * 1e6
+
+    start_time = time.perf_counter()
+    for linear, angular in commands:
+        mixer.mix(linear, angular)
+    mixed = (time.perf_counter() - start_time) / TICKS * 1e6
+
+    same = all(lookup_duty(speed) == speed_to_duty(speed) for speed in range(-100, 101))
+    print(f"{TICKS} ticks: six duties computed {computed:.2f} us, looked up {looked_up:.2f} us (same values: {same}); "
+          f"mix {mixed:.2f} us, {mixer.saturated / TICKS:.0%} of random commands scaled down")
+
+    print("Keys held at speed 80 -> wheel speeds (FL, FR, ML, MR, RL, RR)")
+    for keys in ("W", "S", "A", "D", "WA", "WD", "SA", "WS", "WSA"):
+        held = [key in keys for key in "WSAD"]
+        command = keys_to_command(*held, 80)
+        print(f"  {keys:<4} linear {command[0]:6.1f}, angular {command[1]:6.1f} -> {mixer.mix(*command)}")
+
+
+if __name__ == "__main__":
+    main()
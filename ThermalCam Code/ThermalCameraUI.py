@@ -3,45 +3,47 @@ from PyQt5.QtWidgets import QWidget, QVBoxLayout, QPushButton, QLabel, QApplicat
 from PyQt5.QtCore import QThread, pyqtSignal
 import numpy as np
 import cv2
-from PyQt5.QtGui import QImage, QPixmap
+from thermal_capture import ThermalCapture, open_sensor, FRAME_SHAPE
+from thermal_display import ThermalDisplay
+from thermal_view import ThermalImageView
+from thermal_detector import ThermalPersonDetector
 
 # Set the Qt platform plugin path explicitly (fixes the xcb error)
 os.environ['QT_QPA_PLATFORM_PLUGIN_PATH'] = '/path/to/your/pyqt5/plugins/platforms'
 
-# Simulate the thermal camera behavior with a mock function that raises the ValueError
-class MockThermalCamera:
-    def start_camera(self):
-        raise ValueError("No I2C device at address: 0x33")  # Simulating the error
-
-    def stop_camera(self):
-        pass
-
-    def get_current_frame(self):
-        raise ValueError("No I2C device at address: 0x33")  # Simulating the error
-
-
 # Define a new thread to handle thermal image capture and detection
 class CaptureThread(QThread):
-    new_frame_signal = pyqtSignal(np.ndarray)  # Signal to pass new frame to UI
+    new_frame_signal = pyqtSignal(int)  # Signal to tell the UI a new frame is ready (its frame number)
 
     def __init__(self):
         super().__init__()
         self.camera_on = False
+        self.capture = None
+        self.frame = np.zeros(FRAME_SHAPE, dtype=np.float32)  # Reused by latest_reading(), UI thread only
 
     def run(self):
+        # Read frames back to back; getFrame() waits for the sensor, so no sleep is needed
         while self.camera_on:
-            try:
-                thermal_data = ptc.get_current_frame()  # Simulate the failure here
-                self.new_frame_signal.emit(thermal_data)  # Emit signal with the frame
-            except ValueError as e:
-                print(f"Error: {e}")
-                break  # Stop the thread on error
-            self.msleep(100)  # Sleep to control frame rate (10 FPS)
+            if self.capture.capture_frame():  # Bad frames are skipped inside capture_frame()
+                # The UI copies the frame out itself, so no array is made here or handed across threads
+                self.new_frame_signal.emit(self.capture.sequence)
 
-    def start_capture(self):
+    def start_capture(self, capture):
+        self.capture = capture
         self.camera_on = True
         self.start()
 
+    def latest_frame(self):
+        """ Newest frame in degrees C, or None if there is none yet. """
+        result = self.latest_reading()
+        return result[1] if result else None
+
+    def latest_reading(self):
+        """ (frame number, newest frame in degrees C), or None if there is none yet.
+        The frame is copied into self.frame, so it is only valid until the next call. """
+        result = self.capture.read(self.frame) if self.capture else None
+        return (result[0], result[2]) if result else None
+
     def stop_capture(self):
         self.camera_on = False
         self.wait()
@@ -78,13 +80,18 @@ class ThermalCameraUI(QWidget):
 
         self.camera_on = False
         self.capture_thread = CaptureThread()
-        self.capture_thread.new_frame_signal.connect(self.display_image)  # Connect new frame signal
+        self.capture_thread.new_frame_signal.connect(self.show_new_frame)  # Connect new frame signal
+
+        # The camera is opened when it is turned on (set THERMAL_SIMULATED=1 to run without it)
+        self.sensor = None
 
-        # Using the MockThermalCamera to simulate no device error
-        self.ptc = MockThermalCamera()  # Replace the actual `ptc` with a mock version
+        # Upscales frames to 640x480 and applies the colormap (weights and buffers are made once),
+        # then shows them through a QImage that is also made once
+        self.thermal_display = ThermalDisplay((640, 480))
+        self.thermal_view = ThermalImageView(self.image_label, self.thermal_display)
 
-        # Load the pre-trained MobileNet SSD model for human detection
-        self.net = cv2.dnn.readNetFromCaffe('deploy.prototxt', 'mobilenet_iter_73000.caffemodel')
+        # Finds people in the 24x32 temperature frames directly; results are cached by frame number
+        self.detector = ThermalPersonDetector("blob")
 
     def toggle_camera(self):
         """ Toggle the thermal camera on or off """
@@ -92,69 +99,63 @@ class ThermalCameraUI(QWidget):
             self.toggle_button.setText("Turn Thermal Camera OFF")
             self.camera_on = True
             try:
-                self.ptc.start_camera()  # This will simulate the error (No I2C device)
-                self.capture_thread.start_capture()  # Start capturing frames
-            except ValueError as e:
+                if self.sensor is None:
+                    self.sensor = open_sensor()  # Raises ValueError if there is no I2C device
+                self.capture_thread.start_capture(ThermalCapture(self.sensor))  # Start capturing frames
+            except (ValueError, OSError) as e:
                 print(f"Error: {e}")
                 self.image_label.setText(str(e))  # Display the error in the GUI
         else:
             self.toggle_button.setText("Turn Thermal Camera ON")
             self.camera_on = False
             self.capture_thread.stop_capture()  # Stop capturing frames
-            self.ptc.stop_camera()  # Stop the thermal camera
+            if self.capture_thread.capture:
+                print(self.capture_thread.capture.summary())
 
     def show_thermal_image(self):
         """ Display thermal image in the GUI """
         if self.camera_on:
             print("Displaying thermal image...")
-            try:
-                thermal_image = self.ptc.get_current_frame()  # This will simulate the error
+            thermal_image = self.capture_thread.latest_frame()
+            if thermal_image is None:
+                self.image_label.setText("No thermal frame yet")
+            else:
                 self.display_image(thermal_image)
-            except ValueError as e:
-                print(f"Error: {e}")
-                self.image_label.setText(str(e))  # Display the error in the GUI
         else:
             print("Thermal camera is off. Please turn it on first.")
 
+    def show_new_frame(self, sequence):
+        """ Show the newest frame when the capture thread has one """
+        thermal_image = self.capture_thread.latest_frame()
+        if thermal_image is not None:
+            self.display_image(thermal_image)
+
     def display_image(self, thermal_data):
-        """ Display thermal image as a heatmap on PyQt5 QLabel """
-        # Convert thermal data to a heatmap
-        heatmap = cv2.applyColorMap(thermal_data, cv2.COLORMAP_JET)
-        
-        # Convert heatmap to QImage for display in PyQt5 QLabel
-        height, width, channel = heatmap.shape
-        bytes_per_line = 3 * width
-        q_img = QImage(heatmap.data, width, height, bytes_per_line, QImage.Format_RGB888)
-        
-        # Show image on QLabel
-        self.image_label.setPixmap(QPixmap.fromImage(q_img))
+        """ Display a thermal frame (degrees C) as a heatmap on the PyQt5 QLabel """
+        self.thermal_view.show(thermal_data)
 
     def detect_human(self):
-        """ Detect human-like heat sources using deep learning model """
+        """ Detect people in the latest thermal frame and draw boxes around them """
         if self.camera_on:
             print("Detecting human...")
             try:
                 # Get the latest thermal frame
-                thermal_data = self.ptc.get_current_frame()  # This will simulate the error
-                # Resize the thermal image for input to MobileNet SSD (pre-trained model)
-                frame_resized = cv2.resize(thermal_data, (300, 300))
-                blob = cv2.dnn.blobFromImage(frame_resized, 1.0, (300, 300), (104, 117, 123), swapRB=False, crop=False)
-
-                self.net.setInput(blob)
-                detections = self.net.forward()
-
-                # Draw bounding boxes around detected humans
-                (h, w) = thermal_data.shape[:2]
-                for i in range(detections.shape[2]):
-                    confidence = detections[0, 0, i, 2]
-                    if confidence > 0.2:  # Set confidence threshold for human detection
-                        box = detections[0, 0, i, 3:7] * np.array([w, h, w, h])
-                        (startX, startY, endX, endY) = box.astype("int")
-                        cv2.rectangle(thermal_data, (startX, startY), (endX, endY), (255, 0, 0), 2)
-
-                # Convert the image to a heatmap for display
-                heatmap = cv2.applyColorMap(thermal_data, cv2.COLORMAP_JET)
-                self.display_image(heatmap)  # Show the updated image with human detection
+                reading = self.capture_thread.latest_reading()
+                if reading is None:
+                    raise ValueError("No thermal frame yet")
+                sequence, thermal_data = reading
+                detections = self.detector.detect(thermal_data, sequence)
+
+                # Draw bounding boxes (frame pixels scaled up to the displayed image)
+                heatmap = self.thermal_display.render(thermal_data)  # Drawn on in place, then shown as is
+                scale_y = heatmap.shape[0] / thermal_data.shape[0]
+                scale_x = heatmap.shape[1] / thermal_data.shape[1]
+                for detection in detections:
+                    top, left, bottom, right = detection.bbox
+                    cv2.rectangle(heatmap, (int(left * scale_x), int(top * scale_y)),
+                                  (int(right * scale_x) - 1, int(bottom * scale_y) - 1), (255, 255, 255), 2)
+                print(f"{len(detections)} people found")
+                self.thermal_view.show()  # Show the updated image with human detection
             except ValueError as e:
                 print(f"Error: {e}")
                 self.image_label.setText(str(e))  # Display the error in the GUI
@@ -0,0 +1,199 @@
+import os
+import time
+import threading
+import numpy as np
+
+# The MLX90640 frame is 24 rows of 32 pixels (temperatures in degrees C)
+FRAME_SHAPE = (24, 32)
+
+# Sensor refresh rates (Hz) and their RefreshRate register values. getFrame() reads both
+# subpages of a frame, so it returns complete frames at half the refresh rate.
+REFRESH_RATES = {0.5: 0b000, 1: 0b001, 2: 0b010, 4: 0b011, 8: 0b100, 16: 0b101, 32: 0b110, 64: 0b111}
+REFRESH_RATE = 16
+I2C_FREQUENCY = 800000
+
+# Error handling: bad frames are skipped, but a sensor that keeps failing is probably
+# unplugged, so after this many errors in a row wait before trying again
+MAX_CONSECUTIVE_ERRORS = 20
+ERROR_BACKOFF = 1.0
+
+# Environment variable used by open_sensor(): set it to use SimulatedMLX90640 instead of the camera
+SIMULATED_ENV = "THERMAL_SIMULATED"
+
+
+# Histogram with fixed bin edges, in milliseconds
+class LatencyHistogram:
+    EDGES = (0, 5, 10, 20, 30, 40, 50, 60, 75, 100, 125, 150, 200, 300, 500, 1000)
+
+    def __init__(self, edges=EDGES):
+        self.edges = np.array(edges, dtype=np.float64)
+        self.counts = np.zeros(len(edges), dtype=np.int64)  # Last bin is everything above the last edge
+        self.total = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def add(self, milliseconds):
+        self.counts[np.searchsorted(self.edges, milliseconds, side="right") - 1] += 1
+        self.total += milliseconds
+        self.count += 1
+        self.max = max(self.max, milliseconds)
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, percent):
+        """ Upper edge of the bin holding the given percentile (the max for the last bin). """
+        if self.count == 0:
+            return 0.0
+        index = int(np.searchsorted(np.cumsum(self.counts), self.count * percent / 100.0))
+        return float(self.edges[index + 1]) if index + 1 < len(self.edges) else self.max
+
+    def summary(self):
+        lines = []
+        for i, count in enumerate(self.counts):
+            if count:
+                upper = f"{self.edges[i + 1]:.0f}" if i + 1 < len(self.edges) else "..."
+                lines.append(f"{self.edges[i]:>5.0f}-{upper:<5} ms {count:>7} {'#' * int(40 * count / self.count)}")
+        return "\n".join(lines)
+
+
+# Class that reads MLX90640 frames back to back into two preallocated buffers
+class ThermalCapture:
+    """ getFrame() fills the back buffer directly; only when a frame completes is it
+    swapped to the front, so a failed or partial read never replaces a good frame.
+    capture_frame() can be called in a loop, or start() runs that loop in a thread.
+    read() copies the newest frame out.
+    """
+
+    def __init__(self, sensor, refresh_rate=REFRESH_RATE):
+        self.sensor = sensor
+        self.sensor.refresh_rate = REFRESH_RATES[refresh_rate]
+        self.buffers = np.zeros((2,) + FRAME_SHAPE, dtype=np.float32)
+        self.flat = self.buffers.reshape(2, -1)  # Views getFrame() writes the 768 temperatures into
+        self.front = 0
+        self.sequence = 0     # Frames completed
+        self.timestamp = None  # time.monotonic() when the front frame completed
+        self.lock = threading.Lock()
+        self.thread = None
+        self.running = False
+
+        self.errors = 0
+        self.consecutive_errors = 0
+        self.last_error = None
+        self.read_latency = LatencyHistogram()     # How long each successful getFrame() took
+        self.frame_interval = LatencyHistogram()   # Time between completed frames
+        self.fps = 0.0                             # Smoothed frames per second
+
+    def capture_frame(self):
+        """ Read one frame. Returns True if a new frame was swapped in. """
+        back = 1 - self.front
+        start_time = time.monotonic()
+        try:
+            self.sensor.getFrame(self.flat[back])
+        except (ValueError, RuntimeError, OSError) as e:
+            # "Frame data error" / "Too many retries" happen now and then, skip the frame
+            self.errors += 1
+            self.consecutive_errors += 1
+            self.last_error = str(e)
+            if self.consecutive_errors >= MAX_CONSECUTIVE_ERRORS:
+                print(f"Thermal Camera Error {e}")
+                self.consecutive_errors = 0
+                time.sleep(ERROR_BACKOFF)
+            return False
+        end_time = time.monotonic()
+        self.consecutive_errors = 0
+
+        self.read_latency.add((end_time - start_time) * 1000)
+        if self.timestamp is not None:
+            interval = end_time - self.timestamp
+            self.frame_interval.add(interval * 1000)
+            if interval > 0:
+                self.fps = 1.0 / interval if self.fps == 0 else 0.9 * self.fps + 0.1 / interval
+        with self.lock:
+            self.front = back
+            self.sequence += 1
+            self.timestamp = end_time
+        return True
+
+    def read(self, out=None):
+        """ Returns (sequence, timestamp, copy of the newest frame), or None before the first frame. """
+        if out is None:
+            out = np.empty(FRAME_SHAPE, dtype=np.float32)
+        with self.lock:
+            if self.sequence == 0:
+                return None
+            out[:] = self.buffers[self.front]
+            return self.sequence, self.timestamp, out
+
+    def _run(self):
+        while self.running:
+            self.capture_frame()
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def summary(self):
+        return (f"{self.sequence} frames, {self.errors} errors, {self.fps:.1f} frames/s, "
+                f"read latency mean {self.read_latency.mean:.1f} ms / p95 {self.read_latency.percentile(95):.0f} ms")
+
+
+# Stand-in for adafruit_mlx90640.MLX90640 that makes frames of a person walking across a room
+class SimulatedMLX90640:
+    """ Frames become available at half the refresh rate (two subpages per frame),
+    getFrame() spends read_time on the bus and fails with probability error_rate,
+    like the real driver's occasional "Frame data error".
+    """
+
+    def __init__(self, read_time=0.03, error_rate=0.02, seed=0):
+        self.refresh_rate = REFRESH_RATES[2]
+        self.read_time = read_time
+        self.error_rate = error_rate
+        self.rng = np.random.default_rng(seed)
+        self.start_time = time.monotonic()
+        self.next_frame_time = self.start_time
+        rows, cols = np.indices(FRAME_SHAPE, dtype=np.float32)
+        self.rows, self.cols = rows, cols
+        self.frames = 0
+
+    @property
+    def frame_period(self):
+        rate = {value: hz for hz, value in REFRESH_RATES.items()}[self.refresh_rate]
+        return 2.0 / rate
+
+    def getFrame(self, framebuf):
+        # Wait for the next frame, then spend read_time reading it
+        now = time.monotonic()
+        self.next_frame_time = max(self.next_frame_time + self.frame_period, now)
+        time.sleep(self.next_frame_time - now + self.read_time)
+        if self.rng.random() < self.error_rate:
+            raise RuntimeError("Frame data error")
+
+        framebuf[:] = self.frame_at(time.monotonic() - self.start_time).ravel()
+        self.frames += 1
+
+    def frame_at(self, t):
+        """ The scene t seconds after the start: a person walking back and forth in a 20 C room. """
+        col = 16 + 12 * np.sin(0.3 * t)
+        frame = 20.0 + 1.5 * self.cols / FRAME_SHAPE[1] + self.rng.normal(0, 0.3, FRAME_SHAPE)
+        person = np.exp(-(((self.rows - 13) / 6.0) ** 2 + ((self.cols - col) / 2.5) ** 2) ** 2)
+        return np.maximum(frame, 20.0 + 14.0 * person).astype(np.float32)
+
+
+# Function to open the camera on the I2C bus, or SimulatedMLX90640 when THERMAL_SIMULATED is set
+def open_sensor():
+    if os.environ.get(SIMULATED_ENV):
+        return SimulatedMLX90640()
+    import board
+    import busio
+    import adafruit_mlx90640
+    i2c_bus = busio.I2C(board.SCL, board.SDA, frequency=I2C_FREQUENCY)
+    return adafruit_mlx90640.MLX90640(i2c_bus)
@@ -0,0 +1,47 @@
+import time
+from thermal_capture import ThermalCapture, SimulatedMLX90640, REFRESH_RATES
+
+# Headless run of the capture loop against SimulatedMLX90640
+RUN_TIME = 4.0        # Seconds per case
+READ_TIME = 0.03      # Bus time per frame (832 words per subpage at 800 kHz is about 20 ms per subpage)
+ERROR_RATE = 0.02
+TEST_RATES = [4, 8, 16, 32, 64]
+
+
+# The original CaptureThread pattern: read a frame, then msleep(100)
+def old_loop(sensor, frame):
+    frames = 0
+    start_time = time.monotonic()
+    while time.monotonic() - start_time < RUN_TIME:
+        try:
+            sensor.getFrame(frame)
+            frames += 1
+        except RuntimeError:
+            pass
+        time.sleep(0.1)
+    return frames / RUN_TIME
+
+
+def main():
+    print(f"{'refresh Hz':>10}{'old fps':>9}{'new fps':>9}{'errors':>8}{'read mean ms':>14}{'read p95 ms':>13}{'interval p95 ms':>17}")
+    for refresh_rate in TEST_RATES:
+        sensor = SimulatedMLX90640(read_time=READ_TIME, error_rate=ERROR_RATE)
+        sensor.refresh_rate = REFRESH_RATES[refresh_rate]
+        old_fps = old_loop(sensor, [0.0] * 768)
+
+        sensor = SimulatedMLX90640(read_time=READ_TIME, error_rate=ERROR_RATE)
+        capture = ThermalCapture(sensor, refresh_rate)
+        capture.start()
+        time.sleep(RUN_TIME)
+        capture.stop()
+        fps = capture.sequence / RUN_TIME
+        print(f"{refresh_rate:>10}{old_fps:>9.1f}{fps:>9.1f}{capture.errors:>8}{capture.read_latency.mean:>14.1f}"
+              f"{capture.read_latency.percentile(95):>13.0f}{capture.frame_interval.percentile(95):>17.0f}")
+
+    print()
+    print(f"Frame interval histogram at {TEST_RATES[-1]} Hz:")
+    print(capture.frame_interval.summary())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+import numpy as np
+from thermal_capture import FRAME_SHAPE
+
+# Size (rows, columns) of a standing person at a few distances, and lying down
+PERSON_SIZES = {"near": (16, 6), "mid": (8, 3), "far": (4, 2), "very far": (2, 1), "lying": (3, 9)}
+
+# Warm things that are not people: (name, (rows, columns) range, temperature range, rectangular)
+DISTRACTORS = [
+    ("radiator", ((4, 8), (8, 14)), (45.0, 65.0), True),
+    ("lamp", ((1, 2), (1, 2)), (60.0, 120.0), False),
+    ("warm wall", ((10, 20), (10, 20)), (2.0, 4.0), True),    # Temperature above ambient
+    ("engine", ((5, 8), (8, 12)), (70.0, 110.0), False),
+    ("fire", ((3, 6), (3, 6)), (250.0, 600.0), False),
+]
+
+
+# One labelled frame
+class ThermalSample:
+    def __init__(self, frame, boxes, kinds, distractors):
+        self.frame = frame              # 24x32 float32 temperatures
+        self.boxes = boxes              # People as (top, left, bottom, right), bottom and right exclusive
+        self.kinds = kinds              # PERSON_SIZES key of each person
+        self.distractors = distractors  # Names of the non-person heat sources in the frame
+
+
+def _ellipse(rows, cols, centre, size):
+    return np.exp(-(((rows - centre[0]) / (size[0] / 2.0)) ** 2 + ((cols - centre[1]) / (size[1] / 2.0)) ** 2) ** 2)
+
+
+# Function to make one random frame with 0 to 2 people and 0 to 2 distractors
+def make_sample(rng):
+    rows, cols = np.indices(FRAME_SHAPE, dtype=np.float32)
+    ambient = rng.uniform(10.0, 26.0)
+    frame = ambient + rng.uniform(-1.5, 1.5) * cols / FRAME_SHAPE[1] + rng.normal(0, 0.3, FRAME_SHAPE)
+
+    distractors = []
+    for _ in range(rng.integers(0, 3)):
+        name, ((h0, h1), (w0, w1)), (t0, t1), rectangular = DISTRACTORS[rng.integers(len(DISTRACTORS))]
+        size = (rng.integers(h0, h1 + 1), rng.integers(w0, w1 + 1))
+        top, left = rng.integers(0, FRAME_SHAPE[0] - size[0] + 1), rng.integers(0, FRAME_SHAPE[1] - size[1] + 1)
+        temperature = rng.uniform(t0, t1) + (ambient if name == "warm wall" else 0.0)
+        if rectangular:
+            frame[top:top + size[0], left:left + size[1]] = np.maximum(frame[top:top + size[0], left:left + size[1]], temperature)
+        else:
+            shape = _ellipse(rows, cols, (top + size[0] / 2 - 0.5, left + size[1] / 2 - 0.5), size)
+            frame = np.maximum(frame, ambient + (temperature - ambient) * shape)
+        distractors.append(name)
+
+    boxes, kinds = [], []
+    for _ in range(rng.integers(0, 3)):
+        kind = list(PERSON_SIZES)[rng.integers(len(PERSON_SIZES))]
+        size = PERSON_SIZES[kind]
+        top, left = rng.integers(0, FRAME_SHAPE[0] - size[0] + 1), rng.integers(0, FRAME_SHAPE[1] - size[1] + 1)
+        # Clothing and distance bring the surface temperature down from skin temperature
+        skin = rng.uniform(29.0, 35.0)
+        shape = _ellipse(rows, cols, (top + size[0] / 2 - 0.5, left + size[1] / 2 - 0.5), size)
+        frame = np.maximum(frame, ambient + (skin - ambient) * shape)
+        boxes.append((top, left, top + size[0], left + size[1]))
+        kinds.append(kind)
+    return ThermalSample(frame.astype(np.float32), boxes, kinds, distractors)
+
+
+# Function to make the benchmark dataset (the same frames for the same seed)
+def make_dataset(count=1000, seed=2024):
+    rng = np.random.default_rng(seed)
+    return [make_sample(rng) for _ in range(count)]
@@ -0,0 +1,207 @@
+from collections import OrderedDict
+import numpy as np
+from scipy import ndimage
+from thermal_capture import FRAME_SHAPE
+
+# What a person looks like to the camera (degrees C)
+BODY_RANGE = (27.0, 38.0)    # Warmest pixel of a clothed person, seen from near or far
+MIN_CONTRAST = 3.0           # Above the frame's median (the background)
+MAX_CONTRAST = 22.0
+MAX_AREA = 150               # Pixels, a person filling the frame top to bottom is about 80
+SCORE_THRESHOLD = 0.5
+
+# Labels regions inside each frame of a batch but never across frames
+_BATCH_STRUCTURE = np.zeros((3, 3, 3), dtype=bool)
+_BATCH_STRUCTURE[1] = True
+
+
+# One detected person
+class Detection:
+    def __init__(self, bbox, score, centroid, max_temp):
+        self.bbox = bbox            # (top, left, bottom, right) in frame pixels, bottom and right exclusive
+        self.score = score          # 0..1
+        self.centroid = centroid    # (row, column)
+        self.max_temp = max_temp
+
+
+# Function for a score that is 1 inside [low, high] and falls to 0 over `soft` outside it
+def _band(x, low, high, soft):
+    return np.clip(np.minimum((x - low) / soft + 1, (high - x) / soft + 1), 0.0, 1.0)
+
+
+# Interface every detection backend implements
+class DetectorBackend:
+    name = "base"
+
+    def detect_batch(self, frames):
+        """ frames is an (N, 24, 32) array of temperatures. Returns N lists of Detections. """
+        raise NotImplementedError
+
+    def detect(self, frame):
+        return self.detect_batch(np.asarray(frame, dtype=np.float32).reshape((1,) + FRAME_SHAPE))[0]
+
+
+# Backend that thresholds, labels warm regions and scores each one on temperature and shape
+class BlobBackend(DetectorBackend):
+    """ Every frame of a batch is thresholded against its own median and all frames
+    are labelled in one call, then each region is scored on:
+    - its warmest pixel being in BODY_RANGE and MIN_CONTRAST..MAX_CONTRAST above the background
+    - its shape: not a filled rectangle (walls, radiators) and not a huge region
+    - not being the warm edge around something hot
+    """
+    name = "blob"
+
+    def __init__(self, score_threshold=SCORE_THRESHOLD):
+        self.score_threshold = score_threshold
+
+    def segment(self, frames, background, hot):
+        """ Label warm regions of every frame. Regions too big to be a person (a warm
+        wall with someone in front of it) are thresholded again against their own
+        median, and hot pixels (heaters, lamps, fire) are left out so a person
+        next to one is not merged with it.
+        """
+        mask = (frames >= (background + MIN_CONTRAST)[:, np.newaxis, np.newaxis]) & ~hot
+        labels, count = ndimage.label(mask, structure=_BATCH_STRUCTURE)
+        area = np.bincount(labels.ravel(), minlength=count + 1)
+        large = np.flatnonzero(area[1:] > MAX_AREA) + 1
+        if len(large) == 0:
+            return labels, count
+        floor = np.full(count + 1, -np.inf, dtype=np.float32)
+        floor[large] = np.asarray(ndimage.median(frames, labels, large)) + MIN_CONTRAST
+        labels, count = ndimage.label(mask & (frames >= floor[labels]), structure=_BATCH_STRUCTURE)
+        return labels, count
+
+    def detect_batch(self, frames):
+        frames = np.asarray(frames, dtype=np.float32).reshape((-1,) + FRAME_SHAPE)
+        background = np.median(frames.reshape(len(frames), -1), axis=1)
+        hot = frames > BODY_RANGE[1] + 2.0
+        labels, count = self.segment(frames, background, hot)
+        results = [[] for _ in range(len(frames))]
+        if count == 0:
+            return results
+
+        flat_labels = labels.ravel()
+        temps = frames.ravel().astype(np.float64)
+        area = np.bincount(flat_labels, minlength=count + 1)[1:]
+        max_temp = np.full(count + 1, -np.inf)
+        np.maximum.at(max_temp, flat_labels, temps)
+        max_temp = max_temp[1:]
+        boxes = ndimage.find_objects(labels)
+        frame_index = np.array([box[0].start for box in boxes])
+        heights = np.array([box[1].stop - box[1].start for box in boxes])
+        widths = np.array([box[2].stop - box[2].start for box in boxes])
+        contrast = max_temp - background[frame_index]
+
+        fill = area / (heights * widths)
+        # The warm edge of a hot object is mostly pixels next to it, a person standing beside one is not
+        beside_hot = ndimage.binary_dilation(hot, structure=_BATCH_STRUCTURE).ravel()
+        halo = np.bincount(flat_labels, weights=beside_hot, minlength=count + 1)[1:] / area
+        temperature_score = _band(max_temp, BODY_RANGE[0], BODY_RANGE[1], 2.0)
+        contrast_score = _band(contrast, MIN_CONTRAST, MAX_CONTRAST, 2.0)
+        rectangle_score = np.where((area >= 12) & (fill > 0.95), 0.2, 1.0)  # People are not box shaped
+        halo_score = np.where(halo > 0.5, 0.2, 1.0)
+        size_score = _band(area, 1, MAX_AREA, 50)
+        scores = temperature_score * contrast_score * rectangle_score * halo_score * size_score
+
+        for i in np.flatnonzero(scores >= self.score_threshold):
+            _, row_slice, col_slice = boxes[i]
+            region = labels[frame_index[i], row_slice, col_slice] == i + 1
+            rows, cols = np.nonzero(region)
+            results[frame_index[i]].append(Detection(
+                (row_slice.start, col_slice.start, row_slice.stop, col_slice.stop), float(scores[i]),
+                (row_slice.start + rows.mean(), col_slice.start + cols.mean()), float(max_temp[i])))
+        return results
+
+
+# Backend that correlates frames with person-shaped templates (a tiny fixed model at 24x32)
+class TemplateBackend(DetectorBackend):
+    """ The background-subtracted frames of a batch are correlated with upright and
+    lying person templates of a few sizes in one FFT per template. A local maximum
+    of the correlation is a detection if the estimated warmth of the matched shape
+    and the temperature at the peak are in the body ranges.
+    """
+    name = "template"
+    SIZES = [(2, 1), (4, 2), (8, 3), (16, 6), (3, 9)]
+
+    def __init__(self, score_threshold=SCORE_THRESHOLD):
+        self.score_threshold = score_threshold
+        rows, cols = np.indices(FRAME_SHAPE, dtype=np.float64)
+        centre = (FRAME_SHAPE[0] // 2, FRAME_SHAPE[1] // 2)
+        self.templates = []
+        for size in self.SIZES:
+            shape = np.exp(-(((rows - centre[0]) / (size[0] / 2.0)) ** 2 + ((cols - centre[1]) / (size[1] / 2.0)) ** 2) ** 2)
+            shape = np.roll(shape, (-centre[0], -centre[1]), axis=(0, 1))  # Template centred on pixel (0, 0)
+            # Correlating with shape / |shape|^2 estimates the height of a matching shape in degrees C
+            self.templates.append((size, np.conj(np.fft.rfft2(shape / np.sum(shape ** 2)))))
+
+    def detect_batch(self, frames):
+        frames = np.asarray(frames, dtype=np.float32).reshape((-1,) + FRAME_SHAPE)
+        background = np.median(frames.reshape(len(frames), -1), axis=1)[:, np.newaxis, np.newaxis]
+        spectrum = np.fft.rfft2(frames - background)
+        responses = np.stack([np.fft.irfft2(spectrum * template, s=FRAME_SHAPE) for _, template in self.templates], axis=1)
+
+        best = responses.max(axis=1)                # (N, 24, 32) best estimated warmth at each pixel
+        best_size = responses.argmax(axis=1)
+        peaks = (best == ndimage.maximum_filter(best, size=(1, 3, 3))) & (best > MIN_CONTRAST)
+        scores = (_band(best, MIN_CONTRAST, MAX_CONTRAST, 2.0) *
+                  _band(frames, BODY_RANGE[0], BODY_RANGE[1], 2.0))
+        results = [[] for _ in range(len(frames))]
+        for n, row, col in zip(*np.nonzero(peaks & (scores >= self.score_threshold))):
+            height, width = self.SIZES[best_size[n, row, col]]
+            top, left = max(0, row - height // 2), max(0, col - width // 2)
+            bbox = (top, left, min(FRAME_SHAPE[0], top + height), min(FRAME_SHAPE[1], left + width))
+            results[n].append(Detection(bbox, float(scores[n, row, col]), (float(row), float(col)), float(frames[n, row, col])))
+        return results
+
+
+# Available backends by name
+BACKENDS = {BlobBackend.name: BlobBackend, TemplateBackend.name: TemplateBackend}
+
+
+# Class that buffers frames, runs a backend on them in batches and caches the results by frame number
+class ThermalPersonDetector:
+    def __init__(self, backend="blob", batch_size=8, cache_size=32):
+        self.backend = BACKENDS[backend]() if isinstance(backend, str) else backend
+        self.batch_size = batch_size
+        self.pending = np.zeros((batch_size,) + FRAME_SHAPE, dtype=np.float32)
+        self.pending_keys = []
+        self.cache = OrderedDict()  # Frame number -> list of Detections
+        self.cache_size = cache_size
+        self.batches = 0
+        self.cache_hits = 0
+
+    def add_frame(self, frame, key):
+        """ Buffer a frame (key is e.g. its capture sequence number); full buffers are run at once. """
+        if key in self.cache or key in self.pending_keys:
+            return
+        self.pending[len(self.pending_keys)] = frame
+        self.pending_keys.append(key)
+        if len(self.pending_keys) == self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """ Run the backend on every buffered frame. """
+        if not self.pending_keys:
+            return
+        results = self.backend.detect_batch(self.pending[:len(self.pending_keys)])
+        for key, detections in zip(self.pending_keys, results):
+            self.cache[key] = detections
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        self.pending_keys = []
+        self.batches += 1
+
+    def detect(self, frame, key=None):
+        """ Detections for one frame, from the cache if this key was already run. """
+        if key is not None and key in self.cache:
+            self.cache_hits += 1
+            return self.cache[key]
+        if key is not None and key in self.pending_keys:
+            self.flush()
+            return self.cache[key]
+        detections = self.backend.detect(frame)
+        if key is not None:
+            self.cache[key] = detections
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        return detections
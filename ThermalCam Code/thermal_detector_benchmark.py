@@ -0,0 +1,70 @@
+import time
+import numpy as np
+from thermal_dataset import make_dataset, PERSON_SIZES
+from thermal_detector import BACKENDS
+
+# Runs every backend on the synthetic dataset and reports latency and precision/recall
+SAMPLES = 1000
+BATCH_SIZES = (1, 16)
+
+
+# Function to check whether a detection belongs to a labelled person: its centre is in the person's box
+def matches(detection, box):
+    row, col = detection.centroid
+    top, left, bottom, right = box
+    return top - 1 <= row <= bottom and left - 1 <= col <= right
+
+
+# Function to count hits per person kind, and false detections
+def score(samples, results):
+    found = {kind: 0 for kind in PERSON_SIZES}
+    total = {kind: 0 for kind in PERSON_SIZES}
+    false_alarms = {}
+    detections = 0
+    for sample, found_here in zip(samples, results):
+        detections += len(found_here)
+        used = set()
+        for box, kind in zip(sample.boxes, sample.kinds):
+            total[kind] += 1
+            for i, detection in enumerate(found_here):
+                if i not in used and matches(detection, box):
+                    used.add(i)
+                    found[kind] += 1
+                    break
+        extra = len(found_here) - len(used)
+        if extra:
+            cause = ", ".join(sorted(set(sample.distractors))) or "noise"
+            false_alarms[cause] = false_alarms.get(cause, 0) + extra
+    return found, total, false_alarms, detections
+
+
+def measure(backend, frames, batch_size):
+    start_time = time.perf_counter()
+    results = []
+    for i in range(0, len(frames), batch_size):
+        results.extend(backend.detect_batch(frames[i:i + batch_size]))
+    return results, (time.perf_counter() - start_time) * 1000 / len(frames)
+
+
+def main():
+    samples = make_dataset(SAMPLES)
+    frames = np.array([sample.frame for sample in samples])
+    people = sum(len(sample.boxes) for sample in samples)
+    print(f"{SAMPLES} synthetic frames, {people} people")
+    for name, backend_class in BACKENDS.items():
+        backend = backend_class()
+        print(f"\n{name} backend")
+        for batch_size in BATCH_SIZES:
+            results, latency = measure(backend, frames, batch_size)
+            print(f"  batch {batch_size:>2}: {latency:6.3f} ms/frame")
+        found, total, false_alarms, detections = score(samples, results)
+        true_positives = sum(found.values())
+        print(f"  precision {true_positives / max(detections, 1):.3f}  recall {true_positives / max(people, 1):.3f}")
+        for kind in PERSON_SIZES:
+            print(f"    {kind:<9} recall {found[kind] / max(total[kind], 1):.3f} ({found[kind]}/{total[kind]})")
+        for cause, count in sorted(false_alarms.items(), key=lambda item: -item[1])[:5]:
+            print(f"    false detections with {cause}: {count}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+from functools import lru_cache
+import numpy as np
+
+# Display settings
+DISPLAY_SIZE = (640, 480)   # (width, height)
+KERNEL = "bicubic"          # "bicubic" or "lanczos"
+COLORMAP = "jet"
+SMOOTHING = 0.2             # How quickly the displayed temperature range follows the scene (0..1)
+MIN_SPAN = 4.0              # Degrees C, the range is never narrower than this so noise is not amplified
+
+# Colormaps as (position 0..1, (r, g, b)) control points
+COLORMAPS = {
+    "jet": [(0.0, (0, 0, 128)), (0.11, (0, 0, 255)), (0.125, (0, 0, 255)), (0.375, (0, 255, 255)),
+            (0.625, (255, 255, 0)), (0.875, (255, 0, 0)), (1.0, (128, 0, 0))],
+    "inferno": [(0.0, (0, 0, 4)), (0.25, (87, 16, 110)), (0.5, (188, 55, 84)),
+                (0.75, (249, 142, 9)), (1.0, (252, 255, 164))],
+    "gray": [(0.0, (0, 0, 0)), (1.0, (255, 255, 255))],
+}
+
+
+# Interpolation kernels: weight of a source pixel at distance x, and how many pixels either side count
+def _bicubic(x, a=-0.5):
+    x = np.abs(x)
+    return np.where(x <= 1, (a + 2) * x ** 3 - (a + 3) * x ** 2 + 1,
+                    np.where(x < 2, a * x ** 3 - 5 * a * x ** 2 + 8 * a * x - 4 * a, 0.0))
+
+
+def _lanczos(x, a=3):
+    return np.where(np.abs(x) < a, np.sinc(x) * np.sinc(x / a), 0.0)
+
+
+KERNELS = {"bicubic": (_bicubic, 2), "lanczos": (_lanczos, 3)}
+
+
+# Function to build (once per size) the matrix that resamples `source` pixels to `target` pixels
+@lru_cache(maxsize=16)
+def interpolation_matrix(source, target, kernel=KERNEL):
+    """ Returns a (target, source) float32 matrix M so that M @ row resamples a row.
+
+    Pixel centres line up like OpenCV's resize and edge pixels are repeated past
+    the border. The matrix is cached and read-only.
+    """
+    function, support = KERNELS[kernel]
+    centres = (np.arange(target) + 0.5) * source / target - 0.5
+    first = np.floor(centres).astype(np.int64) - support + 1
+    taps = first[:, np.newaxis] + np.arange(2 * support)
+    weights = function(centres[:, np.newaxis] - taps)
+    weights /= weights.sum(axis=1, keepdims=True)
+    matrix = np.zeros((target, source), dtype=np.float64)
+    np.add.at(matrix, (np.repeat(np.arange(target), 2 * support), np.clip(taps, 0, source - 1).ravel()), weights.ravel())
+    matrix = matrix.astype(np.float32)
+    matrix.flags.writeable = False
+    return matrix
+
+
+# Function to build a 256 entry colour lookup table from a colormap's control points
+@lru_cache(maxsize=8)
+def colormap_lut(name=COLORMAP, bgr=False):
+    points = COLORMAPS[name]
+    positions = np.array([p for p, _ in points])
+    colours = np.array([c for _, c in points], dtype=np.float64)
+    x = np.linspace(0, 1, 256)
+    lut = np.stack([np.interp(x, positions, colours[:, i]) for i in range(3)], axis=1)
+    lut = np.round(lut).astype(np.uint8)
+    if bgr:
+        lut = lut[:, ::-1].copy()  # OpenCV windows expect blue first
+    lut.flags.writeable = False
+    return lut
+
+
+# Class that turns temperature frames into upscaled, colour-mapped images
+class ThermalDisplay:
+    """ The temperature range follows the scene's min and max with exponential
+    smoothing, so the colours do not flicker from frame to frame. Scaling into
+    0..255 is done on the small frame (768 pixels) and interpolation is linear,
+    so the upscaled image is already in colormap index units; it is then clipped,
+    converted and looked up in the LUT. All buffers are allocated once and
+    render() returns the same RGB array every time.
+    """
+
+    def __init__(self, size=DISPLAY_SIZE, kernel=KERNEL, colormap=COLORMAP, smoothing=SMOOTHING,
+                 min_span=MIN_SPAN, frame_shape=(24, 32), bgr=False):
+        width, height = size
+        self.rows = interpolation_matrix(frame_shape[0], height, kernel)
+        self.cols_t = np.ascontiguousarray(interpolation_matrix(frame_shape[1], width, kernel).T)
+        self.lut = colormap_lut(colormap, bgr)
+        self.smoothing = smoothing
+        self.min_span = min_span
+        self.low = None
+        self.high = None
+
+        self.scaled = np.empty(frame_shape, dtype=np.float32)
+        self.half = np.empty((height, frame_shape[1]), dtype=np.float32)
+        self.full = np.empty((height, width), dtype=np.float32)
+        self.index = np.empty((height, width), dtype=np.uint8)
+        self.image = np.empty((height, width, 3), dtype=np.uint8)
+
+    def update_range(self, frame):
+        low, high = float(frame.min()), float(frame.max())
+        if self.low is None:
+            self.low, self.high = low, high
+        else:
+            self.low += self.smoothing * (low - self.low)
+            self.high += self.smoothing * (high - self.high)
+        if self.high - self.low < self.min_span:
+            middle = (self.high + self.low) / 2
+            return middle - self.min_span / 2, middle + self.min_span / 2
+        return self.low, self.high
+
+    def render(self, frame):
+        """ frame is a 24x32 array of temperatures. Returns the (height, width, 3) uint8 image. """
+        low, high = self.update_range(frame)
+        np.subtract(frame, low, out=self.scaled)
+        self.scaled *= 255.0 / (high - low)
+        np.matmul(self.rows, self.scaled, out=self.half)
+        np.matmul(self.half, self.cols_t, out=self.full)
+        np.clip(self.full, 0, 255, out=self.full)
+        np.copyto(self.index, self.full, casting="unsafe")
+        np.take(self.lut, self.index, axis=0, out=self.image)
+        return self.image
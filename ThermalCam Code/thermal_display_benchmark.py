@@ -0,0 +1,53 @@
+import time
+import numpy as np
+from thermal_capture import SimulatedMLX90640
+from thermal_display import ThermalDisplay, interpolation_matrix, colormap_lut, DISPLAY_SIZE
+
+# Renders simulated frames at DISPLAY_SIZE and reports frames per second
+FRAMES = 300
+
+
+# Function to make frames of the simulated scene, 0.1 s apart
+def simulated_frames(count):
+    sensor = SimulatedMLX90640()
+    return np.array([sensor.frame_at(i * 0.1) for i in range(count)])
+
+
+# Same steps without cached weights or preallocated buffers: weights are rebuilt for every frame
+def render_uncached(frame, kernel):
+    width, height = DISPLAY_SIZE
+    interpolation_matrix.cache_clear()
+    rows = interpolation_matrix(24, height, kernel)
+    cols = interpolation_matrix(32, width, kernel)
+    scaled = (frame - frame.min()) * (255.0 / max(frame.max() - frame.min(), 1e-6))
+    full = np.clip(rows @ scaled @ cols.T, 0, 255).astype(np.uint8)
+    return colormap_lut("jet")[full]
+
+
+def measure(render, frames):
+    start_time = time.perf_counter()
+    for frame in frames:
+        render(frame)
+    return len(frames) / (time.perf_counter() - start_time)
+
+
+def main():
+    frames = simulated_frames(FRAMES)
+    width, height = DISPLAY_SIZE
+    print(f"{FRAMES} frames rendered at {width}x{height}")
+    for kernel in ("bicubic", "lanczos"):
+        display = ThermalDisplay(kernel=kernel)
+        print(f"{kernel:<8} cached weights + buffers: {measure(display.render, frames):7.1f} frames/s")
+        print(f"{kernel:<8} weights rebuilt per frame: {measure(lambda f: render_uncached(f, kernel), frames[:50]):7.1f} frames/s")
+
+    try:
+        from scipy import ndimage
+        # pithermalcam's interpolation: ndimage.zoom to 10x (320x240), then a colormap on top
+        rate = measure(lambda f: ndimage.zoom(f, 10, order=3), frames[:50])
+        print(f"scipy.ndimage.zoom (10x, cubic spline, no colormap): {rate:7.1f} frames/s")
+    except ImportError:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+from PyQt5.QtGui import QImage, QPixmap
+
+
+# Class that shows ThermalDisplay images on a QLabel with one allocation per frame
+class ThermalImageView:
+    """ ThermalDisplay.render() writes every frame into the same RGB array, so one
+    QImage is made over that array at start-up (the view keeps a reference to the
+    array, so the QImage never points at freed memory). The display must be RGB
+    (bgr=False) to match Format_RGB888.
+
+    Each frame still makes one QPixmap from that QImage: the label shares the pixmap
+    it is given, so updating a kept pixmap in place would detach and copy it anyway.
+    """
+
+    def __init__(self, label, display):
+        self.label = label
+        self.display = display
+        self.image = display.image
+        height, width, channels = self.image.shape
+        self.qimage = QImage(self.image.data, width, height, channels * width, QImage.Format_RGB888)
+        self.frames = 0
+
+    def show(self, frame=None):
+        """ Render a 24x32 temperature frame (or just show the current image, e.g. after drawing on it). """
+        if frame is not None:
+            self.display.render(frame)
+        self.label.setPixmap(QPixmap.fromImage(self.qimage))
+        self.frames += 1
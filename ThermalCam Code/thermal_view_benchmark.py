@@ -0,0 +1,52 @@
+import os
+import sys
+import time
+import numpy as np
+
+# Runs without a screen
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtWidgets import QApplication, QLabel
+from PyQt5.QtGui import QImage, QPixmap
+from thermal_capture import SimulatedMLX90640
+from thermal_display import ThermalDisplay
+from thermal_view import ThermalImageView
+
+# Pushes simulated frames through to a QLabel and reports frames per second
+FRAMES = 300
+
+
+# The old path: a new image array, a new QImage over it and a new QPixmap for every frame
+def show_allocating(label, display, frame):
+    heatmap = display.render(frame).copy()
+    height, width, channels = heatmap.shape
+    q_img = QImage(heatmap.data, width, height, channels * width, QImage.Format_RGB888)
+    label.setPixmap(QPixmap.fromImage(q_img))
+
+
+def measure(show, frames, app):
+    start_time = time.perf_counter()
+    for frame in frames:
+        show(frame)
+        app.processEvents()
+    return len(frames) / (time.perf_counter() - start_time)
+
+
+def main():
+    app = QApplication(sys.argv)
+    sensor = SimulatedMLX90640()
+    frames = np.array([sensor.frame_at(i * 0.1) for i in range(FRAMES)])
+
+    label = QLabel()
+    label.show()
+    display = ThermalDisplay((640, 480))
+    view = ThermalImageView(label, display)
+    print(f"{FRAMES} frames at 640x480 to a QLabel")
+    print(f"reused array and QImage:      {measure(view.show, frames, app):7.1f} frames/s")
+    print(f"new array, QImage and QPixmap: {measure(lambda f: show_allocating(label, display, f), frames, app):7.1f} frames/s")
+    rate = measure(display.render, frames, app)
+    print(f"render only (no Qt):           {rate:7.1f} frames/s")
+
+
+if __name__ == "__main__":
+    main()